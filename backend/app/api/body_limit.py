@@ -0,0 +1,79 @@
+from typing import Tuple
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class BodySizeLimitMiddleware:
+    """
+    Refuse request bodies over max_bytes while they arrive
+
+    Starlette spools a whole multipart body to disk before the route runs,
+    so a size check in the handler only fires after the full upload has
+    been received. This checks Content-Length up front and counts bytes as
+    they are received, answering 413 as soon as the limit is crossed.
+    """
+
+    def __init__(self, app, max_bytes: int, path_prefixes: Tuple[str, ...]):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_prefixes = path_prefixes
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("POST", "PUT", "PATCH")
+            or not scope["path"].startswith(self.path_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            if exceeded:
+                # Whatever the app made of the aborted body, the answer is 413
+                return
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            # Form parsing may wrap _BodyTooLarge in its own error
+            if not exceeded:
+                raise
+        if exceeded and not started:
+            await self._reject(scope, receive, send)
+
+    async def _reject(self, scope, receive, send) -> None:
+        response = JSONResponse(
+            {"detail": f"Request body exceeds the {self.max_bytes} byte limit"},
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            # The rest of the body is never read
+            headers={"Connection": "close"},
+        )
+        await response(scope, receive, send)
@@ -1,4 +1,4 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import ValidationError, BaseModel, EmailStr
@@ -15,15 +15,24 @@ from app.crud.user import get_user_by_email
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Request state key under which POST /batch hands its user to sub-requests
+BATCH_USER = "batch_user"
+
 
 # Will be implemented later
 async def get_current_user(
+    request: Request,
     db: Session = Depends(get_db),
     token: str = Depends(oauth2_scheme),
 ) -> "User":
     """
     Decode JWT token to get user_id, and then query user table to get current user.
     """
+    # Sub-requests of a batch reuse the user the batch was authenticated as
+    batch_user = getattr(request.state, BATCH_USER, None)
+    if batch_user is not None:
+        return batch_user
+
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[ALGORITHM]
@@ -0,0 +1,32 @@
+import hashlib
+from typing import Any, Dict, Optional
+
+from fastapi import Request, status
+from fastapi.responses import Response
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag from the values a representation depends on (ids, updated_at, counts...)"""
+    digest = hashlib.blake2b("|".join(str(part) for part in parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    # no-cache: the browser keeps the body but revalidates with If-None-Match every time
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check; weak comparison, as RFC 9110 requires for GET"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 response if the client already has this version, else None"""
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
+    return None
@@ -0,0 +1,124 @@
+import asyncio
+import json
+from typing import Any, Dict
+from urllib.parse import unquote
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from app.api.deps import BATCH_USER, get_current_user
+from app.core.config import settings
+from app.schemas.batch import BatchRequest, BatchRequestItem, BatchResponse, BatchResponseItem
+from app.schemas.user import User
+
+router = APIRouter()
+
+# Headers a sub-request inherits from the batch call unless it sets its own
+_INHERITED_HEADERS = ("authorization", "accept-language", "user-agent")
+
+
+@router.post("/", response_model=BatchResponse)
+async def batch_requests(
+    batch: BatchRequest,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Run several API calls in one round trip
+
+    Sub-requests go through the app in-process and run concurrently. They
+    share the identity authenticated for the batch, so the token is checked
+    once, and each gets its own status code: one failing call doesn't fail
+    the batch. Responses are returned in request order.
+    """
+    if len(batch.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may contain at most {settings.BATCH_MAX_REQUESTS} requests",
+        )
+    # Refused here rather than by matching sub-request URLs, which have
+    # too many spellings (percent-encoding, dot segments). Without nesting,
+    # BATCH_MAX_REQUESTS bounds the calls one request can fan out to.
+    nested = BATCH_USER in request.scope.get("state", {})
+    if nested or any(unquote(item.url.split("?", 1)[0]).rstrip("/") == "/batch" for item in batch.requests):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Batches can't be nested",
+        )
+
+    responses = await asyncio.gather(
+        *(_dispatch(request, item, current_user) for item in batch.requests)
+    )
+    return BatchResponse(responses=responses)
+
+
+async def _dispatch(parent: Request, item: BatchRequestItem, user: User) -> BatchResponseItem:
+    """Call the app directly over ASGI with a scope built from the sub-request"""
+    path, _, query = item.url.partition("?")
+    body = b"" if item.body is None else json.dumps(item.body).encode()
+
+    headers = {name: parent.headers[name] for name in _INHERITED_HEADERS if name in parent.headers}
+    headers.update({name.lower(): value for name, value in item.headers.items()})
+    # The batch response is compressed as a whole, if at all
+    headers.pop("accept-encoding", None)
+    if body:
+        headers.setdefault("content-type", "application/json")
+    headers["content-length"] = str(len(body))
+
+    scope = {
+        "type": "http",
+        "asgi": parent.scope.get("asgi", {"version": "3.0"}),
+        "http_version": parent.scope.get("http_version", "1.1"),
+        "method": item.method,
+        "scheme": parent.url.scheme,
+        "path": unquote(path),
+        "raw_path": path.encode(),
+        "root_path": parent.scope.get("root_path", ""),
+        "query_string": query.encode(),
+        "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()],
+        "client": parent.scope.get("client"),
+        "server": parent.scope.get("server"),
+        # Only set in-process, so clients can't forge it
+        "state": {**parent.scope.get("state", {}), BATCH_USER: user},
+    }
+
+    request_sent = False
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal request_sent
+        if request_sent:
+            return {"type": "http.disconnect"}
+        request_sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    result: Dict[str, Any] = {"status": 500, "headers": [], "body": []}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+            result["headers"] = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            result["body"].append(message.get("body", b""))
+
+    try:
+        await parent.app(scope, receive, send)
+    except Exception as e:
+        # ServerErrorMiddleware re-raises after sending its 500
+        print(f"Batch sub-request {item.method} {item.url} failed: {e}")
+
+    response_headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in result["headers"]}
+    return BatchResponseItem(
+        status=result["status"],
+        headers=response_headers,
+        body=_decode_body(b"".join(result["body"]), response_headers.get("content-type", "")),
+    )
+
+
+def _decode_body(body: bytes, content_type: str) -> Any:
+    if not body:
+        return None
+    if content_type.startswith("application/json"):
+        try:
+            return json.loads(body)
+        except ValueError:
+            pass
+    return body.decode("utf-8", errors="replace")
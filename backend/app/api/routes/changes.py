@@ -0,0 +1,55 @@
+import asyncio
+import json
+from typing import AsyncIterator, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_current_user
+from app.core.config import settings
+from app.schemas.user import User
+from app.services.change_feed import Subscription, change_feed
+
+router = APIRouter()
+
+
+@router.get("/stream")
+async def stream_changes(
+    request: Request,
+    story_id: Optional[UUID] = Query(None),
+    assignee: Optional[UUID] = Query(None),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Server-sent events for story, task and document changes
+
+    Each "change" event is one JSON change (see app.services.change_feed).
+    A "resync" event means events were lost, after a reconnect or because
+    the client fell behind, and local state should be refetched.
+    """
+    subscription = change_feed.subscribe(story_id=story_id, assignee=assignee)
+    return StreamingResponse(
+        _events(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _events(request: Request, subscription: Subscription) -> AsyncIterator[str]:
+    try:
+        yield "retry: 3000\n\n"
+        while not await request.is_disconnected():
+            try:
+                change = await asyncio.wait_for(
+                    subscription.queue.get(), settings.CHANGE_FEED_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                # Comment line: keeps proxies from closing an idle stream
+                yield ": keepalive\n\n"
+                continue
+            # Shared with other subscribers: don't modify it
+            data = {key: value for key, value in change.items() if key != "type"}
+            yield f"event: {change.get('type', 'change')}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+    finally:
+        change_feed.unsubscribe(subscription)
@@ -3,22 +3,32 @@ Dashboard API endpoints for retrieving aggregated dashboard data
 """
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
 
 from app.api.deps import get_db, get_current_user
+from app.core.config import settings
+from app.db.session import SessionLocal
 from app.models.user import User as UserModel
 from app.models.user_story import UserStory
 from app.models.task import Task
 from app.schemas.user import User
 from app.crud.user_story import get_stories
+from app.services.invalidation_bus import invalidation_bus
+from app.services.single_flight import SingleFlight
 
 router = APIRouter(tags=["dashboard"])
 
 
+# The summary is the same for every user, so all callers share one scope
+summary_flight = SingleFlight("dashboard_summary", settings.SINGLE_FLIGHT_WINDOW_SECONDS)
+for _entity in ("story", "task", "user"):
+    invalidation_bus.subscribe(_entity, lambda _id: summary_flight.forget(), include_own=True)
+
+
 @router.get("/summary", response_model=Dict[str, Any])
-def get_dashboard_summary(
-    db: Session = Depends(get_db),
+async def get_dashboard_summary(
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -28,7 +38,24 @@ def get_dashboard_summary(
     - Recent activity
     - Upcoming deadlines
     - Gherkin coverage statistics
+
+    Concurrent requests share one computation, run in a worker thread with
+    its own session so it outlives any single caller.
     """
+    return await summary_flight.do(
+        "summary", lambda: run_in_threadpool(_summary_in_new_session, current_user)
+    )
+
+
+def _summary_in_new_session(current_user: User) -> Dict[str, Any]:
+    db = SessionLocal()
+    try:
+        return build_dashboard_summary(db, current_user)
+    finally:
+        db.close()
+
+
+def build_dashboard_summary(db: Session, current_user: User) -> Dict[str, Any]:
     try:
         # Get status counts
         status_summary = get_status_counts(db, current_user)
@@ -172,15 +199,42 @@ def get_gherkin_coverage(
 ):
     """
     Get statistics about Gherkin specification coverage
+    
+    Answered from the parsed Gherkin counts (see set_story_gherkin), so no
+    gherkin_description text is read.
     """
-    # Count stories with Gherkin specifications
-    with_gherkin = db.query(UserStory).filter(
-        UserStory.gherkin_description.isnot(None),
-        UserStory.gherkin_description != ""
-    ).count()
+    from sqlalchemy import func
+    
+    # Stories, covered stories, scenarios and steps per status in one query
+    rows = db.query(
+        UserStory.status,
+        func.count(UserStory.id),
+        func.count(UserStory.id).filter(UserStory.gherkin_scenario_count > 0),
+        func.coalesce(func.sum(UserStory.gherkin_scenario_count), 0),
+        func.coalesce(func.sum(UserStory.gherkin_step_count), 0),
+    ).group_by(UserStory.status).all()
     
-    # Count total stories
-    total_stories = db.query(UserStory).count()
+    by_status = {}
+    total_stories = with_gherkin = total_scenarios = total_steps = 0
+    for story_status, stories, covered, scenarios, steps in rows:
+        by_status[story_status.name.lower()] = {
+            "stories": stories,
+            "with_gherkin": covered,
+            "scenarios": int(scenarios),
+            "steps": int(steps),
+        }
+        total_stories += stories
+        with_gherkin += covered
+        total_scenarios += int(scenarios)
+        total_steps += int(steps)
+    
+    # How many stories have 0, 1, 2, ... scenarios
+    scenarios_per_story = {
+        str(scenario_count): stories
+        for scenario_count, stories in db.query(
+            UserStory.gherkin_scenario_count, func.count(UserStory.id)
+        ).group_by(UserStory.gherkin_scenario_count).order_by(UserStory.gherkin_scenario_count).all()
+    }
     
     # Calculate stories without Gherkin
     without_gherkin = total_stories - with_gherkin
@@ -194,5 +248,10 @@ def get_gherkin_coverage(
         "with_gherkin": with_gherkin,
         "without_gherkin": without_gherkin,
         "total_stories": total_stories,
-        "coverage_percentage": coverage_percentage
+        "coverage_percentage": coverage_percentage,
+        "total_scenarios": total_scenarios,
+        "total_steps": total_steps,
+        "avg_scenarios_per_story": round(total_scenarios / with_gherkin, 2) if with_gherkin else 0,
+        "scenarios_per_story": scenarios_per_story,
+        "by_status": by_status
     }
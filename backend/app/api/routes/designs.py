@@ -0,0 +1,118 @@
+import re
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi.responses import FileResponse
+from typing import Optional
+
+from app.api.deps import get_current_user
+from app.schemas.user import User
+from app.schemas.user_story import UserStoryDesignAnalysis
+from app.schemas.design import DesignIngestResult
+from app.crud.user_story import generate_description_from_image
+from app.services.design_ingest import DesignIngestService
+
+router = APIRouter()
+
+
+@router.post("/analyze", response_model=UserStoryDesignAnalysis)
+async def analyze_design(
+    design_url: Optional[str] = Form(None),
+    file: Optional[UploadFile] = File(None),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Generate a description from a design image URL or upload.
+    
+    Stateless: nothing is written to the database, so new stories can be
+    drafted from a design before they exist.
+    """
+    if file is None and not design_url:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either a design_url or an image file",
+        )
+    
+    if file is not None:
+        if not (file.content_type or "").startswith("image/"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded file must be an image",
+            )
+        image_data = await file.read()
+        print(f"[API] Analyzing uploaded design: {file.filename}")
+        generated_description = await generate_description_from_image(
+            image_data=image_data, media_type=file.content_type
+        )
+    else:
+        print(f"[API] Analyzing design URL: {design_url}")
+        generated_description = await generate_description_from_image(design_url=design_url)
+    
+    return UserStoryDesignAnalysis(generated_description=generated_description)
+
+
+@router.post("/ingest", response_model=DesignIngestResult)
+async def ingest_design(
+    design_url: Optional[str] = Form(None),
+    file: Optional[UploadFile] = File(None),
+    current_user: User = Depends(get_current_user),
+):
+    """Store a downscaled copy and thumbnail of a design image URL or upload"""
+    if file is None and not design_url:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either a design_url or an image file",
+        )
+    
+    ingest_service = DesignIngestService()
+    try:
+        if file is not None:
+            ingested = await ingest_service.ingest_bytes(await file.read(), file.content_type)
+        else:
+            ingested = await ingest_service.ingest_url(design_url)
+    except Exception as e:
+        print(f"[API] Design ingest failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Could not process design image",
+        )
+    
+    if ingested is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Could not fetch design image",
+        )
+    
+    return DesignIngestResult(
+        digest=ingested.digest,
+        media_type=ingested.media_type,
+        size=len(ingested.data),
+        width=ingested.width,
+        height=ingested.height,
+        image_url=f"/designs/{ingested.digest}",
+        thumbnail_url=f"/designs/{ingested.digest}/thumbnail" if ingested.thumbnail_path else None,
+    )
+
+
+@router.get("/{digest}")
+async def get_design_image(digest: str, current_user: User = Depends(get_current_user)):
+    """Serve a stored design image"""
+    return _design_file_response(digest, thumbnail=False)
+
+
+@router.get("/{digest}/thumbnail")
+async def get_design_thumbnail(digest: str, current_user: User = Depends(get_current_user)):
+    """Serve the thumbnail of a stored design image"""
+    return _design_file_response(digest, thumbnail=True)
+
+
+def _design_file_response(digest: str, thumbnail: bool) -> FileResponse:
+    path = None
+    if re.fullmatch(r"[0-9a-f]{64}", digest):
+        path = DesignIngestService().get_path(digest, thumbnail=thumbnail)
+    if not path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Design not found",
+        )
+    # Content-addressed, so the file behind a URL never changes; private
+    # because it is only served to signed-in users
+    return FileResponse(path, headers={"Cache-Control": "private, max-age=31536000, immutable"})
@@ -1,16 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 from uuid import UUID
-from typing import List
+from typing import List, Optional
+from urllib.parse import quote
+import mimetypes
+import os
 
 from app.db.session import get_db
 from app.api.deps import get_current_user
+from app.api.file_responses import ranged_file_response
+from app.api.json_responses import json_list_response
 from app.schemas.user import User
-from app.schemas.document import Document, DocumentCreate, DocumentValidationResult
-from app.crud.document import create_document, get_documents, validate_document
+from app.schemas.document import (
+    Document, DocumentCreate, DocumentDiff, DocumentRevalidation, DocumentSearchHit, DocumentSearchResults,
+    DocumentValidationResult, DocumentVersion,
+)
+from app.crud.document import (
+    DocumentVersionConflictError, add_document_version, create_document, diff_document_versions, get_document, get_document_version,
+    get_document_versions, get_documents, search_documents, validate_document,
+)
+from app.services.chunk_store import chunk_store
+from app.services.document_storage import DocumentTooLargeError
+from app.services.document_validation import document_validation
 
 router = APIRouter()
 
+DOCUMENT_MEDIA_TYPES = {
+    ".json": "application/json",
+    ".yaml": "application/yaml",
+    ".yml": "application/yaml",
+    ".md": "text/markdown; charset=utf-8",
+    ".txt": "text/plain; charset=utf-8",
+}
+
 
 @router.post("/", response_model=Document)
 async def upload_document(
@@ -21,17 +44,54 @@ async def upload_document(
     current_user: User = Depends(get_current_user),
 ):
     document_data = DocumentCreate(name=name, type=type)
-    document = await create_document(db, document_data, file, current_user.id)
+    try:
+        document = await create_document(db, document_data, file, current_user.id)
+    except DocumentTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+        )
+    # Validate in the background so validation_status is current without a request
+    document_validation.schedule(document.id)
     return document
 
 
 @router.get("/", response_model=List[Document])
 async def list_documents(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     documents = get_documents(db)
-    return documents
+    return json_list_response(request, Document, documents)
+
+
+@router.get("/search", response_model=DocumentSearchResults)
+async def search_documents_route(
+    q: str = Query(..., min_length=1),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Find documents by path, operationId, schema name or text, best matches first"""
+    total, results = search_documents(db, q, skip, limit)
+    return DocumentSearchResults(
+        total=total,
+        items=[
+            DocumentSearchHit(document=document, rank=rank, matches=matches)
+            for document, rank, matches in results
+        ],
+    )
+
+
+@router.post("/revalidate", response_model=DocumentRevalidation)
+async def revalidate_documents(
+    current_user: User = Depends(get_current_user),
+):
+    """Revalidate, in the background, every document whose content changed since its last validation"""
+    scheduled, skipped = document_validation.revalidate_changed()
+    return DocumentRevalidation(scheduled=scheduled, skipped=skipped)
 
 
 @router.get("/{document_id}/validate", response_model=DocumentValidationResult)
@@ -47,3 +107,152 @@ async def validate_document_route(
             detail="Document not found",
         )
     return result
+
+
+@router.get("/{document_id}/content")
+async def download_document(
+    document_id: UUID,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Response:
+    """Download a document's file, supporting Range and conditional requests"""
+    document = get_document(db, document_id)
+    if not document or not os.path.isfile(document.url):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found",
+        )
+
+    extension = os.path.splitext(document.url)[1].lower()
+    media_type = _media_type(extension)
+    filename = _download_name(document.name, extension)
+
+    if document.content_hash:
+        etag = f'"{document.content_hash}"'
+    else:
+        # Stored before content addressing: the file may change in place
+        stat = os.stat(document.url)
+        etag = f'W/"{int(stat.st_mtime)}-{stat.st_size}"'
+
+    return ranged_file_response(request, document.url, media_type, etag, filename=filename)
+
+
+@router.post("/{document_id}/versions", response_model=DocumentVersion, status_code=status.HTTP_201_CREATED)
+async def upload_document_version(
+    document_id: UUID,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Upload new content for a document; unchanged content returns the current version"""
+    document = _get_document_or_404(db, document_id)
+    try:
+        version, created = await add_document_version(db, document, file, current_user.id)
+    except DocumentTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+        )
+    except DocumentVersionConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        )
+    if created:
+        document_validation.schedule(document.id)
+    return version
+
+
+@router.get("/{document_id}/versions", response_model=List[DocumentVersion])
+async def list_document_versions(
+    document_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    _get_document_or_404(db, document_id)
+    return get_document_versions(db, document_id)
+
+
+@router.get("/{document_id}/versions/{version}/content")
+async def download_document_version(
+    document_id: UUID,
+    version: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Response:
+    """Download any version; earlier versions are reassembled from their chunks"""
+    document = _get_document_or_404(db, document_id)
+    if version == document.version and document.content_hash and os.path.isfile(document.url):
+        return await download_document(document_id, request, db, current_user)
+
+    document_version = _get_version_or_404(db, document_id, version)
+    etag = f'"{document_version.content_hash}"'
+    headers = {
+        "ETag": etag,
+        "Content-Length": str(document_version.size_bytes),
+        "Content-Disposition": f"inline; filename*=utf-8''{quote(_download_name(document.name, document_version.extension))}",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    # A sync iterator: Starlette reads the chunk files in its thread pool
+    return StreamingResponse(
+        chunk_store.iter_content(document_version.chunks),
+        media_type=_media_type(document_version.extension),
+        headers=headers,
+    )
+
+
+@router.get("/{document_id}/diff", response_model=DocumentDiff)
+async def diff_document(
+    document_id: UUID,
+    from_version: Optional[int] = None,
+    to_version: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Structural diff between two versions, by default the latest and the one before"""
+    document = _get_document_or_404(db, document_id)
+    to_version = to_version or document.version
+    from_version = from_version or max(to_version - 1, 1)
+    before = _get_version_or_404(db, document_id, from_version)
+    after = _get_version_or_404(db, document_id, to_version)
+
+    result = await diff_document_versions(before, after)
+    return DocumentDiff(
+        document_id=document_id,
+        from_version=from_version,
+        to_version=to_version,
+        **result,
+    )
+
+
+def _get_document_or_404(db: Session, document_id: UUID):
+    document = get_document(db, document_id)
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found",
+        )
+    return document
+
+
+def _get_version_or_404(db: Session, document_id: UUID, version: int):
+    document_version = get_document_version(db, document_id, version)
+    if not document_version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Version {version} not found",
+        )
+    return document_version
+
+
+def _media_type(extension: str) -> str:
+    return DOCUMENT_MEDIA_TYPES.get(extension) \
+        or mimetypes.guess_type(f"document{extension}")[0] \
+        or "application/octet-stream"
+
+
+def _download_name(name: str, extension: str) -> str:
+    return name if name.lower().endswith(extension) else f"{name}{extension}"
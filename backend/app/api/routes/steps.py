@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.db.session import get_db
+from app.api.deps import get_current_user
+from app.schemas.user import User
+from app.schemas.step import Step, StepSuggestion
+from app.services.step_index import step_index
+
+router = APIRouter()
+
+
+@router.get("/suggest", response_model=List[StepSuggestion])
+async def suggest_steps(
+    q: str = Query(..., min_length=1),
+    keyword: Optional[str] = Query(None, pattern="^(Given|When|Then)$"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Existing steps similar to what is being typed in the story editor"""
+    step_index.ensure_loaded(db)
+    return [
+        StepSuggestion(
+            keyword=entry.keyword,
+            text=entry.text,
+            story_count=len(entry.story_ids),
+            usage_count=entry.usage_count,
+            similarity=round(similarity, 3),
+        )
+        for entry, similarity in step_index.suggest(q, keyword=keyword, limit=limit)
+    ]
+
+
+@router.get("/most-reused", response_model=List[Step])
+async def most_reused_steps(
+    keyword: Optional[str] = Query(None, pattern="^(Given|When|Then)$"),
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Steps shared by the most stories"""
+    step_index.ensure_loaded(db)
+    return [
+        Step(
+            keyword=entry.keyword,
+            text=entry.text,
+            story_count=len(entry.story_ids),
+            usage_count=entry.usage_count,
+        )
+        for entry in step_index.most_reused(keyword=keyword, limit=limit)
+    ]
@@ -1,29 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from uuid import UUID
 
-from app.db.session import get_db
+from app.db.session import SessionLocal, get_db
 from app.api.deps import get_current_user
+from app.api.etags import etag_headers, make_etag, not_modified
+from app.api.json_responses import encode_list, json_bytes_response
+from app.core.config import settings
 from app.schemas.user import User
-from app.schemas.user_story import UserStory, UserStoryCreate, UserStoryUpdate, UserStoryStatusUpdate, UserStoryAssign, UserStoryDesignUpload, UserStoryDesignAnalysis
+from app.schemas.user_story import UserStory, UserStoryCreate, UserStoryUpdate, UserStoryStatusUpdate, UserStoryAssign, UserStoryDesignUpload, UserStoryDesignAnalysis, SimilarStory, UserStoryCreated, StoryTitleMatch, UserStoryDetail
 from app.crud.user_story import (
     create_story, get_stories, update_story, update_story_status, 
     get_story, assign_story, delete_story, update_story_design,
-    generate_description_from_design
+    generate_description_from_design, get_similar_stories, search_story_titles,
+    get_stories_version, get_story_version, STORY_INCLUDES
 )
+from app.schemas.llm_usage import StoryLlmUsage
+from app.crud.llm_usage import get_story_usage
+from app.services.design_analysis_jobs import DesignAnalysisSuperseded, design_analysis_jobs
+from app.services.single_flight import SingleFlight
 
 router = APIRouter()
 
+story_list_flight = SingleFlight("story_list", settings.SINGLE_FLIGHT_WINDOW_SECONDS)
 
-@router.post("/", response_model=UserStory)
+
+@router.post("/", response_model=UserStoryCreated)
 async def create_user_story(
     story_in: UserStoryCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     story = create_story(db, story_in, current_user.id)
-    return story
+    if story.design_url:
+        design_analysis_jobs.schedule(story.id, story.design_url)
+    
+    # Flag possible duplicates so the author can merge instead
+    similar = get_similar_stories(db, story.id)
+    created = UserStoryCreated.model_validate(story)
+    created.similar_stories = [
+        SimilarStory(id=match.id, title=match.title, status=match.status, score=round(score, 3))
+        for match, score in similar
+    ]
+    return created
 
 
 @router.put("/{story_id}/assign", response_model=UserStory)
@@ -47,29 +68,139 @@ async def assign_story_route(
 
 @router.get("/", response_model=List[UserStory])
 async def list_user_stories(
+    request: Request,
     status: Optional[str] = Query(None),
     keyword: Optional[str] = Query(None),
     assignee: Optional[UUID] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    stories = get_stories(db, status=status, keyword=keyword, assignee=assignee)
-    return stories
+    # Answer revalidations from the list's version before loading any rows
+    count, latest = get_stories_version(db, status=status, keyword=keyword, assignee=assignee)
+    etag = make_etag("stories", status, keyword, assignee, count, latest)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    # Standup bursts: identical lists share one load and encode. The key
+    # holds the version, so a shared body always belongs to this ETag
+    key = (status, keyword.lower() if keyword else None, assignee, etag)
+    body = await story_list_flight.do(
+        key, lambda: run_in_threadpool(_encode_stories, status, keyword, assignee)
+    )
+    return json_bytes_response(request, body, headers=etag_headers(etag))
+
+
+def _encode_stories(status: Optional[str], keyword: Optional[str], assignee: Optional[UUID]) -> bytes:
+    # Own session: the shared computation may outlive the request that started it
+    db = SessionLocal()
+    try:
+        return encode_list(UserStory, get_stories(db, status=status, keyword=keyword, assignee=assignee))
+    finally:
+        db.close()
 
 
-@router.get("/{story_id}", response_model=UserStory)
+@router.get("/typeahead", response_model=List[StoryTitleMatch])
+async def story_title_typeahead(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=20),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Search-as-you-type over story titles, served from memory"""
+    return [
+        StoryTitleMatch(id=story_id, title=title)
+        for story_id, title in search_story_titles(db, q, limit)
+    ]
+
+
+@router.get("/{story_id}", response_model=UserStoryDetail, response_model_exclude_unset=True)
 async def get_story_by_id(
     story_id: UUID,
+    request: Request,
+    response: Response,
+    include: Optional[str] = Query(None, description="Comma-separated: tasks, assignee, creator"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get a story, optionally embedding its tasks and users so the detail view needs one request"""
+    included = sorted({part.strip() for part in include.split(",") if part.strip()}) if include else []
+    unknown = [part for part in included if part not in STORY_INCLUDES]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown include: {', '.join(unknown)}. Allowed: {', '.join(STORY_INCLUDES)}",
+        )
+
+    version = get_story_version(db, story_id, included)
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User story not found",
+        )
+    etag = make_etag("story", story_id, *included, *version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    # The body must be at least as new as the version the ETag describes
+    story = get_story(db, story_id, included, expected_updated_at=version[0])
+    if not story:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User story not found",
+        )
+    # Only touch the included relationships, the others aren't loaded
+    detail = UserStory.model_validate(story).model_dump()
+    detail.update({name: getattr(story, name) for name in included})
+    response.headers.update(etag_headers(etag))
+    return UserStoryDetail.model_validate(detail)
+
+
+@router.get("/{story_id}/similar", response_model=List[SimilarStory])
+async def get_similar_stories_route(
+    story_id: UUID,
+    k: int = Query(5, ge=1, le=50),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    """Stories that look like duplicates of this one, most similar first"""
     story = get_story(db, story_id)
     if not story:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User story not found",
         )
-    return story
+    
+    return [
+        SimilarStory(id=match.id, title=match.title, status=match.status, score=round(score, 3))
+        for match, score in get_similar_stories(db, story_id, k)
+    ]
+
+
+@router.get("/{story_id}/usage", response_model=StoryLlmUsage)
+async def get_story_usage_route(
+    story_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Claude API calls made on behalf of a story, with token and latency totals"""
+    story = get_story(db, story_id)
+    if not story:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User story not found",
+        )
+    
+    calls = get_story_usage(db, story_id)
+    return StoryLlmUsage(
+        story_id=story_id,
+        total_calls=len(calls),
+        total_input_tokens=sum(call.input_tokens for call in calls),
+        total_output_tokens=sum(call.output_tokens for call in calls),
+        total_wall_ms=sum(call.wall_ms or 0 for call in calls),
+        calls=calls,
+    )
 
 
 @router.put("/{story_id}", response_model=UserStory)
@@ -87,6 +218,9 @@ async def update_story_route(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User story not found",
         )
+    
+    if "design_url" in story_in.model_fields_set:
+        design_analysis_jobs.schedule(story.id, story.design_url)
         
     return story
 
@@ -122,6 +256,8 @@ async def delete_story_route(
             detail="User story not found",
         )
     
+    design_analysis_jobs.cancel(story_id)
+    
     return None  # 204 No Content response doesn't need a body
 
 
@@ -145,6 +281,9 @@ async def update_story_design_route(
         )
     
     print(f"[API] Story design updated successfully: {story.design_url}")
+    
+    # Start analysing now so the description is ready when the user asks for it
+    design_analysis_jobs.schedule(story.id, story.design_url)
     return story
 
 
@@ -189,6 +328,12 @@ async def analyze_design_route(
             
         print(f"[API] Successfully generated description, length: {len(generated_description)} chars")
         return UserStoryDesignAnalysis(generated_description=generated_description)
+    except DesignAnalysisSuperseded:
+        print(f"[API] Design for story {story_id} changed during analysis")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The story's design changed while it was being analyzed. Please try again.",
+        )
     except Exception as e:
         print(f"[API] Error analyzing design: {str(e)}")
         raise HTTPException(
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.api.deps import get_current_user
+from app.core.config import settings
+from app.schemas.sync import SyncChanges
+from app.schemas.user import User
+from app.crud.sync import get_changes_since
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SyncChanges)
+async def sync_changes(
+    since: int = Query(0, ge=0, description="Cursor from the previous sync; 0 for everything"),
+    limit: int = Query(settings.SYNC_PAGE_SIZE, ge=1, le=settings.SYNC_MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Stories and tasks changed since a cursor, plus the ones deleted
+
+    Clients keeping a local copy apply stories and tasks as upserts and
+    deletions as removals, then store the returned cursor. Repeat while
+    has_more is true. If reset is true the cursor predates the retained
+    deletions: drop the local copy and sync again from 0.
+    """
+    return get_changes_since(db, since, limit)
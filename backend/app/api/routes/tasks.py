@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import List
 
 from app.db.session import get_db
 from app.api.deps import get_current_user
+from app.api.etags import etag_headers, make_etag, not_modified
+from app.api.json_responses import json_list_response
 from app.schemas.user import User
 from app.schemas.task import Task, TaskCreate, TaskUpdate, TaskStatusUpdate, TaskAssignmentUpdate
-from app.crud.task import create_task, update_task, update_task_status, assign_task, get_tasks_by_story, get_task, delete_task
+from app.crud.task import create_task, update_task, update_task_status, assign_task, get_tasks_by_story, get_task, delete_task, get_story_tasks_version
 
 router = APIRouter()
 
@@ -15,12 +17,19 @@ router = APIRouter()
 @router.get("/story/{story_id}", response_model=List[Task])
 async def get_tasks_for_story(
     story_id: UUID,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get all tasks for a specific user story"""
+    count, latest = get_story_tasks_version(db, story_id)
+    etag = make_etag("tasks", story_id, count, latest)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
     tasks = get_tasks_by_story(db, story_id)
-    return tasks
+    return json_list_response(request, Task, tasks, headers=etag_headers(etag))
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,21 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.api.deps import get_current_user
+from app.api.etags import etag_headers, make_etag, not_modified
+from app.api.json_responses import json_list_response
 from app.schemas.user import User, UserCreate, UserUpdate
-from app.crud.user import get_user_by_email, create_user, update_user, get_users
+from app.crud.user import get_user_by_email, create_user, update_user, get_users, get_users_version
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[User])
 async def get_users_route(
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
+    count, latest = get_users_version(db)
+    etag = make_etag("users", count, latest)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
     users = get_users(db)
-    return users
+    return json_list_response(request, User, users, headers=etag_headers(etag))
 
 
 @router.get("/profile", response_model=User)
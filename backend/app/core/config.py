@@ -16,6 +16,59 @@ class Settings(BaseSettings):
     # External API settings
     CLAUDE_API_KEY: Optional[str] = None
     
+    # Gherkin model routing
+    CLAUDE_GHERKIN_FAST_MODEL: str = "claude-3-haiku-20240307"
+    CLAUDE_GHERKIN_LARGE_MODEL: str = "claude-3-sonnet-20240229"
+    CLAUDE_GHERKIN_LATENCY_BUDGET_MS: int = 15000
+    CLAUDE_GHERKIN_LARGE_STORY_CHARS: int = 1500
+    
+    # Design ingest settings
+    DESIGN_STORAGE_DIR: str = "uploads/designs"
+    DESIGN_MAX_EDGE: int = 1568  # Longest edge Claude uses without downscaling
+    DESIGN_THUMBNAIL_EDGE: int = 320
+    DESIGN_MAX_DOWNLOAD_BYTES: int = 20 * 1024 * 1024
+    DESIGN_ANALYSIS_RESULT_TTL_SECONDS: int = 3600  # Finished background analyses kept this long
+    
+    # Document storage: content-addressed, sharded by hash prefix
+    DOCUMENT_STORAGE_DIR: str = "uploads/documents"
+    DOCUMENT_MAX_UPLOAD_BYTES: int = 512 * 1024 * 1024
+    DOCUMENT_UPLOAD_FORM_ALLOWANCE_BYTES: int = 1024 * 1024  # Multipart framing and form fields
+    DOCUMENT_UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+    DOCUMENT_VALIDATION_WORKERS: int = 2
+    DOCUMENT_PARSE_CACHE_DIR: str = "uploads/documents/parsed"
+    DOCUMENT_CHUNK_DIR: str = "uploads/documents/chunks"  # Version history
+    
+    # Duplicate story detection
+    SIMILARITY_FEATURES: int = 512
+    SIMILARITY_MIN_SCORE: float = 0.3
+    
+    # Title typeahead index snapshot, restored at startup
+    TITLE_INDEX_SNAPSHOT: str = "data/title_index.json.gz"
+    
+    # JSON list responses at least this large are gzipped
+    RESPONSE_GZIP_MIN_BYTES: int = 8 * 1024
+    
+    # Live change feed: events buffered per client, and idle keepalive interval
+    CHANGE_FEED_QUEUE_SIZE: int = 1000
+    CHANGE_FEED_HEARTBEAT_SECONDS: int = 15
+    
+    # Story, task and user rows cached by id; set ENTITY_CACHE_URL (redis://...) to share across workers
+    ENTITY_CACHE_URL: Optional[str] = None
+    ENTITY_CACHE_MAX_ENTRIES: int = 10000
+    ENTITY_CACHE_TTL_SECONDS: int = 300
+    
+    # Identical concurrent reads share one computation, and its result for this long after
+    SINGLE_FLIGHT_WINDOW_SECONDS: float = 1.0
+    
+    # GET /sync rows per table per page
+    SYNC_PAGE_SIZE: int = 500
+    SYNC_MAX_PAGE_SIZE: int = 2000
+    # Clients that haven't synced for this long start over from cursor 0
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30
+    
+    # Most sub-requests one POST /batch may carry
+    BATCH_MAX_REQUESTS: int = 20
+    
     # Database settings
     POSTGRES_USER: str = os.environ.get("POSTGRES_USER", "esennahelespinosa")  # Your username
     POSTGRES_PASSWORD: str = os.environ.get("POSTGRES_PASSWORD", "")
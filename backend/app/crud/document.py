@@ -1,14 +1,29 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from uuid import UUID
-import os
-import json
-import yaml
 from fastapi import UploadFile
-import aiofiles
+import asyncio
+import hashlib
+import os
+import re
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 
+from app.core.config import settings
 from app.models.document import Document, DocumentType, ValidationStatus
+from app.models.document_version import DocumentVersion
+from app.models.document_search import DocumentSearchEntry
 from app.schemas.document import DocumentCreate, DocumentValidationResult
+from app.services.chunk_store import ChunkedWrite, chunk_store
+from app.services.document_diff import diff_versions
+from app.services.document_storage import document_storage
+from app.services.document_text import split_identifier
+from app.services.document_validation import document_validation
+from app.services.openapi_validator import format_issue
+
+
+class DocumentVersionConflictError(Exception):
+    """Raised when another upload took the same version number first"""
 
 
 async def create_document(
@@ -17,23 +32,27 @@ async def create_document(
     file: UploadFile,
     uploaded_by: UUID
 ) -> Document:
-    # Save file to disk
+    """
+    Stream the upload into content-addressed storage and record it
+
+    Raises:
+        DocumentTooLargeError: If the upload exceeds DOCUMENT_MAX_UPLOAD_BYTES
+    """
     # In production, you might use cloud storage instead
-    os.makedirs("uploads", exist_ok=True)
-    file_path = f"uploads/{file.filename}"
-    
-    async with aiofiles.open(file_path, 'wb') as out_file:
-        content = await file.read()
-        await out_file.write(content)
+    stored = await document_storage.store_upload(file)
     
     # Create DB record
     db_document = Document(
         name=doc_in.name,
-        type=DocumentType[doc_in.type],
-        url=file_path,  # Store local path for this MVP
+        type=DocumentType[doc_in.type.name],
+        url=stored.path,  # Store local path for this MVP
+        content_hash=stored.digest,
+        size_bytes=stored.size,
+        version=1,
         uploaded_by=uploaded_by,
         validation_status=ValidationStatus.PENDING,
     )
+    db_document.versions.append(_version_row(1, stored, uploaded_by))
     db.add(db_document)
     db.commit()
     db.refresh(db_document)
@@ -41,6 +60,129 @@ async def create_document(
     return db_document
 
 
+async def add_document_version(
+    db: Session,
+    db_document: Document,
+    file: UploadFile,
+    uploaded_by: UUID
+) -> Tuple[DocumentVersion, bool]:
+    """
+    Store an upload as the document's next version
+
+    Only chunks that earlier versions didn't already store take new space.
+    The previous version's whole-file blob is released once no document
+    points at it; its content stays reconstructible from chunks.
+
+    Returns:
+        (version, created); created is False if the content is unchanged
+
+    Raises:
+        DocumentTooLargeError: If the upload exceeds DOCUMENT_MAX_UPLOAD_BYTES
+        DocumentVersionConflictError: If a concurrent upload created this
+            version number first
+    """
+    if not db_document.versions:
+        await _record_initial_version(db, db_document)
+
+    stored = await document_storage.store_upload(file)
+    if stored.digest == db_document.content_hash:
+        return db_document.versions[-1], False
+
+    previous_path = db_document.url
+    db_document.version += 1
+    db_document.url = stored.path
+    db_document.content_hash = stored.digest
+    db_document.size_bytes = stored.size
+    db_document.validation_status = ValidationStatus.PENDING
+    db_document.validation_errors = None
+    version = _version_row(db_document.version, stored, uploaded_by)
+    db_document.versions.append(version)
+    db.add(db_document)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        release_unreferenced_blob(db, stored.path)
+        raise DocumentVersionConflictError(
+            f"Version {version.version} of this document was uploaded concurrently"
+        )
+    db.refresh(version)
+
+    # A validation may still be reading the previous blob
+    document_validation.release_blob(previous_path)
+    return version, True
+
+
+def release_unreferenced_blob(db: Session, path: str) -> None:
+    """Delete a stored blob if no document points at it"""
+    if db.query(Document.id).filter(Document.url == path).first() is None:
+        document_storage.release(path)
+
+
+def _version_row(version: int, stored, uploaded_by: UUID) -> DocumentVersion:
+    return DocumentVersion(
+        version=version,
+        content_hash=stored.digest,
+        size_bytes=stored.size,
+        extension=stored.extension,
+        chunks=stored.chunks,
+        stored_bytes=stored.new_chunk_bytes,
+        uploaded_by=uploaded_by,
+    )
+
+
+async def _record_initial_version(db: Session, db_document: Document) -> None:
+    """Chunk a document uploaded before versioning, as its version 1"""
+
+    def chunk_file() -> Tuple[ChunkedWrite, str]:
+        writer = ChunkedWrite(chunk_store)
+        sha256 = hashlib.sha256()
+        with open(db_document.url, "rb") as f:
+            for data in iter(lambda: f.read(settings.DOCUMENT_UPLOAD_CHUNK_BYTES), b""):
+                sha256.update(data)
+                writer.write(data)
+        writer.close()
+        return writer, sha256.hexdigest()
+
+    writer, digest = await asyncio.to_thread(chunk_file)
+    db_document.versions.append(DocumentVersion(
+        version=db_document.version or 1,
+        content_hash=digest,
+        size_bytes=sum(length for _, length in writer.chunks),
+        extension=os.path.splitext(db_document.url)[1].lower(),
+        chunks=writer.chunks,
+        stored_bytes=writer.new_bytes,
+        uploaded_by=db_document.uploaded_by,
+        created_at=db_document.created_at,
+    ))
+    db.commit()
+
+
+def get_document_versions(db: Session, document_id: UUID) -> List[DocumentVersion]:
+    return db.query(DocumentVersion)\
+        .filter(DocumentVersion.document_id == document_id)\
+        .order_by(DocumentVersion.version)\
+        .all()
+
+
+def get_document_version(db: Session, document_id: UUID, version: int) -> Optional[DocumentVersion]:
+    return db.query(DocumentVersion)\
+        .filter(DocumentVersion.document_id == document_id, DocumentVersion.version == version)\
+        .first()
+
+
+async def diff_document_versions(
+    before: DocumentVersion, after: DocumentVersion
+) -> Dict[str, Any]:
+    """Structural diff of two versions, computed in the document worker pool"""
+    return await document_validation.run_in_pool(
+        diff_versions,
+        (before.content_hash, before.extension, before.chunks),
+        (after.content_hash, after.extension, after.chunks),
+        settings.DOCUMENT_CHUNK_DIR,
+    )
+
+
 def get_document(db: Session, document_id: UUID) -> Optional[Document]:
     return db.query(Document).filter(Document.id == document_id).first()
 
@@ -49,59 +191,113 @@ def get_documents(db: Session) -> List[Document]:
     return db.query(Document).all()
 
 
-async def validate_document(
-    db: Session, document_id: UUID
+def get_documents_needing_validation(db: Session) -> Tuple[List[UUID], int]:
+    """Ids of documents not yet validated for their current content, and the total count"""
+    rows = db.query(Document.id, Document.content_hash, Document.validated_hash).all()
+    changed = [
+        document_id for document_id, content_hash, validated_hash in rows
+        if content_hash is None or content_hash != validated_hash
+    ]
+    return changed, len(rows)
+
+
+def stored_validation_result(db_document: Document) -> DocumentValidationResult:
+    issues = db_document.validation_errors or []
+    return DocumentValidationResult(
+        document_id=db_document.id,
+        status=db_document.validation_status,
+        errors=[format_issue(issue) for issue in issues] or None,
+        issues=issues or None
+    )
+
+
+def record_validation(
+    db: Session, db_document: Document, digest: str, issues: List[dict], text: Optional[dict] = None
 ) -> DocumentValidationResult:
-    db_document = get_document(db, document_id)
-    if not db_document:
-        return None
-    
-    # Placeholder: Simple document validation
-    errors = []
-    
-    try:
-        if db_document.type == DocumentType.OPENAPI:
-            # Validate OpenAPI document
-            with open(db_document.url, 'r') as f:
-                if db_document.url.endswith('.json'):
-                    spec = json.load(f)
-                elif db_document.url.endswith(('.yaml', '.yml')):
-                    spec = yaml.safe_load(f)
-                else:
-                    errors.append("Unknown file format. Expected JSON or YAML.")
-                    
-                # Simple OpenAPI validation
-                if spec:
-                    if 'openapi' not in spec:
-                        errors.append("Missing 'openapi' version field")
-                    if 'info' not in spec:
-                        errors.append("Missing 'info' section")
-                    if 'paths' not in spec:
-                        errors.append("Missing 'paths' section")
-        
-        elif db_document.type == DocumentType.ARCHITECTURE:
-            # Simple check for architecture document
-            with open(db_document.url, 'r') as f:
-                content = f.read()
-                if len(content) < 100:  # Very simple validation
-                    errors.append("Document seems too short to be valid")
-    
-    except Exception as e:
-        errors.append(f"Error validating document: {str(e)}")
-    
-    # Update validation status
-    if errors:
-        db_document.validation_status = ValidationStatus.INVALID
-    else:
-        db_document.validation_status = ValidationStatus.VALID
+    """Store a validation outcome, and the extracted search text, for the content hash they apply to"""
+    db_document.validation_status = ValidationStatus.INVALID if issues else ValidationStatus.VALID
+    db_document.validation_errors = issues or None
+    db_document.validated_hash = digest
+    if db_document.content_hash is None:
+        # Documents stored before content addressing get their hash here
+        db_document.content_hash = digest
+    if text is not None:
+        _index_document_text(db, db_document, digest, text)
     
     db.add(db_document)
     db.commit()
     db.refresh(db_document)
     
-    # Return validation result
-    return DocumentValidationResult(
-        document_id=document_id,
-        status=db_document.validation_status,
-        errors=errors if errors else None
-    )
+    return stored_validation_result(db_document)
+
+
+async def validate_document(
+    db: Session, document_id: UUID
+) -> Optional[DocumentValidationResult]:
+    """
+    Validate a document in the background pipeline and wait for the result
+
+    Documents already validated for their current content return the stored
+    result without being parsed again.
+    """
+    if not get_document(db, document_id):
+        return None
+    return await document_validation.get_result(document_id)
+
+
+def _index_document_text(db: Session, db_document: Document, digest: str, text: dict) -> None:
+    entry = db.get(DocumentSearchEntry, db_document.id)
+    if entry is None:
+        entry = DocumentSearchEntry(document_id=db_document.id)
+        db.add(entry)
+    entry.content_hash = digest
+    entry.name = db_document.name
+    entry.identifiers = text["identifiers"]
+    entry.keywords = text["keywords"]
+    entry.body = text["body"]
+
+
+def _search_terms(query: str) -> List[str]:
+    """Lower-case words of a query, with identifiers split like the indexed ones"""
+    terms = []
+    for word in re.findall(r"[A-Za-z0-9]+", query):
+        terms.extend(split_identifier(word) or [word.lower()])
+    return list(dict.fromkeys(terms))
+
+
+def search_documents(
+    db: Session, query: str, skip: int = 0, limit: int = 20
+) -> Tuple[int, List[Tuple[Document, float, List[str]]]]:
+    """
+    Full-text search over documents' extracted text
+
+    Every query word must match (as a prefix) somewhere in the document.
+    Results are ranked with names and identifiers above prose.
+
+    Returns:
+        (total matches, [(document, rank, matching identifiers), ...])
+    """
+    terms = _search_terms(query)
+    if not terms:
+        return 0, []
+    ts_query = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+    matches = DocumentSearchEntry.search_vector.op("@@")(ts_query)
+
+    total = db.query(func.count(DocumentSearchEntry.document_id)).filter(matches).scalar()
+    rank = func.ts_rank_cd(DocumentSearchEntry.search_vector, ts_query).label("rank")
+    rows = db.query(Document, rank, DocumentSearchEntry.identifiers)\
+        .join(DocumentSearchEntry, DocumentSearchEntry.document_id == Document.id)\
+        .filter(matches)\
+        .order_by(rank.desc(), Document.name)\
+        .offset(skip)\
+        .limit(limit)\
+        .all()
+
+    results = []
+    for document, score, identifiers in rows:
+        matched = [
+            identifier for identifier in identifiers or []
+            if any(word.startswith(term) for term in terms for word in split_identifier(identifier))
+        ]
+        results.append((document, float(score), matched[:10]))
+    return total, results
@@ -0,0 +1,56 @@
+from typing import List, Optional, Iterable
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from app.db.session import SessionLocal
+from app.models.llm_usage import LlmUsage
+from app.services.claude_service import ClaudeCallRecord
+
+
+def add_usage_records(
+    db: Session, story_id: Optional[UUID], records: Iterable[ClaudeCallRecord]
+) -> List[LlmUsage]:
+    """
+    Stage usage rows for the given Claude calls. The caller commits, so the
+    rows land in the same transaction as the story change they belong to.
+    """
+    rows = []
+    for record in records:
+        row = LlmUsage(
+            story_id=story_id,
+            endpoint=record.endpoint,
+            model=record.model,
+            status=record.status,
+            input_tokens=record.input_tokens,
+            output_tokens=record.output_tokens,
+            wall_ms=record.wall_ms,
+            ttfb_ms=record.ttfb_ms,
+            retries=record.retries,
+            fallback_used=record.fallback_used,
+        )
+        db.add(row)
+        rows.append(row)
+    return rows
+
+
+def save_usage_records(story_id: Optional[UUID], records: Iterable[ClaudeCallRecord]) -> None:
+    """Persist usage from a background job that has no request session"""
+    records = list(records)
+    if not records:
+        return
+    db = SessionLocal()
+    try:
+        add_usage_records(db, story_id, records)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"ERROR: Failed to save Claude usage records: {str(e)}")
+    finally:
+        db.close()
+
+
+def get_story_usage(db: Session, story_id: UUID) -> List[LlmUsage]:
+    return db.query(LlmUsage)\
+        .filter(LlmUsage.story_id == story_id)\
+        .order_by(LlmUsage.created_at)\
+        .all()
@@ -0,0 +1,96 @@
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.sync_tombstone import SyncPruneHorizon, SyncTombstone
+from app.models.task import Task
+from app.models.user_story import UserStory
+
+
+def get_changes_since(db: Session, since: int, limit: int) -> Dict[str, Any]:
+    """
+    Stories, tasks and deletions with a change_seq above since, oldest first
+
+    Each table is read up to limit rows; page_cursor() decides where the
+    page ends. A cursor older than the pruned tombstones can't be brought
+    up to date, so the client is told to reset instead.
+    """
+    horizon = db.query(SyncPruneHorizon.change_seq).scalar() or 0
+    if 0 < since < horizon:
+        return {"cursor": 0, "has_more": True, "reset": True, "stories": [], "tasks": [], "deleted": []}
+
+    stories = (
+        db.query(UserStory).filter(UserStory.change_seq > since)
+        .order_by(UserStory.change_seq).limit(limit).all()
+    )
+    tasks = (
+        db.query(Task).filter(Task.change_seq > since)
+        .order_by(Task.change_seq).limit(limit).all()
+    )
+    tombstones = (
+        db.query(SyncTombstone).filter(SyncTombstone.change_seq > since)
+        .order_by(SyncTombstone.change_seq).limit(limit).all()
+    )
+
+    cursor, has_more = page_cursor(
+        since, limit, [[row.change_seq for row in rows] for rows in (stories, tasks, tombstones)]
+    )
+    return {
+        "cursor": cursor,
+        "has_more": has_more,
+        "stories": [row for row in stories if row.change_seq <= cursor],
+        "tasks": [row for row in tasks if row.change_seq <= cursor],
+        "deleted": [
+            {"entity": row.entity, "id": row.entity_id, "story_id": row.story_id}
+            for row in tombstones if row.change_seq <= cursor
+        ],
+    }
+
+
+def page_cursor(since: int, limit: int, pages: Sequence[List[int]]) -> Tuple[int, bool]:
+    """
+    Where a page over several tables ends, given each table's ascending change_seqs
+
+    If any table filled its page, rows past the lowest last value among the
+    full pages may still be missing from that table, so the page ends
+    there and rows above it wait for the next page. Otherwise every table
+    is exhausted and the page ends at the highest value seen.
+    """
+    full_pages = [seqs[-1] for seqs in pages if len(seqs) == limit]
+    if full_pages:
+        return min(full_pages), True
+    return max((seqs[-1] for seqs in pages if seqs), default=since), False
+
+
+def prune_tombstones(db: Session, older_than: datetime) -> int:
+    """
+    Delete tombstones older than a cutoff and raise the pruned horizon
+
+    Returns:
+        Number of tombstones deleted
+    """
+    horizon = (
+        db.query(func.max(SyncTombstone.change_seq))
+        .filter(SyncTombstone.deleted_at < older_than)
+        .scalar()
+    )
+    if horizon is None:
+        return 0
+    deleted = (
+        db.query(SyncTombstone)
+        .filter(SyncTombstone.change_seq <= horizon)
+        .delete(synchronize_session=False)
+    )
+    # Workers may prune concurrently: the horizon only ever moves forward
+    statement = insert(SyncPruneHorizon).values(id=1, change_seq=horizon, pruned_at=datetime.utcnow())
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[SyncPruneHorizon.id],
+        set_={
+            "change_seq": func.greatest(SyncPruneHorizon.change_seq, statement.excluded.change_seq),
+            "pruned_at": statement.excluded.pruned_at,
+        },
+    ))
+    db.commit()
+    return deleted
@@ -1,9 +1,11 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.models.task import Task, TaskStatus
 from app.schemas.task import TaskCreate, TaskUpdate
+from app.services.entity_cache import entity_cache
 
 
 def create_task(
@@ -34,13 +36,22 @@ def delete_task(
 
 
 def get_task(db: Session, task_id: UUID) -> Optional[Task]:
-    return db.query(Task).filter(Task.id == task_id).first()
+    return entity_cache.get(db, Task, task_id)
 
 
 def get_tasks_by_story(db: Session, story_id: UUID) -> List[Task]:
     return db.query(Task).filter(Task.story_id == story_id).all()
 
 
+def get_story_tasks_version(db: Session, story_id: UUID) -> Tuple:
+    """(count, latest updated_at) of a story's tasks, read from ix_tasks_story_id_updated_at"""
+    return tuple(
+        db.query(func.count(Task.id), func.max(Task.updated_at))
+        .filter(Task.story_id == story_id)
+        .one()
+    )
+
+
 def update_task(
     db: Session, db_task: Task, task_in: TaskUpdate
 ) -> Task:
@@ -1,10 +1,12 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.core.security import get_password_hash, verify_password
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
+from app.services.entity_cache import entity_cache
 
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
@@ -12,13 +14,18 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
 
 
 def get_user_by_id(db: Session, user_id: UUID) -> Optional[User]:
-    return db.query(User).filter(User.id == user_id).first()
+    return entity_cache.get(db, User, user_id)
 
 
 def get_users(db: Session) -> List[User]:
     return db.query(User).all()
 
 
+def get_users_version(db: Session) -> Tuple:
+    """(count, latest updated_at) of all users, without loading them"""
+    return tuple(db.query(func.count(User.id), func.max(User.updated_at)).one())
+
+
 def create_user(db: Session, user_in: UserCreate) -> User:
     db_user = User(
         email=user_in.email,
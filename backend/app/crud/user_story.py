@@ -1,14 +1,24 @@
-from typing import List, Optional, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from datetime import datetime
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import or_, func, select
 from uuid import UUID
 import logging
 import os
 from app.services.claude_service import ClaudeService
+from app.services.design_analysis_jobs import design_analysis_jobs
+from app.services.entity_cache import entity_cache
+from app.services.gherkin_generator import generate_gherkin as offline_gherkin
+from app.services.gherkin_parser import parse_gherkin
+from app.services.step_index import step_index
+from app.services.similarity import story_similarity
+from app.services.title_index import title_index
 
 from app.models.user_story import UserStory, StoryStatus
 from app.schemas.user_story import UserStoryCreate, UserStoryUpdate, UserStoryDesignUpload
 from app.crud.user import get_user_by_email
+from app.crud.llm_usage import add_usage_records, save_usage_records
 
 
 def create_story(
@@ -53,6 +63,8 @@ def create_story(
     db.commit()
     db.refresh(db_story)
     print(f"Created story with ID: {db_story.id}, design_url: {db_story.design_url}")
+    story_similarity.upsert(db_story.id, db_story.title, db_story.description)
+    title_index.upsert(db_story.id, db_story.title, db_story.updated_at)
     return db_story
 
 
@@ -92,21 +104,103 @@ def delete_story(
     
     db.delete(db_story)
     db.commit()
+    step_index.update_story(story_id, None)
+    story_similarity.remove(story_id)
+    title_index.remove(story_id)
     
     return True
 
 
-def get_story(db: Session, story_id: UUID) -> Optional[UserStory]:
-    return db.query(UserStory).filter(UserStory.id == story_id).first()
+# Relationships GET /stories/{id}?include= can embed
+STORY_INCLUDES = ("tasks", "assignee", "creator")
 
 
-def get_stories(
-    db: Session, 
+def get_story(
+    db: Session,
+    story_id: UUID,
+    include: Sequence[str] = (),
+    expected_updated_at: Optional[datetime] = None,
+) -> Optional[UserStory]:
+    """
+    Load a story, eager-loading the included relationships
+
+    Users are joined into the story's own query; tasks are a collection,
+    so they come from one extra SELECT ... WHERE story_id IN (...) rather
+    than multiplying the story row. Pass the updated_at an ETag was built
+    from as expected_updated_at so a cached copy can't be older than it.
+    """
+    if not include:
+        return entity_cache.get(db, UserStory, story_id, expected_updated_at)
+    query = db.query(UserStory)
+    if "tasks" in include:
+        query = query.options(selectinload(UserStory.tasks))
+    if "assignee" in include:
+        query = query.options(joinedload(UserStory.assignee))
+    if "creator" in include:
+        query = query.options(joinedload(UserStory.creator))
+    return query.filter(UserStory.id == story_id).first()
+
+
+def get_story_version(db: Session, story_id: UUID, include: Sequence[str] = ()) -> Optional[Tuple]:
+    """
+    The story's row version plus that of each included relationship
+
+    One query with scalar subqueries, returning None if the story doesn't
+    exist. Tasks contribute (count, latest updated_at), users their
+    updated_at.
+    """
+    from app.models.task import Task
+    from app.models.user import User
+
+    columns = [UserStory.updated_at]
+    if "tasks" in include:
+        story_tasks = Task.story_id == UserStory.id
+        columns.append(select(func.count(Task.id)).where(story_tasks).scalar_subquery())
+        columns.append(select(func.max(Task.updated_at)).where(story_tasks).scalar_subquery())
+    if "assignee" in include:
+        columns.append(select(User.updated_at).where(User.id == UserStory.assigned_to).scalar_subquery())
+    if "creator" in include:
+        columns.append(select(User.updated_at).where(User.id == UserStory.created_by).scalar_subquery())
+
+    row = db.query(*columns).filter(UserStory.id == story_id).first()
+    return tuple(row) if row else None
+
+
+def get_similar_stories(
+    db: Session, story_id: UUID, k: int = 5
+) -> List[Tuple[UserStory, float]]:
+    """
+    Top-k stories most similar to the given one by title and description
+    
+    Returns:
+        List of (story, cosine similarity) pairs, most similar first
+    """
+    story_similarity.ensure_loaded(db)
+    matches = story_similarity.similar_to_story(story_id, k)
+    if not matches:
+        return []
+    
+    stories = {
+        story.id: story
+        for story in db.query(UserStory).filter(UserStory.id.in_([m[0] for m in matches])).all()
+    }
+    return [(stories[match_id], score) for match_id, score in matches if match_id in stories]
+
+
+def search_story_titles(db: Session, query: str, limit: int = 10) -> List[Tuple[str, str]]:
+    """Typeahead over story titles from the in-memory index, as (id, title) pairs"""
+    title_index.ensure_loaded(db)
+    return title_index.search(query, limit)
+
+
+def _stories_query(
+    db: Session,
+    columns,
     status: Optional[str] = None,
     keyword: Optional[str] = None,
     assignee: Optional[UUID] = None,
-) -> List[UserStory]:
-    query = db.query(UserStory)
+):
+    query = db.query(*columns)
     
     if status:
         try:
@@ -126,7 +220,32 @@ def get_stories(
     if assignee:
         query = query.filter(UserStory.assigned_to == assignee)
     
-    return query.all()
+    return query
+
+
+def get_stories(
+    db: Session, 
+    status: Optional[str] = None,
+    keyword: Optional[str] = None,
+    assignee: Optional[UUID] = None,
+) -> List[UserStory]:
+    return _stories_query(db, (UserStory,), status, keyword, assignee).all()
+
+
+def get_stories_version(
+    db: Session,
+    status: Optional[str] = None,
+    keyword: Optional[str] = None,
+    assignee: Optional[UUID] = None,
+) -> Tuple:
+    """
+    (count, latest updated_at) of the stories get_stories() would return
+
+    Any create, update or delete in the filtered set changes one of the
+    two, so this works as the list's version without loading a row.
+    """
+    columns = (func.count(UserStory.id), func.max(UserStory.updated_at))
+    return tuple(_stories_query(db, columns, status, keyword, assignee).one())
 
 
 def update_story(
@@ -147,9 +266,22 @@ def update_story(
     db.add(db_story)
     db.commit()
     db.refresh(db_story)
+    if "title" in update_data or "description" in update_data:
+        story_similarity.upsert(db_story.id, db_story.title, db_story.description)
+    if "title" in update_data:
+        title_index.upsert(db_story.id, db_story.title, db_story.updated_at)
     return db_story
 
 
+def set_story_gherkin(db_story: UserStory, gherkin: Optional[str]) -> None:
+    """Set a story's Gherkin text together with its parsed form and counts"""
+    ast = parse_gherkin(gherkin)
+    db_story.gherkin_description = gherkin
+    db_story.gherkin_ast = ast
+    db_story.gherkin_scenario_count = ast["scenario_count"] if ast else 0
+    db_story.gherkin_step_count = ast["step_count"] if ast else 0
+
+
 async def update_story_status(
     db: Session, story_id: UUID, new_status: StoryStatus
 ) -> UserStory:
@@ -178,7 +310,7 @@ async def update_story_status(
             fallback_gherkin = claude_service.fallback_gherkin_generation(
                 db_story.title, db_story.description
             )
-            db_story.gherkin_description = fallback_gherkin
+            set_story_gherkin(db_story, fallback_gherkin)
             print(f"Generated fallback Gherkin: {fallback_gherkin[:100]}...")
         else:
             # Use Claude API to generate Gherkin
@@ -192,20 +324,23 @@ async def update_story_status(
                 print(f"Successfully generated Gherkin via Claude API")
                 print(f"Gherkin length: {len(gherkin)} chars")
                 print(f"First 100 chars: {gherkin[:100]}")
-                db_story.gherkin_description = gherkin
+                set_story_gherkin(db_story, gherkin)
             else:
                 # Fallback to basic generation if API call fails
                 print(f"Claude API call failed, using fallback Gherkin generation")
                 fallback_gherkin = claude_service.fallback_gherkin_generation(
                     db_story.title, db_story.description
                 )
-                db_story.gherkin_description = fallback_gherkin
+                set_story_gherkin(db_story, fallback_gherkin)
                 print(f"Generated fallback Gherkin: {fallback_gherkin[:100]}...")
+        
+        add_usage_records(db, story_id, claude_service.calls)
     
     db_story.status = new_status
     db.add(db_story)
     db.commit()
     db.refresh(db_story)
+    step_index.update_story(db_story.id, db_story.gherkin_ast)
     
     print(f"Story updated. New status: {db_story.status}")
     print(f"Has Gherkin content: {'Yes' if db_story.gherkin_description else 'No'}")
@@ -258,69 +393,69 @@ async def generate_description_from_design(db: Session, story_id: UUID) -> Tuple
     if not db_story or not db_story.design_url:
         return None, None
     
+    print(f"\nGenerating description from design for story ID: {story_id}")
+    # Served from the speculative job started when the design was attached,
+    # if there is one for this URL
+    generated_description = await design_analysis_jobs.get_result(story_id, db_story.design_url)
+    return db_story, generated_description
+
+
+async def generate_description_from_image(
+    design_url: Optional[str] = None,
+    image_data: Optional[bytes] = None,
+    media_type: Optional[str] = None,
+    story_id: Optional[UUID] = None,
+) -> str:
+    """
+    Generate a description from a design image without touching any story
+    
+    Args:
+        design_url: URL of the design image
+        image_data: Raw bytes of an uploaded design image
+        media_type: MIME type of the uploaded image
+        story_id: Story to attribute the Claude usage to, if any
+        
+    Returns:
+        Generated description, or the fallback description if analysis failed
+    """
     print(f"\n\n========= GENERATING DESCRIPTION FROM DESIGN ==========")
-    print(f"Story ID: {story_id}")
-    print(f"Design URL: {db_story.design_url}")
+    if image_data is not None:
+        print(f"Design upload: {len(image_data)} bytes ({media_type})")
+    else:
+        print(f"Design URL: {design_url}")
     
     # Create Claude service
     claude_service = ClaudeService()
     
     try:
         # Call Claude API to analyze the image
-        generated_description = await claude_service.analyze_design_image(db_story.design_url)
+        generated_description = await claude_service.analyze_design_image(
+            image_url=design_url, image_data=image_data, media_type=media_type
+        )
         
         if generated_description:
             print(f"Successfully generated description")
             print(f"Description length: {len(generated_description)} chars")
             print(f"First 100 chars: {generated_description[:100]}")
-            return db_story, generated_description
+            return generated_description
         else:
             # This shouldn't happen now since we're always returning a fallback
             print(f"No description was generated, using fallback")
-            fallback_description = claude_service.fallback_design_analysis()
-            return db_story, fallback_description
+            return claude_service.fallback_design_analysis()
             
     except Exception as e:
         print(f"ERROR: Failed to generate description from design: {str(e)}")
         # Return fallback in case of any exception
         fallback_description = claude_service.fallback_design_analysis()
         print(f"Generated fallback description: {fallback_description[:100]}...")
-        return db_story, fallback_description
+        return fallback_description
         
     finally:
+        # Runs on the event loop: keep the database write off it
+        await run_in_threadpool(save_usage_records, story_id, claude_service.calls)
         print(f"============================================\n\n")
 
 
 def convert_to_gherkin(title: str, description: str) -> str:
     """Convert description to Gherkin format"""
-    gherkin = f"Feature: {title}\n"
-    gherkin += f"  Scenario: {title}\n"
-    
-    # Very simple parsing logic - in a real app, this would be more sophisticated
-    sentences = description.replace(".", ".\n").split("\n")
-    
-    given_done = False
-    when_done = False
-    
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
-            continue
-            
-        if not given_done:
-            gherkin += f"    Given {sentence}\n"
-            given_done = True
-        elif not when_done:
-            gherkin += f"    When {sentence}\n"
-            when_done = True
-        else:
-            gherkin += f"    Then {sentence}\n"
-    
-    # Ensure we have at least a basic structure
-    if not given_done:
-        gherkin += "    Given initial context\n"
-    if not when_done:
-        gherkin += "    When action is performed\n"
-        gherkin += "    Then expected outcome\n"
-    
-    return gherkin
+    return offline_gherkin(title, description)
@@ -5,3 +5,7 @@ from app.models.user import User
 from app.models.user_story import UserStory
 from app.models.task import Task
 from app.models.document import Document
+from app.models.document_version import DocumentVersion
+from app.models.document_search import DocumentSearchEntry
+from app.models.llm_usage import LlmUsage
+from app.models.sync_tombstone import SyncPruneHorizon, SyncTombstone
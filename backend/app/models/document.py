@@ -1,6 +1,6 @@
 import uuid
-from sqlalchemy import Column, String, Enum, ForeignKey, DateTime
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Enum, ForeignKey, DateTime, BigInteger, Integer
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -29,6 +29,11 @@ class Document(Base):
         nullable=False
     )
     url = Column(String, nullable=False)
+    # SHA-256 of the stored blob; identical uploads share one file
+    content_hash = Column(String(64), nullable=True, index=True)
+    size_bytes = Column(BigInteger, nullable=True)
+    # Latest version number; earlier versions live in document_versions
+    version = Column(Integer, default=1, nullable=False)
     uploaded_by = Column(
         UUID(as_uuid=True), 
         ForeignKey("users.id"), 
@@ -39,7 +44,16 @@ class Document(Base):
         default=ValidationStatus.PENDING, 
         nullable=False
     )
+    # Hash of the content the stored validation result was computed for
+    validated_hash = Column(String(64), nullable=True)
+    validation_errors = Column(JSONB, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     uploader = relationship("User", foreign_keys=[uploaded_by])
+    versions = relationship(
+        "DocumentVersion",
+        back_populates="document",
+        cascade="all, delete-orphan",
+        order_by="DocumentVersion.version"
+    )
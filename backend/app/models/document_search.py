@@ -0,0 +1,36 @@
+from sqlalchemy import Column, String, Text, ForeignKey, DateTime, Computed, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class DocumentSearchEntry(Base):
+    """Text extracted from a document's current version, for full-text search"""
+
+    __tablename__ = "document_search"
+    __table_args__ = (
+        Index("ix_document_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+    document_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    content_hash = Column(String(64), nullable=False)
+    name = Column(String, nullable=False)
+    # Paths, operationIds, schema names... as written, to show what matched
+    identifiers = Column(JSONB, nullable=False, default=list)
+    keywords = Column(Text, nullable=False, default="")
+    body = Column(Text, nullable=False, default="")
+    # Names and identifiers outrank prose; 'simple' keeps identifiers unstemmed
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(keywords, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(body, '')), 'B')",
+            persisted=True
+        )
+    )
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
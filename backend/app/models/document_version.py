@@ -0,0 +1,40 @@
+import uuid
+from sqlalchemy import Column, String, Integer, BigInteger, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class DocumentVersion(Base):
+    __tablename__ = "document_versions"
+    __table_args__ = (
+        UniqueConstraint("document_id", "version", name="uq_document_versions_document_version"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
+    document_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    version = Column(Integer, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
+    extension = Column(String, nullable=False, default="")
+    # [[chunk sha256, length], ...] in file order; see app.services.chunk_store
+    chunks = Column(JSONB, nullable=False)
+    # Bytes of chunks this version added to the store
+    stored_bytes = Column(BigInteger, nullable=False, default=0)
+    uploaded_by = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id"),
+        nullable=False
+    )
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    document = relationship("Document", back_populates="versions")
+    uploader = relationship("User", foreign_keys=[uploaded_by])
@@ -0,0 +1,28 @@
+import uuid
+from sqlalchemy import Column, String, Integer, Float, Boolean, ForeignKey, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+
+from app.db.base_class import Base
+
+
+class LlmUsage(Base):
+    __tablename__ = "llm_usage"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
+    story_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("user_stories.id", ondelete="CASCADE"),
+        nullable=True,
+        index=True
+    )
+    endpoint = Column(String, nullable=False)  # "gherkin" or "vision"
+    model = Column(String, nullable=True)
+    status = Column(String, nullable=False)
+    input_tokens = Column(Integer, default=0, nullable=False)
+    output_tokens = Column(Integer, default=0, nullable=False)
+    wall_ms = Column(Float, nullable=True)
+    ttfb_ms = Column(Float, nullable=True)
+    retries = Column(Integer, default=0, nullable=False)
+    fallback_used = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, String, BigInteger, DateTime, Integer, Sequence, text
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+
+from app.db.base_class import Base
+
+# Shared by stories, tasks and tombstones: one ordering for GET /sync cursors
+CHANGE_SEQ = Sequence("change_seq", metadata=Base.metadata)
+
+
+def change_seq_column() -> Column:
+    """Bumped from CHANGE_SEQ on every insert and update of the row"""
+    return Column(
+        BigInteger,
+        server_default=text("nextval('change_seq')"),
+        onupdate=CHANGE_SEQ.next_value(),
+        nullable=False,
+        index=True,
+    )
+
+
+class SyncTombstone(Base):
+    """A deleted story or task, so syncing clients learn to drop their copy"""
+
+    __tablename__ = "sync_tombstones"
+
+    change_seq = Column(BigInteger, server_default=text("nextval('change_seq')"), primary_key=True)
+    entity = Column(String, nullable=False)  # "story" or "task"
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    story_id = Column(UUID(as_uuid=True), nullable=True)
+    deleted_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class SyncPruneHorizon(Base):
+    """Single row: the highest change_seq whose tombstones were pruned"""
+
+    __tablename__ = "sync_prune_horizon"
+
+    id = Column(Integer, primary_key=True, default=1)
+    change_seq = Column(BigInteger, nullable=False, default=0)
+    pruned_at = Column(DateTime, default=datetime.utcnow)
@@ -1,11 +1,12 @@
 import uuid
-from sqlalchemy import Column, String, Text, Enum, ForeignKey, DateTime
+from sqlalchemy import Column, String, Text, Enum, ForeignKey, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
 
 from app.db.base_class import Base
+from app.models.sync_tombstone import change_seq_column
 
 
 class TaskStatus(enum.Enum):
@@ -41,7 +42,13 @@ class Task(Base):
         default=datetime.utcnow, 
         onupdate=datetime.utcnow
     )
+    change_seq = change_seq_column()
     
     # Relationships
     user_story = relationship("UserStory", back_populates="tasks")
     assigned_user = relationship("User", foreign_keys=[assignee])
+    
+    __table_args__ = (
+        # A story's task list and its version (count, max updated_at) come from this index
+        Index("ix_tasks_story_id_updated_at", "story_id", "updated_at"),
+    )
@@ -1,11 +1,12 @@
 import uuid
-from sqlalchemy import Column, String, Text, Enum, ForeignKey, DateTime
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, Enum, ForeignKey, DateTime, Integer, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
 
 from app.db.base_class import Base
+from app.models.sync_tombstone import change_seq_column
 
 
 class StoryStatus(enum.Enum):
@@ -34,6 +35,10 @@ class UserStory(Base):
     title = Column(String, nullable=False)
     description = Column(Text, nullable=False)
     gherkin_description = Column(Text, nullable=True)
+    # Parsed form of gherkin_description, see app.services.gherkin_parser
+    gherkin_ast = Column(JSONB, nullable=True)
+    gherkin_scenario_count = Column(Integer, default=0, nullable=False)
+    gherkin_step_count = Column(Integer, default=0, nullable=False)
     design_url = Column(String, nullable=True)  # URL to the design image
     status = Column(
         Enum(StoryStatus), 
@@ -56,8 +61,19 @@ class UserStory(Base):
         default=datetime.utcnow, 
         onupdate=datetime.utcnow
     )
+    change_seq = change_seq_column()
     
     # Relationships
     creator = relationship("User", foreign_keys=[created_by])
     assignee = relationship("User", foreign_keys=[assigned_to])
     tasks = relationship("Task", back_populates="user_story", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Coverage aggregates by status are answered from this index alone
+        Index(
+            "ix_user_stories_status_gherkin_counts",
+            "status", "gherkin_scenario_count", "gherkin_step_count"
+        ),
+        # Latest change for list ETags
+        Index("ix_user_stories_updated_at", "updated_at"),
+    )
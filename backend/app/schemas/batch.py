@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+
+# One API call inside a batch, e.g. {"method": "GET", "url": "/stories/?status=DRAFT"}
+class BatchRequestItem(BaseModel):
+    method: str = Field("GET", pattern="^(GET|POST|PUT|PATCH|DELETE)$")
+    url: str = Field(..., pattern="^/")
+    headers: Dict[str, str] = {}
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchRequestItem]
+
+
+# Result of one call, in the same position as its request
+class BatchResponseItem(BaseModel):
+    status: int
+    headers: Dict[str, str] = {}
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchResponseItem]
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+# Result of ingesting a design image
+class DesignIngestResult(BaseModel):
+    digest: str
+    media_type: str
+    size: int
+    width: Optional[int] = None
+    height: Optional[int] = None
+    image_url: str
+    thumbnail_url: Optional[str] = None
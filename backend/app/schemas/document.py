@@ -1,5 +1,5 @@
 from pydantic import BaseModel, UUID4
-from typing import Optional
+from typing import Any, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -15,6 +15,12 @@ class ValidationStatus(str, Enum):
     INVALID = "INVALID"
 
 
+# A validation problem and the JSON pointer of the node it concerns
+class ValidationIssue(BaseModel):
+    pointer: str
+    message: str
+
+
 # Shared properties
 class DocumentBase(BaseModel):
     name: Optional[str] = None
@@ -33,8 +39,12 @@ class DocumentInDBBase(DocumentBase):
     name: str
     type: DocumentType
     url: str
+    content_hash: Optional[str] = None
+    size_bytes: Optional[int] = None
+    version: int = 1
     uploaded_by: UUID4
     validation_status: ValidationStatus
+    validation_errors: Optional[list[ValidationIssue]] = None
     created_at: datetime
 
     class Config:
@@ -50,4 +60,55 @@ class Document(DocumentInDBBase):
 class DocumentValidationResult(BaseModel):
     document_id: UUID4
     status: ValidationStatus
-    errors: Optional[list[str]] = None
+    errors: Optional[list[str]] = None  # "pointer: message" for display
+    issues: Optional[list[ValidationIssue]] = None
+
+
+# Outcome of scheduling a bulk revalidation
+class DocumentRevalidation(BaseModel):
+    scheduled: int
+    skipped: int
+
+
+# A stored version of a document
+class DocumentVersion(BaseModel):
+    id: UUID4
+    document_id: UUID4
+    version: int
+    content_hash: str
+    size_bytes: int
+    stored_bytes: int  # New chunk bytes this version added to storage
+    uploaded_by: UUID4
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# One difference between two versions, at a JSON pointer
+class DocumentChange(BaseModel):
+    op: str  # "added", "removed" or "changed"
+    pointer: str
+    before: Optional[Any] = None
+    after: Optional[Any] = None
+
+
+class DocumentDiff(BaseModel):
+    document_id: UUID4
+    from_version: int
+    to_version: int
+    structural: bool  # False when compared line by line
+    changes: list[DocumentChange]
+    truncated: bool = False
+
+
+# A document matching a search, with the identifiers that matched
+class DocumentSearchHit(BaseModel):
+    document: Document
+    rank: float
+    matches: list[str] = []
+
+
+class DocumentSearchResults(BaseModel):
+    total: int
+    items: list[DocumentSearchHit]
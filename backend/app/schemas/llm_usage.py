@@ -0,0 +1,32 @@
+from pydantic import BaseModel, UUID4
+from typing import Optional, List
+from datetime import datetime
+
+
+# A single recorded Claude API call
+class LlmUsage(BaseModel):
+    id: UUID4
+    story_id: Optional[UUID4] = None
+    endpoint: str
+    model: Optional[str] = None
+    status: str
+    input_tokens: int
+    output_tokens: int
+    wall_ms: Optional[float] = None
+    ttfb_ms: Optional[float] = None
+    retries: int
+    fallback_used: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# Usage of a story, with totals across all its calls
+class StoryLlmUsage(BaseModel):
+    story_id: UUID4
+    total_calls: int
+    total_input_tokens: int
+    total_output_tokens: int
+    total_wall_ms: float
+    calls: List[LlmUsage]
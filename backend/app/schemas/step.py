@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+
+# A Gherkin step from the shared step library
+class Step(BaseModel):
+    keyword: str
+    text: str
+    story_count: int
+    usage_count: int
+
+
+# A step suggested for a partial query
+class StepSuggestion(Step):
+    similarity: float
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, UUID4
+from typing import List, Optional
+
+from app.schemas.task import Task
+from app.schemas.user_story import UserStory
+
+
+# A story or task deleted since the cursor
+class SyncDeletion(BaseModel):
+    entity: str
+    id: UUID4
+    story_id: Optional[UUID4] = None
+
+
+# Changes since a cursor; pass cursor back as ?since= for the next page or sync.
+# reset means deletions since the cursor were pruned: drop the local copy
+# and sync again from 0
+class SyncChanges(BaseModel):
+    cursor: int
+    has_more: bool
+    reset: bool = False
+    stories: List[UserStory] = []
+    tasks: List[Task] = []
+    deleted: List[SyncDeletion] = []
@@ -3,6 +3,9 @@ from typing import Optional, List
 from datetime import datetime
 from enum import Enum
 
+from app.schemas.task import Task
+from app.schemas.user import User
+
 
 class StoryStatus(str, Enum):
     DRAFT = "DRAFT"
@@ -80,3 +83,30 @@ class UserStoryInDBBase(UserStoryBase):
 # Additional properties to return via API
 class UserStory(UserStoryInDBBase):
     pass
+
+
+# Story with the related records requested through ?include=, unset ones are omitted
+class UserStoryDetail(UserStory):
+    tasks: Optional[List[Task]] = None
+    assignee: Optional[User] = None
+    creator: Optional[User] = None
+
+
+
+# A story similar to another one, for duplicate detection
+class SimilarStory(BaseModel):
+    id: UUID4
+    title: str
+    status: StoryStatus
+    score: float
+
+
+# Response for story creation, flagging possible duplicates
+class UserStoryCreated(UserStory):
+    similar_stories: List[SimilarStory] = []
+
+
+# Typeahead match on a story title
+class StoryTitleMatch(BaseModel):
+    id: UUID4
+    title: str
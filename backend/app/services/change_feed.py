@@ -0,0 +1,182 @@
+"""
+Change events for stories, tasks and documents, fanned out to live clients
+
+Every flush that inserts, updates or deletes one of these rows sends a
+compact event through Postgres NOTIFY on the same connection, so events
+are published exactly when the write commits and never for a rollback.
+Every worker LISTENs and hands events to its subscribers, which filter
+by story or assignee:
+
+    {"entity": "task", "op": "update", "id": "...", "story_id": "...",
+     "assignee": "...", "status": "DEVELOPMENT", "title": "...",
+     "updated_at": "..."}
+
+Events carry the fields list views show, so clients can patch local state
+instead of refetching. A deleted story's tasks are not announced one by
+one: clients drop them with the story.
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.document import Document
+from app.models.task import Task
+from app.models.user_story import UserStory
+from app.services.pg_listener import notify, pg_listener
+
+CHANGE_CHANNEL = "change_feed"
+# NOTIFY payloads must stay under 8000 bytes
+MAX_TITLE_CHARS = 200
+
+
+def _value(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if hasattr(value, "name") and hasattr(value, "value"):
+        return value.value
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _previous(obj: Any, attribute: str) -> Any:
+    """The value an attribute had before this flush, if it changed"""
+    history = inspect(obj).attrs[attribute].history
+    return _value(history.deleted[0]) if history.deleted else None
+
+
+def change_event(obj: Any, op: str) -> Optional[Dict[str, Any]]:
+    if not isinstance(obj, (UserStory, Task, Document)):
+        return None
+    # Only what is already loaded: a deleted row's expired attributes can't be refreshed
+    state = inspect(obj)
+    values = state.dict
+    row_id = str(state.identity[0]) if state.identity else _value(values.get("id"))
+
+    if isinstance(obj, UserStory):
+        change = {
+            "entity": "story",
+            "id": row_id,
+            "story_id": row_id,
+            "assignee": _value(values.get("assigned_to")),
+            "status": _value(values.get("status")),
+            "title": (values.get("title") or "")[:MAX_TITLE_CHARS],
+            "updated_at": _value(values.get("updated_at")),
+        }
+        assignee_attribute = "assigned_to"
+    elif isinstance(obj, Task):
+        change = {
+            "entity": "task",
+            "id": row_id,
+            "story_id": _value(values.get("story_id")),
+            "assignee": _value(values.get("assignee")),
+            "status": _value(values.get("status")),
+            "title": (values.get("title") or "")[:MAX_TITLE_CHARS],
+            "updated_at": _value(values.get("updated_at")),
+        }
+        assignee_attribute = "assignee"
+    else:
+        change = {
+            "entity": "document",
+            "id": row_id,
+            "name": (values.get("name") or "")[:MAX_TITLE_CHARS],
+            "version": values.get("version"),
+            "validation_status": _value(values.get("validation_status")),
+        }
+        assignee_attribute = None
+
+    change["op"] = op
+    if op == "update" and assignee_attribute:
+        previous_assignee = _previous(obj, assignee_attribute)
+        if previous_assignee is not None:
+            # Lets the previous assignee's subscribers drop the item
+            change["previous_assignee"] = previous_assignee
+    return change
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _publish_changes(session: Session, flush_context) -> None:
+    if session.bind is None or session.bind.dialect.name != "postgresql":
+        return
+    changes = []
+    for op, objects in (("insert", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objects:
+            if op == "update" and not session.is_modified(obj, include_collections=False):
+                continue
+            change = change_event(obj, op)
+            if change is not None:
+                changes.append(change)
+    if not changes:
+        return
+    connection = session.connection()
+    for change in changes:
+        notify(connection, CHANGE_CHANNEL, json.dumps(change, separators=(",", ":")))
+
+
+class Subscription:
+    """One client's filtered, bounded queue of events"""
+
+    def __init__(self, story_id: Optional[UUID] = None, assignee: Optional[UUID] = None):
+        self.story_id = str(story_id) if story_id else None
+        self.assignee = str(assignee) if assignee else None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.CHANGE_FEED_QUEUE_SIZE)
+
+    def matches(self, change: Dict[str, Any]) -> bool:
+        if self.story_id and change.get("story_id") != self.story_id:
+            return False
+        if self.assignee and self.assignee not in (change.get("assignee"), change.get("previous_assignee")):
+            return False
+        return True
+
+    def put(self, change: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(change)
+        except asyncio.QueueFull:
+            # Too slow to keep up: drop the backlog, the client refetches instead
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+
+class ChangeFeedHub:
+    def __init__(self):
+        self._subscribers: Set[Subscription] = set()
+        self._started = False
+
+    async def start(self) -> None:
+        if self._started:
+            return
+        pg_listener.add_handler(CHANGE_CHANNEL, self.publish)
+        pg_listener.on_reconnect(self.resync)
+        await pg_listener.start()
+        self._started = True
+
+    def subscribe(self, story_id: Optional[UUID] = None, assignee: Optional[UUID] = None) -> Subscription:
+        subscription = Subscription(story_id, assignee)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def publish(self, payload: str) -> None:
+        change = json.loads(payload)
+        change.setdefault("type", "change")
+        for subscription in list(self._subscribers):
+            if subscription.matches(change):
+                subscription.put(change)
+
+    def resync(self) -> None:
+        """Events may have been missed while the listener was reconnecting"""
+        for subscription in list(self._subscribers):
+            subscription.put({"type": "resync"})
+
+
+change_feed = ChangeFeedHub()
@@ -2,14 +2,82 @@ import os
 import aiohttp
 import json
 import base64
-from typing import Optional, Dict, Any, Union
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Union, List, Tuple
 from app.core.config import settings
+from app.core.metrics import registry
+from app.services.design_ingest import DesignIngestService
+from app.services.gherkin_generator import generate_gherkin as offline_gherkin
+from app.services.gherkin_routing import GherkinRoute, GherkinRoutingPolicy
+
+CLAUDE_REQUESTS = registry.counter(
+    "claude_requests_total", "Claude API calls", ["endpoint", "model", "status"]
+)
+CLAUDE_TOKENS = registry.counter(
+    "claude_tokens_total", "Tokens reported in Claude API usage", ["endpoint", "model", "direction"]
+)
+CLAUDE_DURATION = registry.histogram(
+    "claude_request_duration_seconds", "Wall time of Claude API calls", ["endpoint", "model"]
+)
+CLAUDE_TTFB = registry.histogram(
+    "claude_time_to_first_byte_seconds", "Time until Claude API response headers arrive", ["endpoint", "model"]
+)
+CLAUDE_RETRIES = registry.counter(
+    "claude_retries_total", "Claude API calls retried", ["endpoint", "model"]
+)
+CLAUDE_FALLBACKS = registry.counter(
+    "claude_fallbacks_total", "Results produced by a fallback instead of Claude", ["endpoint"]
+)
+CLAUDE_CACHE_HITS = registry.counter(
+    "claude_cache_hits_total", "Claude results served from cache", ["endpoint"]
+)
+
+
+class ClaudeCallRecord:
+    """Usage and latency of one Claude API call (or of a fallback used instead)"""
+    
+    def __init__(self, endpoint: str, model: Optional[str]):
+        self.endpoint = endpoint
+        self.model = model
+        self.status = "error"
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.retries = 0
+        self.fallback_used = False
+        self.started_at = time.perf_counter()
+        self.ttfb_ms: Optional[float] = None
+        self.wall_ms: Optional[float] = None
+    
+    def mark_first_byte(self) -> None:
+        self.ttfb_ms = (time.perf_counter() - self.started_at) * 1000
+    
+    def set_usage(self, usage: Optional[Dict[str, Any]]) -> None:
+        if usage:
+            self.input_tokens = usage.get("input_tokens", 0) or 0
+            self.output_tokens = usage.get("output_tokens", 0) or 0
+
 
 class ClaudeService:
     """Service for interacting with Claude AI API"""
     
     BASE_URL = "https://api.anthropic.com/v1/messages"
     
+    # Successful design analyses, keyed by image URL or content hash.
+    # Shared across instances since a new service is created per request.
+    DESIGN_CACHE_SIZE = 256
+    _design_cache: "OrderedDict[str, str]" = OrderedDict()
+    
+    # Returned when image analysis fails; callers must not cache it
+    FALLBACK_DESIGN_ANALYSIS = """The design shows a user interface for a software application. 
+        The interface appears to include navigation elements, content areas, and interactive components.
+        Users can likely interact with various elements on the screen to accomplish tasks within the application.
+        The layout follows a structured approach with clear organization of information and functionality.
+        
+        Additional details would be needed to specify the exact requirements and functionality represented in this design.
+        """
+    
     def __init__(self):
         """Initialize Claude service with API key from settings"""
         self.api_key = settings.CLAUDE_API_KEY
@@ -17,11 +85,49 @@ class ClaudeService:
             print("WARNING: CLAUDE_API_KEY not set in environment. API calls will fail.")
         else:
             print(f"Claude API key found. Length: {len(self.api_key)} characters.")
+        # Calls made through this instance, persisted per story by the caller
+        self.calls: List[ClaudeCallRecord] = []
+    
+    def _start_call(self, endpoint: str, model: Optional[str]) -> ClaudeCallRecord:
+        record = ClaudeCallRecord(endpoint, model)
+        self.calls.append(record)
+        return record
+    
+    def _finish_call(self, record: ClaudeCallRecord) -> None:
+        """Stop the clock on a call and publish its metrics"""
+        record.wall_ms = (time.perf_counter() - record.started_at) * 1000
+        model = record.model or ""
+        CLAUDE_REQUESTS.inc(endpoint=record.endpoint, model=model, status=record.status)
+        CLAUDE_DURATION.observe(record.wall_ms / 1000, endpoint=record.endpoint, model=model)
+        if record.ttfb_ms is not None:
+            CLAUDE_TTFB.observe(record.ttfb_ms / 1000, endpoint=record.endpoint, model=model)
+        if record.retries:
+            CLAUDE_RETRIES.inc(record.retries, endpoint=record.endpoint, model=model)
+        CLAUDE_TOKENS.inc(record.input_tokens, endpoint=record.endpoint, model=model, direction="input")
+        CLAUDE_TOKENS.inc(record.output_tokens, endpoint=record.endpoint, model=model, direction="output")
+        print(f"Claude {record.endpoint} call: status={record.status} wall={record.wall_ms:.0f}ms "
+              f"ttfb={record.ttfb_ms or 0:.0f}ms tokens={record.input_tokens}/{record.output_tokens}")
+    
+    def _mark_fallback(self, endpoint: str) -> None:
+        """Flag the latest call for this endpoint as answered by a fallback"""
+        CLAUDE_FALLBACKS.inc(endpoint=endpoint)
+        for record in reversed(self.calls):
+            if record.endpoint == endpoint:
+                record.fallback_used = True
+                return
+        # No API call was attempted (e.g. no API key): record the fallback alone
+        record = self._start_call(endpoint, None)
+        record.status = "skipped"
+        record.fallback_used = True
+        record.wall_ms = 0
     
     async def generate_gherkin(self, title: str, description: str) -> Optional[str]:
         """
         Generate Gherkin specification from user story description
         
+        The model and max_tokens are chosen by GherkinRoutingPolicy. Output
+        that fails validation is regenerated once on the larger model.
+        
         Args:
             title: The user story title
             description: The user story description
@@ -45,12 +151,43 @@ Output the Gherkin specification only, without additional explanations.
 """
 
         print(f"\nSending request to Claude API with prompt length: {len(prompt)} chars")
-
+        policy = GherkinRoutingPolicy()
+        route = policy.route(title, description)
+        retries = 0
+        gherkin_text = None
+        
+        while route is not None:
+            print(f"Routing Gherkin generation: {route}")
+            record = self._start_call("gherkin", route.model)
+            record.retries = retries
+            gherkin_text, stop_reason = await self._request_gherkin(prompt, route, record)
+            
+            if gherkin_text is None:
+                policy.record_outcome(route, "error", record.wall_ms)
+                return None
+            
+            if policy.validate(gherkin_text, stop_reason):
+                policy.record_outcome(route, "valid", record.wall_ms)
+                return gherkin_text
+            
+            print(f"Gherkin from {route.model} failed validation (stop_reason: {stop_reason})")
+            policy.record_outcome(route, "invalid", record.wall_ms)
+            route = policy.escalate(route)
+            retries += 1
+        
+        # Even the large model's output failed validation; it is still the
+        # best answer available
+        return gherkin_text
+    
+    async def _request_gherkin(
+        self, prompt: str, route: GherkinRoute, record: ClaudeCallRecord
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Send one Gherkin request and return (text, stop_reason)"""
         try:
             # Set up the request payload
             payload = {
-                "model": "claude-3-sonnet-20240229",
-                "max_tokens": 1000,
+                "model": route.model,
+                "max_tokens": route.max_tokens,
                 "temperature": 0,
                 "messages": [
                     {
@@ -75,44 +212,133 @@ Output the Gherkin specification only, without additional explanations.
                     headers=headers, 
                     json=payload
                 ) as response:
+                    record.mark_first_byte()
                     status_code = response.status
                     print(f"Claude API response status: {status_code}")
                     
                     if status_code != 200:
+                        record.status = f"http_{status_code}"
                         error_text = await response.text()
                         print(f"ERROR from Claude API: {error_text}")
-                        return None
+                        return None, None
                     
                     result = await response.json()
                     print(f"Received response from Claude API: {type(result)}")
+                    record.set_usage(result.get("usage") if result else None)
                     
                     # Extract the response content
                     if result and "content" in result and len(result["content"]) > 0:
                         # Get the text from the response
                         gherkin_text = result["content"][0]["text"]
                         print(f"Successfully extracted Gherkin text, length: {len(gherkin_text)} chars")
-                        return gherkin_text
+                        record.status = "ok"
+                        return gherkin_text, result.get("stop_reason")
                     else:
                         print(f"Failed to extract content from Claude API response: {result}")
-                        return None
+                        return None, None
                     
         except Exception as e:
             print(f"EXCEPTION when calling Claude API: {str(e)}")
             # Print traceback for more details
             import traceback
             traceback.print_exc()
-            return None
+            return None, None
+        
+        finally:
+            self._finish_call(record)
+    
+    @staticmethod
+    def design_cache_key(
+        image_url: Optional[str] = None, image_data: Optional[bytes] = None
+    ) -> str:
+        """
+        Build the cache key for a design image
+        
+        Uploaded images are keyed by content so that re-uploads of the same
+        file hit the cache regardless of filename.
+        """
+        if image_data is not None:
+            return f"sha256:{hashlib.sha256(image_data).hexdigest()}"
+        return f"url:{image_url}"
+    
+    def get_cached_design_analysis(self, cache_key: str) -> Optional[str]:
+        """Return a previously generated description for this image, if any"""
+        description = self._design_cache.get(cache_key)
+        if description is not None:
+            self._design_cache.move_to_end(cache_key)
+        return description
+    
+    def cache_design_analysis(self, cache_key: str, description: str) -> None:
+        """Remember a generated description, evicting the oldest entries"""
+        self._design_cache[cache_key] = description
+        self._design_cache.move_to_end(cache_key)
+        while len(self._design_cache) > self.DESIGN_CACHE_SIZE:
+            self._design_cache.popitem(last=False)
+    
+    async def _prepare_image_source(
+        self,
+        image_url: Optional[str],
+        image_data: Optional[bytes],
+        media_type: Optional[str],
+    ) -> Dict[str, Any]:
+        """
+        Build the image block for a vision request
+        
+        The image is ingested (downscaled and stored locally) and sent inline
+        as base64. If ingest fails, the original bytes or URL are sent instead.
+        """
+        ingest_service = DesignIngestService()
+        try:
+            if image_data is not None:
+                ingested = await ingest_service.ingest_bytes(image_data, media_type)
+            else:
+                ingested = await ingest_service.ingest_url(image_url)
+        except Exception as e:
+            print(f"Design ingest failed, sending original image: {str(e)}")
+            ingested = None
+        
+        if ingested is not None:
+            print(f"Using ingested design {ingested.digest[:12]}: {len(ingested.data)} bytes "
+                  f"({ingested.media_type}, {ingested.width}x{ingested.height})")
+            image_data, media_type = ingested.data, ingested.media_type
+        
+        if image_data is not None:
+            return {
+                "type": "base64",
+                "media_type": media_type or "image/png",
+                "data": base64.b64encode(image_data).decode("ascii")
+            }
+        
+        print(f"Using image URL: {image_url}")
+        return {
+            "type": "url",
+            "url": image_url
+        }
     
-    async def analyze_design_image(self, image_url: str) -> Optional[str]:
+    async def analyze_design_image(
+        self,
+        image_url: Optional[str] = None,
+        image_data: Optional[bytes] = None,
+        media_type: Optional[str] = None,
+    ) -> Optional[str]:
         """
         Analyze a design image using Claude's vision capabilities to generate a description
         
         Args:
             image_url: URL to the design image
+            image_data: Raw image bytes, sent inline instead of a URL
+            media_type: MIME type of image_data (e.g. "image/png")
             
         Returns:
             Generated description or None if the request failed
         """
+        cache_key = self.design_cache_key(image_url, image_data)
+        cached_description = self.get_cached_design_analysis(cache_key)
+        if cached_description is not None:
+            print(f"Using cached design analysis for {cache_key[:80]}")
+            CLAUDE_CACHE_HITS.inc(endpoint="vision")
+            return cached_description
+        
         if not self.api_key:
             print("ERROR: CLAUDE_API_KEY not set, cannot analyze image. Using fallback.")
             return self.fallback_design_analysis()
@@ -132,12 +358,14 @@ Output the Gherkin specification only, without additional explanations.
         """
 
         print(f"\nSending image analysis request to Claude API with prompt length: {len(prompt)} chars")
-        print(f"Using image URL: {image_url}")
+        image_source = await self._prepare_image_source(image_url, image_data, media_type)
+        model = "claude-3-sonnet-20240229"
+        record = self._start_call("vision", model)
 
         try:
             # Set up the request payload for vision analysis
             payload = {
-                "model": "claude-3-sonnet-20240229",
+                "model": model,
                 "max_tokens": 1000,
                 "temperature": 0,
                 "messages": [
@@ -150,17 +378,14 @@ Output the Gherkin specification only, without additional explanations.
                             },
                             {
                                 "type": "image",
-                                "source": {
-                                    "type": "url",
-                                    "url": image_url
-                                }
+                                "source": image_source
                             }
                         ]
                     }
                 ]
             }
             
-            print(f"Claude API payload prepared: {json.dumps(payload, indent=2)[:200]}...")
+            print(f"Claude API payload prepared (image source: {image_source['type']})")
             
             # Create headers
             headers = {
@@ -181,6 +406,7 @@ Output the Gherkin specification only, without additional explanations.
                         json=payload,
                         timeout=30  # Adding a timeout
                     ) as response:
+                        record.mark_first_byte()
                         status_code = response.status
                         print(f"Claude API response status: {status_code}")
                         
@@ -188,18 +414,22 @@ Output the Gherkin specification only, without additional explanations.
                         print(f"Response text sample: {response_text[:200]}...")
                         
                         if status_code != 200:
+                            record.status = f"http_{status_code}"
                             print(f"ERROR from Claude API: {response_text}")
                             print("Using fallback design analysis")
                             return self.fallback_design_analysis()
                         
                         result = json.loads(response_text)
                         print(f"Parsed JSON response, keys: {list(result.keys())}")
+                        record.set_usage(result.get("usage"))
                         
                         # Extract the response content
                         if result and "content" in result and len(result["content"]) > 0:
                             # Get the text from the response
                             generated_text = result["content"][0]["text"]
                             print(f"Successfully extracted generated text, length: {len(generated_text)} chars")
+                            self.cache_design_analysis(cache_key, generated_text)
+                            record.status = "ok"
                             return generated_text
                         else:
                             print(f"Failed to extract content from Claude API response")
@@ -217,6 +447,9 @@ Output the Gherkin specification only, without additional explanations.
             traceback.print_exc()
             print("Using fallback design analysis")
             return self.fallback_design_analysis()
+        
+        finally:
+            self._finish_call(record)
             
     def fallback_gherkin_generation(self, title: str, description: str) -> str:
         """
@@ -230,54 +463,9 @@ Output the Gherkin specification only, without additional explanations.
             String containing the basic Gherkin format
         """
         print("\nGenerating fallback Gherkin format...")
+        self._mark_fallback("gherkin")
         
-        # Clean up the title for feature name
-        feature_name = title.strip()
-        
-        # Create a clean scenario name
-        scenario_name = title.strip()
-        if scenario_name.lower().startswith("hu"):
-            # Remove the HU identifier if present (e.g., "HU01 - Some title" -> "Some title")
-            parts = scenario_name.split("-", 1)
-            if len(parts) > 1:
-                scenario_name = parts[1].strip()
-        
-        # Start building the Gherkin
-        gherkin = f"Feature: {feature_name}\n\n"
-        gherkin += f"  Scenario: {scenario_name}\n"
-        
-        # Process the description to extract Given/When/Then
-        sentences = [s.strip() for s in description.replace(".", ".\n").split("\n") if s.strip()]
-        
-        # Determine the appropriate structure based on sentence count
-        if len(sentences) >= 3:
-            # If we have 3+ sentences, use the first three for Given/When/Then
-            gherkin += f"    Given {sentences[0]}\n"
-            gherkin += f"    When {sentences[1]}\n"
-            gherkin += f"    Then {sentences[2]}\n"
-            
-            # Add any additional sentences as And clauses
-            for i, sentence in enumerate(sentences[3:]):
-                gherkin += f"    And {sentence}\n"
-                
-        elif len(sentences) == 2:
-            # With 2 sentences, use first for Given, second for Then, and add a generic When
-            gherkin += f"    Given {sentences[0]}\n"
-            gherkin += f"    When the user performs the required action\n"
-            gherkin += f"    Then {sentences[1]}\n"
-            
-        elif len(sentences) == 1:
-            # With 1 sentence, use it for Given and add generic When/Then
-            gherkin += f"    Given {sentences[0]}\n"
-            gherkin += f"    When the user performs the required action\n"
-            gherkin += f"    Then the expected outcome is achieved\n"
-            
-        else:
-            # With no sentences, create a completely generic structure
-            gherkin += "    Given the initial context for the user story\n"
-            gherkin += "    When the user performs the required action\n"
-            gherkin += "    Then the expected outcome is achieved\n"
-            
+        gherkin = offline_gherkin(title, description)
         print(f"Generated fallback Gherkin with {len(gherkin)} characters.")
         return gherkin
         
@@ -289,14 +477,9 @@ Output the Gherkin specification only, without additional explanations.
             Basic description template
         """
         print("\nGenerating fallback design analysis...")
+        self._mark_fallback("vision")
         
-        fallback_text = """The design shows a user interface for a software application. 
-        The interface appears to include navigation elements, content areas, and interactive components.
-        Users can likely interact with various elements on the screen to accomplish tasks within the application.
-        The layout follows a structured approach with clear organization of information and functionality.
-        
-        Additional details would be needed to specify the exact requirements and functionality represented in this design.
-        """
+        fallback_text = self.FALLBACK_DESIGN_ANALYSIS
         
         print(f"Generated fallback design analysis with {len(fallback_text)} characters.")
         return fallback_text
\ No newline at end of file
@@ -0,0 +1,105 @@
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.services.claude_service import ClaudeService
+
+
+class DesignAnalysisSuperseded(Exception):
+    """The job a request was waiting on was cancelled: the design URL changed or the story was deleted"""
+
+
+class DesignAnalysisJobs:
+    """
+    Background design analyses, one per story
+
+    Attaching a design URL starts the analysis speculatively so that the
+    description is usually ready by the time the user asks for it. A job is
+    reused while the story's design URL stays the same and cancelled as soon
+    as it changes or the story is deleted.
+
+    Only real descriptions are kept: a job that ends with the fallback text
+    (API error, missing key) is dropped so the next request tries again.
+    Finished results expire after DESIGN_ANALYSIS_RESULT_TTL_SECONDS.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[UUID, Tuple[str, asyncio.Task]] = {}
+        self._finished_at: Dict[UUID, float] = {}
+
+    def schedule(self, story_id: UUID, design_url: Optional[str]) -> Optional[asyncio.Task]:
+        """Start analysing a story's design unless the same URL is already being handled"""
+        self._expire()
+        existing = self._jobs.get(story_id)
+        if existing:
+            existing_url, existing_task = existing
+            if existing_url == design_url and not existing_task.cancelled():
+                return existing_task
+            self.cancel(story_id)
+
+        if not design_url:
+            return None
+
+        # Imported here to avoid a circular import with app.crud.user_story
+        from app.crud.user_story import generate_description_from_image
+
+        print(f"Scheduling background design analysis for story {story_id}")
+        task = asyncio.create_task(
+            generate_description_from_image(design_url=design_url, story_id=story_id)
+        )
+        task.add_done_callback(lambda t: self._on_done(story_id, t))
+        self._jobs[story_id] = (design_url, task)
+        return task
+
+    async def get_result(self, story_id: UUID, design_url: str) -> str:
+        """
+        Return the finished analysis, join the in-flight one, or start a new one
+
+        Raises:
+            DesignAnalysisSuperseded: If the job is cancelled while waiting on it
+        """
+        task = self.schedule(story_id, design_url)
+        try:
+            # Shield so a client disconnect doesn't cancel a job other requests share
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                # This request was cancelled, not the job
+                raise
+            # Not retried here: a job for this URL would cancel the one for the new URL
+            raise DesignAnalysisSuperseded(f"Design analysis for story {story_id} was superseded")
+
+    def cancel(self, story_id: UUID) -> None:
+        """Cancel and forget a story's job, if any"""
+        existing = self._jobs.pop(story_id, None)
+        self._finished_at.pop(story_id, None)
+        if existing and not existing[1].done():
+            print(f"Cancelling background design analysis for story {story_id}")
+            existing[1].cancel()
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - settings.DESIGN_ANALYSIS_RESULT_TTL_SECONDS
+        for story_id, finished_at in list(self._finished_at.items()):
+            if finished_at < cutoff:
+                del self._finished_at[story_id]
+                self._jobs.pop(story_id, None)
+
+    def _on_done(self, story_id: UUID, task: asyncio.Task) -> None:
+        current = self._jobs.get(story_id)
+        if current is None or current[1] is not task:
+            return
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            print(f"Background design analysis failed for story {story_id}: {task.exception()}")
+        elif task.result() == ClaudeService.FALLBACK_DESIGN_ANALYSIS:
+            print(f"Background design analysis for story {story_id} fell back, not keeping it")
+        else:
+            self._finished_at[story_id] = time.monotonic()
+            return
+        # Drop failed jobs so the next request retries
+        del self._jobs[story_id]
+
+design_analysis_jobs = DesignAnalysisJobs()
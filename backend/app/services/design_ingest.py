@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import io
+import ipaddress
+import os
+import socket
+from typing import Optional
+from urllib.parse import urljoin, urlsplit
+
+import aiohttp
+from aiohttp.resolver import ThreadedResolver
+
+from app.core.config import settings
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow not installed: store and send images as-is
+    Image = None
+
+
+MAX_REDIRECTS = 3
+
+
+class DesignFetchRejected(ValueError):
+    """The design URL points somewhere the server must not fetch from"""
+
+
+def _is_public_address(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:  # e.g. scoped link-local IPv6 ("fe80::1%eth0")
+        return False
+    return address.is_global and not address.is_multicast
+
+
+def _check_url(url: str) -> None:
+    """Reject non-HTTP URLs and literal non-public addresses; hostnames are checked on resolve"""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise DesignFetchRejected(f"Unsupported design URL: {url}")
+    try:
+        ipaddress.ip_address(parts.hostname)
+    except ValueError:
+        return
+    if not _is_public_address(parts.hostname):
+        raise DesignFetchRejected(f"Design URL points to a non-public address: {url}")
+
+
+class PublicResolver(ThreadedResolver):
+    """
+    Resolve only to public addresses
+
+    Checking at connect time, rather than before the request, also covers
+    redirects and DNS answers that change between lookups.
+    """
+
+    async def resolve(self, hostname: str, port: int = 0, family: int = socket.AF_INET):
+        hosts = await super().resolve(hostname, port, family)
+        if not hosts or not all(_is_public_address(host["host"]) for host in hosts):
+            raise DesignFetchRejected(f"{hostname} resolves to a non-public address")
+        return hosts
+
+
+class IngestedDesign:
+    """A design image stored locally and prepared for vision analysis"""
+
+    def __init__(
+        self,
+        digest: str,
+        data: bytes,
+        media_type: str,
+        path: str,
+        thumbnail_path: Optional[str] = None,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+    ):
+        self.digest = digest
+        self.data = data
+        self.media_type = media_type
+        self.path = path
+        self.thumbnail_path = thumbnail_path
+        self.width = width
+        self.height = height
+
+
+class DesignIngestService:
+    """
+    Fetch or accept a design image once, then store a downscaled copy and a
+    thumbnail under DESIGN_STORAGE_DIR.
+
+    Files are named by the SHA-256 of the original image, so the same design
+    is only fetched and processed once.
+    """
+
+    EXTENSIONS = {
+        "image/jpeg": "jpg",
+        "image/png": "png",
+        "image/webp": "webp",
+        "image/gif": "gif",
+    }
+
+    def __init__(self, storage_dir: Optional[str] = None):
+        self.storage_dir = storage_dir or settings.DESIGN_STORAGE_DIR
+        self.thumbnail_dir = os.path.join(self.storage_dir, "thumbnails")
+
+    async def ingest_url(self, image_url: str) -> Optional[IngestedDesign]:
+        """
+        Download an image URL and ingest it, or return None if the fetch fails
+
+        Only http(s) URLs on public addresses are fetched, so a client can't
+        use the server to reach loopback, link-local (cloud metadata) or
+        private-network services. Redirects are followed by hand so every
+        hop gets the same check.
+        """
+        try:
+            connector = aiohttp.TCPConnector(resolver=PublicResolver())
+            async with aiohttp.ClientSession(connector=connector) as session:
+                url = image_url
+                for _ in range(MAX_REDIRECTS + 1):
+                    _check_url(url)
+                    async with session.get(url, timeout=30, allow_redirects=False) as response:
+                        if response.status in (301, 302, 303, 307, 308) and "Location" in response.headers:
+                            url = urljoin(url, response.headers["Location"])
+                            continue
+                        if response.status != 200:
+                            print(f"Design fetch failed with status {response.status}: {url}")
+                            return None
+                        if (response.content_length or 0) > settings.DESIGN_MAX_DOWNLOAD_BYTES:
+                            print(f"Design too large to ingest: {response.content_length} bytes")
+                            return None
+                        data = await response.content.read(settings.DESIGN_MAX_DOWNLOAD_BYTES + 1)
+                        if len(data) > settings.DESIGN_MAX_DOWNLOAD_BYTES:
+                            print(f"Design too large to ingest: >{settings.DESIGN_MAX_DOWNLOAD_BYTES} bytes")
+                            return None
+                        media_type = response.content_type
+                        break
+                else:
+                    print(f"Design fetch gave up after {MAX_REDIRECTS} redirects: {image_url}")
+                    return None
+        except DesignFetchRejected as e:
+            print(f"Design fetch refused: {e}")
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Design fetch error for {image_url}: {str(e)}")
+            return None
+
+        return await self.ingest_bytes(data, media_type)
+
+    async def ingest_bytes(self, data: bytes, media_type: Optional[str] = None) -> IngestedDesign:
+        """Store raw image bytes, downscaling and thumbnailing off the event loop"""
+        return await asyncio.to_thread(self._ingest, data, media_type)
+
+    def get_path(self, digest: str, thumbnail: bool = False) -> Optional[str]:
+        """Return the stored file for a digest, if it has been ingested"""
+        directory = self.thumbnail_dir if thumbnail else self.storage_dir
+        if not os.path.isdir(directory):
+            return None
+        for name in os.listdir(directory):
+            if name.split(".", 1)[0] == digest:
+                return os.path.join(directory, name)
+        return None
+
+    def _ingest(self, data: bytes, media_type: Optional[str]) -> IngestedDesign:
+        digest = hashlib.sha256(data).hexdigest()
+        os.makedirs(self.thumbnail_dir, exist_ok=True)
+
+        if Image is None:
+            media_type = media_type if media_type in self.EXTENSIONS else "image/png"
+            path = self._write(self.storage_dir, digest, self.EXTENSIONS[media_type], data)
+            return IngestedDesign(digest, data, media_type, path)
+
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+
+        # Claude downscales anything larger anyway; doing it here saves upload
+        # bandwidth and the image tokens for the discarded pixels
+        image.thumbnail((settings.DESIGN_MAX_EDGE, settings.DESIGN_MAX_EDGE), Image.LANCZOS)
+        processed, media_type = self._encode(image, has_alpha)
+        path = self._write(self.storage_dir, digest, self.EXTENSIONS[media_type], processed)
+
+        thumbnail = image.copy()
+        thumbnail.thumbnail(
+            (settings.DESIGN_THUMBNAIL_EDGE, settings.DESIGN_THUMBNAIL_EDGE), Image.LANCZOS
+        )
+        thumbnail_data, thumbnail_type = self._encode(thumbnail, has_alpha)
+        thumbnail_path = self._write(
+            self.thumbnail_dir, digest, self.EXTENSIONS[thumbnail_type], thumbnail_data
+        )
+
+        return IngestedDesign(
+            digest,
+            processed,
+            media_type,
+            path,
+            thumbnail_path=thumbnail_path,
+            width=image.width,
+            height=image.height,
+        )
+
+    def _encode(self, image, has_alpha: bool):
+        """Re-encode compactly: PNG keeps transparency, everything else is JPEG"""
+        buffer = io.BytesIO()
+        if has_alpha:
+            image.convert("RGBA").save(buffer, format="PNG", optimize=True)
+            return buffer.getvalue(), "image/png"
+        image.convert("RGB").save(buffer, format="JPEG", quality=85, optimize=True)
+        return buffer.getvalue(), "image/jpeg"
+
+    def _write(self, directory: str, digest: str, extension: str, data: bytes) -> str:
+        path = os.path.join(directory, f"{digest}.{extension}")
+        if not os.path.exists(path):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,139 @@
+"""
+Structural diff between two document versions
+
+JSON and YAML documents are compared as trees, and every change is reported
+at its JSON pointer, so a renamed operationId shows up as one change at
+"/paths/~1pets/get/operationId" rather than as a reflowed text hunk. Other
+documents fall back to a line diff with "/lines/<n>" pointers.
+
+Equal subtrees are skipped with a single C-level == comparison, so the cost
+scales with the size of the change rather than the size of the document.
+"""
+
+import difflib
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.services.chunk_store import ChunkStore
+from app.services.openapi_validator import (
+    SpecParseError, escape_pointer_token, load_cached_spec, parse_spec_bytes,
+)
+
+STRUCTURED_EXTENSIONS = (".json", ".yaml", ".yml")
+MAX_CHANGES = 500
+
+
+def _summarize(value: Any) -> Any:
+    """Scalars as-is; containers by shape, so large subtrees don't bloat the response"""
+    if isinstance(value, dict):
+        return f"object ({len(value)} keys)"
+    if isinstance(value, list):
+        return f"array ({len(value)} items)"
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+class _Differ:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.changes: List[Dict[str, Any]] = []
+        self.truncated = False
+
+    def add(self, op: str, pointer: str, before: Any = None, after: Any = None) -> None:
+        if len(self.changes) >= self.limit:
+            self.truncated = True
+            return
+        self.changes.append({
+            "op": op,
+            "pointer": pointer,
+            "before": _summarize(before) if op != "added" else None,
+            "after": _summarize(after) if op != "removed" else None,
+        })
+
+    def diff(self, before: Any, after: Any, pointer: str = "") -> None:
+        stack = [(before, after, pointer)]
+        while stack and not self.truncated:
+            before, after, pointer = stack.pop()
+            if before == after:
+                continue
+            if isinstance(before, dict) and isinstance(after, dict):
+                for key in before:
+                    child = f"{pointer}/{escape_pointer_token(key)}"
+                    if key not in after:
+                        self.add("removed", child, before=before[key])
+                    else:
+                        stack.append((before[key], after[key], child))
+                for key in after:
+                    if key not in before:
+                        self.add("added", f"{pointer}/{escape_pointer_token(key)}", after=after[key])
+            elif isinstance(before, list) and isinstance(after, list):
+                self._diff_lists(before, after, pointer, stack)
+            else:
+                self.add("changed", pointer, before=before, after=after)
+
+    def _diff_lists(self, before: list, after: list, pointer: str, stack: list) -> None:
+        # Align on equal items so an insertion doesn't mark every later item changed
+        matcher = difflib.SequenceMatcher(None, [repr(v) for v in before], [repr(v) for v in after],
+                                          autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            paired = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+            for offset in range(paired):
+                stack.append((before[i1 + offset], after[j1 + offset], f"{pointer}/{j1 + offset}"))
+            for index in range(i1 + paired, i2):
+                self.add("removed", f"{pointer}/{index}", before=before[index])
+            for index in range(j1 + paired, j2):
+                self.add("added", f"{pointer}/{index}", after=after[index])
+
+
+def diff_lines(before: bytes, after: bytes, limit: int = MAX_CHANGES) -> Dict[str, Any]:
+    differ = _Differ(limit)
+    old_lines = before.decode("utf-8", errors="replace").splitlines()
+    new_lines = after.decode("utf-8", errors="replace").splitlines()
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        paired = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+        for offset in range(paired):
+            differ.add("changed", f"/lines/{j1 + offset + 1}", old_lines[i1 + offset], new_lines[j1 + offset])
+        for index in range(i1 + paired, i2):
+            differ.add("removed", f"/lines/{index + 1}", before=old_lines[index])
+        for index in range(j1 + paired, j2):
+            differ.add("added", f"/lines/{index + 1}", after=new_lines[index])
+    return {"structural": False, "changes": differ.changes, "truncated": differ.truncated}
+
+
+def diff_versions(
+    before: Sequence,
+    after: Sequence,
+    chunk_dir: Optional[str] = None,
+    limit: int = MAX_CHANGES,
+) -> Dict[str, Any]:
+    """
+    Diff two versions given as (content_hash, extension, chunks) tuples
+
+    Runs in a worker process. Parsed trees come from the parse cache, so
+    versions that were validated or diffed before are not re-parsed.
+    """
+    store = ChunkStore(chunk_dir)
+    (before_hash, before_ext, before_chunks), (after_hash, after_ext, after_chunks) = before, after
+
+    if before_ext.lower() in STRUCTURED_EXTENSIONS and after_ext.lower() in STRUCTURED_EXTENSIONS:
+        try:
+            old = load_cached_spec(
+                before_hash, before_ext, lambda: parse_spec_bytes(store.read_content(before_chunks), before_ext)
+            )
+            new = load_cached_spec(
+                after_hash, after_ext, lambda: parse_spec_bytes(store.read_content(after_chunks), after_ext)
+            )
+        except SpecParseError:
+            # One side doesn't parse: a line diff still shows what changed
+            pass
+        else:
+            differ = _Differ(limit)
+            differ.diff(old, new)
+            return {"structural": True, "changes": differ.changes, "truncated": differ.truncated}
+
+    return diff_lines(store.read_content(before_chunks), store.read_content(after_chunks), limit)
@@ -0,0 +1,151 @@
+"""
+Content-addressed storage for uploaded documents
+
+Uploads are streamed to disk in fixed-size chunks while being hashed, so
+memory stays bounded regardless of file size. Each blob is stored once under
+its SHA-256, sharded by hash prefix:
+
+    uploads/documents/ab/cd/abcd...ef.yaml
+
+The extension is kept because validation picks the parser from it. Uploading
+identical content again reuses the existing blob. Only a document's current
+version is kept as a whole blob; its history lives in the chunk store.
+"""
+
+import asyncio
+import hashlib
+import os
+import uuid
+from typing import Optional
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.services.chunk_store import ChunkedWrite, ChunkList, chunk_store
+
+
+class DocumentTooLargeError(Exception):
+    """Raised when an upload exceeds DOCUMENT_MAX_UPLOAD_BYTES"""
+
+    def __init__(self, limit: int):
+        super().__init__(f"Document exceeds the {limit} byte upload limit")
+        self.limit = limit
+
+
+class StoredDocument:
+    """Where an upload ended up, and whether it was already stored"""
+
+    def __init__(
+        self,
+        digest: str,
+        size: int,
+        path: str,
+        deduplicated: bool,
+        extension: str = "",
+        chunks: Optional[ChunkList] = None,
+        new_chunk_bytes: int = 0,
+    ):
+        self.digest = digest
+        self.size = size
+        self.path = path
+        self.deduplicated = deduplicated
+        self.extension = extension
+        # Content-defined chunks of the upload, for version history
+        self.chunks = chunks
+        self.new_chunk_bytes = new_chunk_bytes
+
+
+class DocumentStorage:
+    def __init__(
+        self,
+        storage_dir: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ):
+        self.storage_dir = storage_dir or settings.DOCUMENT_STORAGE_DIR
+        self.max_bytes = max_bytes or settings.DOCUMENT_MAX_UPLOAD_BYTES
+        self.chunk_size = chunk_size or settings.DOCUMENT_UPLOAD_CHUNK_BYTES
+        self.tmp_dir = os.path.join(self.storage_dir, "tmp")
+
+    def path_for(self, digest: str, extension: str = "") -> str:
+        return os.path.join(self.storage_dir, digest[:2], digest[2:4], f"{digest}{extension}")
+
+    async def store_upload(self, file: UploadFile, chunked: bool = True) -> StoredDocument:
+        """
+        Stream an upload into the store
+
+        With chunked=True the upload is also split into content-defined chunks
+        for version history; only chunks not stored before are written.
+
+        By the time this runs Starlette has already spooled the request, so
+        this check is an exact per-file limit, not transfer protection;
+        BodySizeLimitMiddleware cuts oversized request bodies off mid-stream.
+
+        Raises:
+            DocumentTooLargeError: as soon as more than max_bytes have been read;
+                the partial file is removed.
+        """
+        extension = os.path.splitext(file.filename or "")[1].lower()
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        tmp_path = os.path.join(self.tmp_dir, f"{uuid.uuid4().hex}.part")
+
+        sha256 = hashlib.sha256()
+        size = 0
+        chunk_writer = ChunkedWrite(chunk_store) if chunked else None
+        try:
+            async with aiofiles.open(tmp_path, "wb") as out_file:
+                while True:
+                    chunk = await file.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise DocumentTooLargeError(self.max_bytes)
+                    sha256.update(chunk)
+                    await out_file.write(chunk)
+                    if chunk_writer:
+                        # Rolling hash and chunk writes stay off the event loop
+                        await asyncio.to_thread(chunk_writer.write, chunk)
+            if chunk_writer:
+                await asyncio.to_thread(chunk_writer.close)
+        except BaseException:
+            await self._discard(tmp_path)
+            raise
+
+        digest = sha256.hexdigest()
+        path = self.path_for(digest, extension)
+        stored = StoredDocument(
+            digest, size, path, deduplicated=os.path.exists(path), extension=extension,
+            chunks=chunk_writer.chunks if chunk_writer else None,
+            new_chunk_bytes=chunk_writer.new_bytes if chunk_writer else 0,
+        )
+        if stored.deduplicated:
+            await self._discard(tmp_path)
+            return stored
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Same filesystem, so the rename is atomic; a concurrent identical
+        # upload simply replaces the blob with equal bytes
+        os.replace(tmp_path, path)
+        return stored
+
+    def release(self, path: str) -> None:
+        """Delete a blob no document points at any more; paths outside the store are left alone"""
+        storage_root = os.path.abspath(self.storage_dir) + os.sep
+        if not os.path.abspath(path).startswith(storage_root):
+            return
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    async def _discard(self, tmp_path: str) -> None:
+        try:
+            await aiofiles.os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+document_storage = DocumentStorage()
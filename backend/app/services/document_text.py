@@ -0,0 +1,102 @@
+"""
+Searchable text extracted from uploaded documents
+
+OpenAPI specs contribute their identifiers (paths, operationIds, schema,
+parameter and tag names) and their prose (titles, summaries,
+descriptions). Identifiers are also split into words, so "getPetById"
+and "/pets/{petId}" are found by "pet". Other documents contribute their
+plain text.
+
+extract_document_text() runs in the document worker pool next to
+validation, reusing the spec that validation already parsed.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from app.services.openapi_validator import HTTP_METHODS
+
+_CAMEL = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+_SEPARATORS = re.compile(r"[^A-Za-z0-9]+")
+
+# to_tsvector rejects input over 1MB; leave room for the split identifiers
+MAX_TEXT_CHARS = 512 * 1024
+MAX_IDENTIFIERS = 5000
+
+
+def split_identifier(identifier: str) -> List[str]:
+    """"/pets/{petId}" -> ["pets", "pet", "id"]; "getPetById" -> ["get", "pet", "by", "id"]"""
+    words = []
+    for part in _SEPARATORS.split(identifier):
+        words.extend(word.lower() for word in _CAMEL.findall(part))
+    return words
+
+
+def extract_document_text(spec: Optional[Any], raw_text: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build the search entry for a document
+
+    Returns a dict with "identifiers" (exact names, for showing what
+    matched), "keywords" (identifiers and their split words) and "body"
+    (prose). Pass the parsed spec for OpenAPI documents, or raw_text
+    for anything else.
+    """
+    if not isinstance(spec, dict):
+        return {"identifiers": [], "keywords": "", "body": (raw_text or "")[:MAX_TEXT_CHARS]}
+
+    identifiers: List[str] = []
+    prose: List[str] = []
+
+    info = spec.get("info")
+    if isinstance(info, dict):
+        prose.extend(str(info[key]) for key in ("title", "summary", "description") if info.get(key))
+
+    for tag in spec.get("tags") or []:
+        if isinstance(tag, dict) and tag.get("name"):
+            identifiers.append(str(tag["name"]))
+            if tag.get("description"):
+                prose.append(str(tag["description"]))
+
+    for section in ("paths", "webhooks"):
+        items = spec.get(section)
+        if not isinstance(items, dict):
+            continue
+        for path, item in items.items():
+            identifiers.append(str(path))
+            if not isinstance(item, dict):
+                continue
+            for method in HTTP_METHODS:
+                operation = item.get(method)
+                if not isinstance(operation, dict):
+                    continue
+                identifiers.append(f"{method.upper()} {path}")
+                if operation.get("operationId"):
+                    identifiers.append(str(operation["operationId"]))
+                prose.extend(str(operation[key]) for key in ("summary", "description") if operation.get(key))
+                for parameter in operation.get("parameters") or []:
+                    if isinstance(parameter, dict) and parameter.get("name"):
+                        identifiers.append(str(parameter["name"]))
+
+    components = spec.get("components")
+    if isinstance(components, dict):
+        for section in ("schemas", "parameters", "responses", "requestBodies", "securitySchemes"):
+            entries = components.get(section)
+            if not isinstance(entries, dict):
+                continue
+            for name, entry in entries.items():
+                identifiers.append(str(name))
+                if isinstance(entry, dict) and entry.get("description"):
+                    prose.append(str(entry["description"]))
+
+    # Keep first occurrences, in document order
+    identifiers = list(dict.fromkeys(identifiers))[:MAX_IDENTIFIERS]
+    keywords = []
+    for identifier in identifiers:
+        keywords.append(identifier)
+        keywords.extend(split_identifier(identifier))
+
+    return {
+        "identifiers": identifiers,
+        "keywords": " ".join(keywords)[:MAX_TEXT_CHARS],
+        "body": "\n".join(prose)[:MAX_TEXT_CHARS],
+    }
@@ -0,0 +1,218 @@
+"""
+Background document validation
+
+Parsing large OpenAPI specs is CPU-bound, so check_document() runs in a
+process pool and never on the event loop. Validation starts as soon as a
+document is uploaded; its outcome is stored on the document together with
+the content hash it was computed for, so unchanged documents are never
+validated twice; OpenAPI parsing itself is cached by openapi_validator.
+The same pass extracts the document's search text, so the spec is parsed
+once for both.
+"""
+
+import asyncio
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.services.document_text import extract_document_text
+from app.services.openapi_validator import SpecParseError, load_spec, validate_openapi
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def check_document(path: str, doc_type: str, digest: Optional[str] = None) -> Tuple[str, List[dict], dict]:
+    """
+    Validate a stored document and extract its search text
+
+    Returns (sha256, issues, text): issues are {"pointer", "message"} dicts
+    and text is what extract_document_text() returns. The file is hashed
+    unless its digest is already known. Runs in a worker process, so it
+    takes and returns plain values only.
+    """
+    if digest is None:
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+
+    issues = []
+    text = extract_document_text(None)
+    try:
+        if doc_type == "OpenAPI":
+            spec = load_spec(path, digest)
+            issues = validate_openapi(spec)
+            text = extract_document_text(spec)
+
+        elif doc_type == "Architecture":
+            # Simple check for architecture document
+            with open(path, "r", errors="replace") as f:
+                content = f.read()
+                if len(content) < 100:  # Very simple validation
+                    issues.append({"pointer": "", "message": "Document seems too short to be valid"})
+            text = extract_document_text(None, content)
+
+    except SpecParseError as e:
+        issues.append({"pointer": "", "message": str(e)})
+    except Exception as e:
+        issues.append({"pointer": "", "message": f"Error validating document: {str(e)}"})
+
+    return digest, issues, text
+
+
+class DocumentValidationPipeline:
+    """
+    One validation job per document, parsed in a shared process pool
+
+    A job is reused while it is in flight, so an upload followed by an
+    explicit validation request only parses the file once. Scheduling a
+    document whose job is already running makes that job check the
+    document again when it finishes a pass, so a version uploaded
+    mid-validation is validated too, not left pending.
+
+    Replaced blobs are released through release_blob(), which waits until
+    no validation in this process is reading them.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or settings.DOCUMENT_VALIDATION_WORKERS
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: Dict[UUID, asyncio.Task] = {}
+        self._rerun: Set[UUID] = set()
+        self._reading: Dict[str, int] = {}
+        self._release_pending: Set[str] = set()
+
+    def schedule(self, document_id: UUID) -> asyncio.Task:
+        """Start validating a document unless it is already being validated"""
+        existing = self._jobs.get(document_id)
+        if existing and not existing.done():
+            # The content may have changed since that job read the document
+            self._rerun.add(document_id)
+            return existing
+
+        task = asyncio.create_task(self._validate(document_id))
+        task.add_done_callback(lambda t: self._on_done(document_id, t))
+        self._jobs[document_id] = task
+        return task
+
+    async def get_result(self, document_id: UUID):
+        """Validate a document, joining the in-flight job if there is one"""
+        # Shield so a client disconnect doesn't cancel a job other requests share
+        return await asyncio.shield(self.schedule(document_id))
+
+    def revalidate_changed(self) -> Tuple[int, int]:
+        """
+        Schedule every document whose content changed since it was validated
+
+        Returns:
+            (scheduled, skipped) document counts
+        """
+        from app.crud.document import get_documents_needing_validation
+        from app.db.session import SessionLocal
+
+        db = SessionLocal()
+        try:
+            document_ids, total = get_documents_needing_validation(db)
+        finally:
+            db.close()
+
+        for document_id in document_ids:
+            self.schedule(document_id)
+        print(f"Revalidating {len(document_ids)} of {total} documents")
+        return len(document_ids), total - len(document_ids)
+
+    def release_blob(self, path: str) -> None:
+        """Delete a replaced blob nothing points at, once no validation is reading it"""
+        if self._reading.get(path):
+            self._release_pending.add(path)
+            return
+        self._release_if_unreferenced(path)
+
+    async def run_in_pool(self, func, *args):
+        """Run other CPU-bound document work, such as version diffs, in the same pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), func, *args)
+
+    def shutdown(self) -> None:
+        for task in self._jobs.values():
+            task.cancel()
+        self._jobs.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _validate(self, document_id: UUID):
+        result = await self._validate_once(document_id)
+        while document_id in self._rerun:
+            self._rerun.discard(document_id)
+            result = await self._validate_once(document_id)
+        return result
+
+    async def _validate_once(self, document_id: UUID):
+        # Imported here to avoid a circular import with app.crud.document
+        from app.crud.document import get_document, record_validation, stored_validation_result
+        from app.db.session import SessionLocal
+
+        db = SessionLocal()
+        try:
+            db_document = get_document(db, document_id)
+            if not db_document:
+                return None
+            if db_document.content_hash and db_document.content_hash == db_document.validated_hash:
+                return stored_validation_result(db_document)
+
+            path, content_hash = db_document.url, db_document.content_hash
+            self._reading[path] = self._reading.get(path, 0) + 1
+            try:
+                loop = asyncio.get_running_loop()
+                digest, issues, text = await loop.run_in_executor(
+                    self._get_pool(), check_document, path, db_document.type.value, content_hash
+                )
+            finally:
+                self._done_reading(path)
+
+            db.refresh(db_document)
+            if db_document.content_hash != content_hash:
+                # Superseded while parsing: the result describes old content
+                self._rerun.add(document_id)
+                return stored_validation_result(db_document)
+            return record_validation(db, db_document, digest, issues, text)
+        finally:
+            db.close()
+
+    def _done_reading(self, path: str) -> None:
+        self._reading[path] -= 1
+        if self._reading[path]:
+            return
+        del self._reading[path]
+        if path in self._release_pending:
+            self._release_pending.discard(path)
+            self._release_if_unreferenced(path)
+
+    def _release_if_unreferenced(self, path: str) -> None:
+        from app.crud.document import release_unreferenced_blob
+        from app.db.session import SessionLocal
+
+        db = SessionLocal()
+        try:
+            release_unreferenced_blob(db, path)
+        finally:
+            db.close()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _on_done(self, document_id: UUID, task: asyncio.Task) -> None:
+        if self._jobs.get(document_id) is task:
+            del self._jobs[document_id]
+            self._rerun.discard(document_id)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Background validation failed for document {document_id}: {task.exception()}")
+
+
+document_validation = DocumentValidationPipeline()
@@ -0,0 +1,256 @@
+"""
+Read-through cache of story, task and user rows by primary key
+
+Cached values are the row's column values, pickled, so any bytes store
+can hold them: an in-process LRU by default, or a Redis-protocol server
+(Redis, Valkey, KeyDB...) shared by all workers when ENTITY_CACHE_URL is
+set. A hit is rebuilt into a clean, persistent instance in the caller's
+session without a query; relationships still lazy-load as usual.
+
+Invalidation is write-through: every flush records the cached rows it
+inserted, updated or deleted, and their keys are dropped when the
+transaction commits, whichever crud function made the change. A read
+that raced a write doesn't put the old row back: keys invalidated while
+a miss is being read are marked stale until the last such read ends.
+Other workers' writes arrive through app.services.invalidation_bus, a
+little later; callers that already know the row's current updated_at
+pass it as expected_updated_at so a lagging entry is skipped.
+ENTITY_CACHE_TTL_SECONDS bounds staleness if an invalidation is missed.
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple, Type
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import SessionLocal
+from app.models.task import Task
+from app.models.user import User
+from app.models.user_story import UserStory
+
+try:
+    import redis
+except ImportError:  # redis not installed: only the in-process backend is available
+    redis = None
+
+ENTITY_CACHE_REQUESTS = registry.counter(
+    "entity_cache_requests_total", "Entity cache lookups", ["entity", "result"]
+)
+ENTITY_CACHE_INVALIDATIONS = registry.counter(
+    "entity_cache_invalidations_total", "Entity cache keys dropped after writes", ["entity"]
+)
+
+CACHED_MODELS: Dict[Type, str] = {UserStory: "story", Task: "task", User: "user"}
+_PENDING = "entity_cache_pending"
+
+
+class LRUBackend:
+    """Bounded in-process store; entries expire after ttl seconds"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, now: float) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, now: float) -> None:
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    """Shared store over the Redis protocol; errors count as misses"""
+
+    def __init__(self, url: str, ttl: float, prefix: str = "entity:"):
+        if redis is None:
+            raise RuntimeError("ENTITY_CACHE_URL is set but the redis package is not installed")
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self.ttl_ms = int(ttl * 1000)
+        self.prefix = prefix
+
+    def get(self, key: str, now: float) -> Optional[bytes]:
+        try:
+            return self.client.get(self.prefix + key)
+        except redis.RedisError as e:
+            print(f"Entity cache read failed: {e}")
+            return None
+
+    def set(self, key: str, value: bytes, now: float) -> None:
+        try:
+            self.client.set(self.prefix + key, value, px=self.ttl_ms)
+        except redis.RedisError as e:
+            print(f"Entity cache write failed: {e}")
+
+    def delete(self, key: str) -> None:
+        try:
+            self.client.delete(self.prefix + key)
+        except redis.RedisError as e:
+            print(f"Entity cache invalidation failed: {e}")
+
+    def clear(self) -> None:
+        try:
+            for key in self.client.scan_iter(f"{self.prefix}*"):
+                self.client.delete(key)
+        except redis.RedisError as e:
+            print(f"Entity cache clear failed: {e}")
+
+
+def _key(model: Type, entity_id: Any) -> str:
+    return f"{CACHED_MODELS[model]}:{entity_id}"
+
+
+class EntityCache:
+    def __init__(self, backend=None):
+        self._backend = backend
+        # Misses being read per key, and keys invalidated during those reads;
+        # both only hold keys with a read in progress
+        self._reading: Dict[str, int] = {}
+        self._stale: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            ttl = settings.ENTITY_CACHE_TTL_SECONDS
+            if settings.ENTITY_CACHE_URL:
+                self._backend = RedisBackend(settings.ENTITY_CACHE_URL, ttl)
+            else:
+                self._backend = LRUBackend(settings.ENTITY_CACHE_MAX_ENTRIES, ttl)
+        return self._backend
+
+    def get(
+        self, db: Session, model: Type, entity_id: Any, expected_updated_at: Optional[datetime] = None
+    ) -> Optional[Any]:
+        """
+        The row with this primary key: from the session, the cache, or the database
+
+        With expected_updated_at, a cached copy with a different updated_at
+        is ignored and replaced by the database row.
+        """
+        # Already loaded in this request: no cache round trip needed
+        loaded = db.identity_map.get(identity_key(model, entity_id))
+        if loaded is not None and not inspect(loaded).expired:
+            return loaded
+
+        entity = CACHED_MODELS[model]
+        key = _key(model, entity_id)
+        now = time.monotonic()
+        data = self.backend.get(key, now)
+        if data is not None:
+            values = pickle.loads(data)
+            if expected_updated_at is None or values.get("updated_at") == expected_updated_at:
+                ENTITY_CACHE_REQUESTS.inc(entity=entity, result="hit")
+                return self._attach(db, model, values)
+            ENTITY_CACHE_REQUESTS.inc(entity=entity, result="stale")
+        else:
+            ENTITY_CACHE_REQUESTS.inc(entity=entity, result="miss")
+
+        with self._lock:
+            self._reading[key] = self._reading.get(key, 0) + 1
+        try:
+            row = db.get(model, entity_id)
+            values = _column_values(row) if row is not None else None
+        finally:
+            with self._lock:
+                # Skip the store if a write committed while we were reading
+                fresh = key not in self._stale
+                self._reading[key] -= 1
+                if not self._reading[key]:
+                    del self._reading[key]
+                    self._stale.discard(key)
+        if values is not None and fresh:
+            self.backend.set(key, pickle.dumps(values, pickle.HIGHEST_PROTOCOL), now)
+        return row
+
+    def invalidate(self, model: Type, entity_id: Any) -> None:
+        key = _key(model, entity_id)
+        with self._lock:
+            if key in self._reading:
+                self._stale.add(key)
+        self.backend.delete(key)
+        ENTITY_CACHE_INVALIDATIONS.inc(entity=CACHED_MODELS[model])
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    @staticmethod
+    def _attach(db: Session, model: Type, values: Dict[str, Any]) -> Any:
+        """Rebuild a cached row as if the session had just loaded it"""
+        row = inspect(model).class_manager.new_instance()
+        for name, value in values.items():
+            set_committed_value(row, name, value)
+        make_transient_to_detached(row)
+        existing = db.identity_map.get(inspect(row).key)
+        if existing is not None:
+            # Expired copy in the session: refresh it from the cached values
+            for name, value in values.items():
+                set_committed_value(existing, name, value)
+            return existing
+        db.add(row)
+        return row
+
+
+def _column_values(row: Any) -> Optional[Dict[str, Any]]:
+    state = inspect(row)
+    values = {}
+    for attribute in state.mapper.column_attrs:
+        if attribute.key not in state.dict:
+            return None  # Partially loaded: don't cache
+        values[attribute.key] = state.dict[attribute.key]
+    return values
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_writes(session: Session, flush_context) -> None:
+    pending = session.info.setdefault(_PENDING, set())
+    for row in (*session.new, *session.dirty, *session.deleted):
+        if type(row) in CACHED_MODELS:
+            identity = inspect(row).identity
+            if identity:
+                pending.add((type(row), identity[0]))
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_writes(session: Session) -> None:
+    for model, entity_id in session.info.pop(_PENDING, ()):
+        entity_cache.invalidate(model, entity_id)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_writes(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+entity_cache = EntityCache()
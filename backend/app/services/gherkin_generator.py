@@ -0,0 +1,231 @@
+"""
+Rule-based Gherkin generation, used when the Claude API is unavailable
+
+All patterns are compiled once at import time. generate_batch() spreads
+large batches across a process pool.
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+# Sentence boundaries: terminal punctuation followed by a capitalised word, or
+# a line break. Lower-case continuations ("e.g. the list") are not split.
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])|\s*\n+\s*")
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s.;:!]+$")
+_TABLE_ROW = re.compile(r"^\s*\|.*\|\s*$")
+
+# "As a <actor>, I want <action> so that <outcome>"
+_USER_STORY = re.compile(
+    r"^\s*as\s+an?\s+(?P<actor>.+?),?\s+i\s+(?:want|need|would\s+like|can)\s+(?:to\s+)?"
+    r"(?P<action>.+?)(?:,?\s+so\s+(?:that\s+)?(?P<outcome>.+?))?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# The article follows the sound, not the letter: "a user", "an hour"
+_A_BEFORE_VOWEL_LETTER = ("uni", "use", "usu", "uti", "eu", "one", "once")
+_AN_BEFORE_SILENT_H = ("hour", "honest", "honor", "honour", "heir")
+
+_LEADING_KEYWORD = re.compile(r"^\s*(given|when|then|and|but)\b[\s,]*", re.IGNORECASE)
+_GIVEN_CUES = re.compile(
+    r"^\s*(?:given|assuming|provided|while|as\s+long\s+as)\b"
+    r"|\b(?:logged\s+in|signed\s+in|authenticated|already|exists?|is\s+on|are\s+on|has\s+access|have\s+access)\b",
+    re.IGNORECASE,
+)
+_WHEN_CUES = re.compile(
+    r"^\s*(?:when|if|once|after|upon)\b"
+    r"|\b(?:clicks?|taps?|submits?|enters?|selects?|uploads?|opens?|types?|presses?|navigates?"
+    r"|requests?|sends?|chooses?|drags?|searches?|filters?)\b",
+    re.IGNORECASE,
+)
+_THEN_CUES = re.compile(
+    r"^\s*(?:then|so\s+that)\b"
+    r"|\b(?:should|must|shall|will|sees?|receives?|(?:is|are)\s+(?:displayed|shown|redirected|notified|saved|created|updated|removed))\b",
+    re.IGNORECASE,
+)
+
+# Two or more quoted alternatives in one sentence become a Scenario Outline
+_QUOTED = re.compile(r"\"([^\"]+)\"|'([^']+)'")
+_WORD_AFTER = re.compile(r"^\W*([A-Za-z_][A-Za-z0-9_]*)")
+
+DEFAULT_GIVEN = "the initial context for the user story"
+DEFAULT_WHEN = "the user performs the required action"
+DEFAULT_THEN = "the expected outcome is achieved"
+
+
+class GherkinGenerator:
+    """Turn a story title and description into a Feature with one scenario"""
+
+    def generate(self, title: str, description: str) -> str:
+        feature_name = title.strip()
+        scenario_name = self._scenario_name(feature_name)
+
+        sentences, table_rows = self._segment(description or "")
+        givens, whens, thens = self._classify(sentences)
+
+        examples = self._parse_table(table_rows) if table_rows else None
+        if examples is None:
+            givens, whens, thens, examples = self._extract_outline(givens, whens, thens)
+
+        lines = [f"Feature: {feature_name}", ""]
+        lines.append(f"  {'Scenario Outline' if examples else 'Scenario'}: {scenario_name}")
+        for keyword, steps, default in (
+            ("Given", givens, DEFAULT_GIVEN),
+            ("When", whens, DEFAULT_WHEN),
+            ("Then", thens, DEFAULT_THEN),
+        ):
+            steps = steps or [default]
+            lines.append(f"    {keyword} {steps[0]}")
+            lines.extend(f"    And {step}" for step in steps[1:])
+
+        if examples:
+            header, rows = examples
+            lines.append("")
+            lines.append("    Examples:")
+            lines.append(self._table_line(header))
+            lines.extend(self._table_line(row) for row in rows)
+
+        return "\n".join(lines) + "\n"
+
+    def _scenario_name(self, title: str) -> str:
+        # Remove the HU identifier if present (e.g., "HU01 - Some title" -> "Some title")
+        if title.lower().startswith("hu"):
+            parts = title.split("-", 1)
+            if len(parts) > 1:
+                return parts[1].strip()
+        return title
+
+    def _segment(self, description: str) -> Tuple[List[str], List[str]]:
+        sentences = []
+        table_rows = []
+        for line in description.splitlines():
+            if _TABLE_ROW.match(line):
+                table_rows.append(line)
+                continue
+            line = _BULLET.sub("", line)
+            for sentence in _SENTENCE_SPLIT.split(line):
+                sentence = _TRAILING_PUNCTUATION.sub("", sentence.strip())
+                if sentence:
+                    sentences.append(sentence)
+        return sentences, table_rows
+
+    def _classify(self, sentences: Sequence[str]) -> Tuple[List[str], List[str], List[str]]:
+        givens: List[str] = []
+        whens: List[str] = []
+        thens: List[str] = []
+
+        for sentence in sentences:
+            story = _USER_STORY.match(sentence)
+            if story:
+                givens.append(f"I am {self._with_article(story.group('actor').strip())}")
+                whens.append(f"I {story.group('action').strip()}")
+                if story.group("outcome"):
+                    thens.append(story.group("outcome").strip())
+                continue
+
+            leading = _LEADING_KEYWORD.match(sentence)
+            if leading:
+                keyword = leading.group(1).lower()
+                text = sentence[leading.end():]
+                if keyword == "given":
+                    givens.append(text)
+                elif keyword == "when":
+                    whens.append(text)
+                elif keyword == "then":
+                    thens.append(text)
+                else:
+                    # And/But continue whichever block was written last
+                    (thens if thens else whens if whens else givens).append(text)
+                continue
+
+            if _THEN_CUES.search(sentence):
+                thens.append(sentence)
+            elif _WHEN_CUES.search(sentence):
+                whens.append(sentence)
+            elif _GIVEN_CUES.search(sentence):
+                givens.append(sentence)
+            elif not whens and not thens:
+                # Unmarked sentences before any action set the scene
+                givens.append(sentence)
+            else:
+                thens.append(sentence)
+
+        # Keep a plain narrative readable: promote the second context
+        # sentence to the action when nothing else looked like one
+        if not whens and len(givens) > 1:
+            whens.append(givens.pop(1))
+        if not thens and len(whens) > 1:
+            thens.append(whens.pop())
+
+        return givens, whens, thens
+
+    def _extract_outline(self, givens, whens, thens):
+        for steps in (givens, whens, thens):
+            for index, step in enumerate(steps):
+                matches = list(_QUOTED.finditer(step))
+                if len(matches) < 2:
+                    continue
+                values = [m.group(1) or m.group(2) for m in matches]
+                start, end = matches[0].start(), matches[-1].end()
+                following = _WORD_AFTER.match(step[end:])
+                parameter = following.group(1).lower() if following else "value"
+                steps[index] = f"{step[:start]}\"<{parameter}>\"{step[end:]}"
+                return givens, whens, thens, ([parameter], [[value] for value in values])
+        return givens, whens, thens, None
+
+    def _parse_table(self, rows: Sequence[str]) -> Optional[Tuple[List[str], List[List[str]]]]:
+        parsed = [[cell.strip() for cell in row.strip().strip("|").split("|")] for row in rows]
+        # Drop markdown separator rows such as |---|---|
+        parsed = [row for row in parsed if not all(set(cell) <= set("-: ") for cell in row)]
+        if len(parsed) < 2:
+            return None
+        return parsed[0], parsed[1:]
+
+    @staticmethod
+    def _with_article(actor: str) -> str:
+        lowered = actor.lower()
+        if lowered.startswith(("a ", "an ", "the ")):
+            return actor
+        if lowered.startswith(_AN_BEFORE_SILENT_H):
+            return f"an {actor}"
+        if lowered[:1] and lowered[0] in "aeiou" and not lowered.startswith(_A_BEFORE_VOWEL_LETTER):
+            return f"an {actor}"
+        return f"a {actor}"
+
+    @staticmethod
+    def _table_line(cells: Sequence[str]) -> str:
+        return "      | " + " | ".join(cells) + " |"
+
+
+_generator = GherkinGenerator()
+
+
+def generate_gherkin(title: str, description: str) -> str:
+    """Generate Gherkin for a single story with the shared generator"""
+    return _generator.generate(title, description)
+
+
+def _generate_pair(story: Tuple[str, str]) -> str:
+    return _generator.generate(story[0], story[1])
+
+
+def generate_batch(
+    stories: Iterable[Tuple[str, str]],
+    workers: Optional[int] = None,
+    chunksize: int = 256,
+) -> List[str]:
+    """
+    Generate Gherkin for many (title, description) pairs, preserving order
+
+    Batches smaller than one chunk, or workers=1, run in-process since pool
+    start-up would cost more than it saves.
+    """
+    stories = list(stories)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(stories) <= chunksize:
+        return [_generator.generate(title, description) for title, description in stories]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_generate_pair, stories, chunksize=chunksize))
@@ -0,0 +1,154 @@
+"""
+Lightweight Gherkin parser producing a compact, JSON-serialisable structure
+
+The structure is stored in user_stories.gherkin_ast so analytics never need
+to re-parse gherkin_description:
+
+    {
+        "features": [
+            {
+                "name": "Login",
+                "tags": ["@auth"],
+                "scenarios": [
+                    {
+                        "name": "Valid credentials",
+                        "kind": "scenario",      # "scenario", "outline" or "background"
+                        "tags": [],
+                        "steps": [["Given", "a registered user"], ...],
+                        "examples": 0            # example rows for outlines
+                    }
+                ]
+            }
+        ],
+        "scenario_count": 1,
+        "step_count": 3,
+        "tags": ["@auth"]
+    }
+
+Step keywords are normalised: And/But/* take the keyword of the step they
+continue, so steps can be grouped by Given/When/Then.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+_FEATURE = re.compile(r"^(?:Feature|Business Need|Ability):\s*(.*)$")
+_SCENARIO = re.compile(r"^(Scenario Outline|Scenario Template|Scenario|Example|Background):\s*(.*)$")
+_EXAMPLES = re.compile(r"^(?:Examples|Scenarios):")
+_STEP = re.compile(r"^(Given|When|Then|And|But|\*)\s+(.*)$")
+_TAG = re.compile(r"@[^\s@]+")
+
+_SCENARIO_KINDS = {
+    "Scenario": "scenario",
+    "Example": "scenario",
+    "Scenario Outline": "outline",
+    "Scenario Template": "outline",
+    "Background": "background",
+}
+
+
+def parse_gherkin(text: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse Gherkin text, returning None when there is no text to parse"""
+    if not text or not text.strip():
+        return None
+
+    features: List[Dict[str, Any]] = []
+    feature: Optional[Dict[str, Any]] = None
+    scenario: Optional[Dict[str, Any]] = None
+    pending_tags: List[str] = []
+    last_keyword = "Given"
+    in_examples = False
+    example_header_seen = False
+    in_docstring = False
+
+    def current_feature() -> Dict[str, Any]:
+        nonlocal feature
+        if feature is None:
+            # Steps without a Feature line still count, under an unnamed feature
+            feature = {"name": "", "tags": [], "scenarios": []}
+            features.append(feature)
+        return feature
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+
+        if line.startswith('"""') or line.startswith("```"):
+            # Doc strings, and the code fences LLM output is sometimes wrapped in
+            if line.startswith('"""'):
+                in_docstring = not in_docstring
+            continue
+        if in_docstring or not line or line.startswith("#"):
+            continue
+
+        if line.startswith("@"):
+            pending_tags.extend(_TAG.findall(line))
+            continue
+
+        match = _FEATURE.match(line)
+        if match:
+            feature = {"name": match.group(1).strip(), "tags": pending_tags, "scenarios": []}
+            features.append(feature)
+            scenario = None
+            pending_tags = []
+            continue
+
+        match = _SCENARIO.match(line)
+        if match:
+            scenario = {
+                "name": match.group(2).strip(),
+                "kind": _SCENARIO_KINDS[match.group(1)],
+                "tags": pending_tags,
+                "steps": [],
+                "examples": 0,
+            }
+            current_feature()["scenarios"].append(scenario)
+            pending_tags = []
+            in_examples = False
+            last_keyword = "Given"
+            continue
+
+        if _EXAMPLES.match(line):
+            in_examples = True
+            example_header_seen = False
+            pending_tags = []
+            continue
+
+        if line.startswith("|"):
+            # Example rows after their header; step data tables are ignored
+            if in_examples and scenario is not None:
+                if example_header_seen:
+                    scenario["examples"] += 1
+                example_header_seen = True
+            continue
+
+        match = _STEP.match(line)
+        if match:
+            keyword, step_text = match.group(1), match.group(2).strip()
+            if keyword in ("And", "But", "*"):
+                keyword = last_keyword
+            last_keyword = keyword
+            in_examples = False
+            if scenario is None:
+                scenario = {"name": "", "kind": "scenario", "tags": [], "steps": [], "examples": 0}
+                current_feature()["scenarios"].append(scenario)
+            scenario["steps"].append([keyword, step_text])
+
+    scenarios = [s for f in features for s in f["scenarios"] if s["kind"] != "background"]
+    tags = sorted({tag for f in features for tag in f["tags"]} |
+                  {tag for f in features for s in f["scenarios"] for tag in s["tags"]})
+    return {
+        "features": features,
+        "scenario_count": len(scenarios),
+        "step_count": sum(len(s["steps"]) for f in features for s in f["scenarios"]),
+        "tags": tags,
+    }
+
+
+def iter_steps(ast: Optional[Dict[str, Any]]):
+    """Yield (keyword, text) for every step in a parsed document"""
+    if not ast:
+        return
+    for feature in ast.get("features", []):
+        for scenario in feature.get("scenarios", []):
+            for keyword, text in scenario.get("steps", []):
+                yield keyword, text
@@ -0,0 +1,134 @@
+import re
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+GHERKIN_ROUTE_OUTCOMES = registry.counter(
+    "claude_gherkin_route_outcomes_total",
+    "Gherkin generation attempts by routed model, story size and outcome",
+    ["model", "size", "outcome"],
+)
+GHERKIN_ROUTE_LATENCY = registry.histogram(
+    "claude_gherkin_route_duration_seconds",
+    "Gherkin generation attempt latency by routed model and story size",
+    ["model", "size"],
+)
+
+_STEP_PATTERN = re.compile(r"^\s*(Given|When|Then|And|But)\b", re.MULTILINE)
+
+
+class GherkinRoute:
+    """The model and token limit chosen for one Gherkin generation attempt"""
+
+    def __init__(self, model: str, max_tokens: int, size: str):
+        self.model = model
+        self.max_tokens = max_tokens
+        self.size = size
+
+    def __repr__(self) -> str:
+        return f"GherkinRoute(model={self.model!r}, max_tokens={self.max_tokens}, size={self.size!r})"
+
+
+class GherkinRoutingPolicy:
+    """
+    Pick a model and max_tokens for a story from its size and a latency budget
+
+    The expected latency of a model is estimated as time to first token plus
+    the expected output at the model's decode rate. The fast model serves any
+    story it can finish within budget unless the story is large enough to be
+    routed to the large model outright; the large model is also the escalation
+    target when fast output fails validation. A story too long for either model
+    to finish within budget goes to the fast model, the quicker of the two, and
+    is logged so the budget can be revisited.
+    """
+
+    # Rough per-model latency characteristics, used only for routing
+    MODEL_PROFILES = {
+        "fast": {"ttft_ms": 400, "tokens_per_second": 120},
+        "large": {"ttft_ms": 1200, "tokens_per_second": 50},
+    }
+
+    # Gherkin is typically 2-3x as long as the prose it is generated from
+    OUTPUT_EXPANSION = 2.5
+    CHARS_PER_TOKEN = 4
+    MIN_MAX_TOKENS = 300
+    MAX_MAX_TOKENS = 2000
+
+    def __init__(
+        self,
+        fast_model: Optional[str] = None,
+        large_model: Optional[str] = None,
+        latency_budget_ms: Optional[int] = None,
+        large_story_chars: Optional[int] = None,
+    ):
+        self.fast_model = fast_model or settings.CLAUDE_GHERKIN_FAST_MODEL
+        self.large_model = large_model or settings.CLAUDE_GHERKIN_LARGE_MODEL
+        self.latency_budget_ms = latency_budget_ms or settings.CLAUDE_GHERKIN_LATENCY_BUDGET_MS
+        self.large_story_chars = large_story_chars or settings.CLAUDE_GHERKIN_LARGE_STORY_CHARS
+
+    def size_bucket(self, description: str) -> str:
+        length = len(description)
+        if length < 400:
+            return "small"
+        if length < self.large_story_chars:
+            return "medium"
+        return "large"
+
+    def estimate_output_tokens(self, title: str, description: str) -> int:
+        input_tokens = (len(title) + len(description)) / self.CHARS_PER_TOKEN
+        # Fixed overhead for the Feature/Scenario scaffolding
+        return int(input_tokens * self.OUTPUT_EXPANSION) + 120
+
+    def estimate_latency_ms(self, profile: str, output_tokens: int) -> float:
+        characteristics = self.MODEL_PROFILES[profile]
+        return characteristics["ttft_ms"] + output_tokens * 1000 / characteristics["tokens_per_second"]
+
+    def max_tokens_for(self, output_tokens: int) -> int:
+        # Leave headroom so a good answer is never truncated
+        return max(self.MIN_MAX_TOKENS, min(self.MAX_MAX_TOKENS, int(output_tokens * 1.5)))
+
+    def route(self, title: str, description: str) -> GherkinRoute:
+        """Choose the first attempt for a story"""
+        size = self.size_bucket(description)
+        output_tokens = self.estimate_output_tokens(title, description)
+        max_tokens = self.max_tokens_for(output_tokens)
+
+        large_fits_budget = self.estimate_latency_ms("large", output_tokens) <= self.latency_budget_ms
+        if size == "large" and large_fits_budget:
+            return GherkinRoute(self.large_model, max_tokens, size)
+
+        fast_latency_ms = self.estimate_latency_ms("fast", output_tokens)
+        if fast_latency_ms > self.latency_budget_ms:
+            print(
+                f"Gherkin routing: no model fits the {self.latency_budget_ms}ms budget "
+                f"(fast model ~{fast_latency_ms:.0f}ms for {output_tokens} tokens), using the fast model"
+            )
+        return GherkinRoute(self.fast_model, max_tokens, size)
+
+    def escalate(self, route: GherkinRoute) -> Optional[GherkinRoute]:
+        """The retry after a failed validation, or None if already on the large model"""
+        if route.model == self.large_model:
+            return None
+        return GherkinRoute(
+            self.large_model,
+            min(self.MAX_MAX_TOKENS, max(route.max_tokens * 2, 1000)),
+            route.size,
+        )
+
+    @staticmethod
+    def validate(gherkin: Optional[str], stop_reason: Optional[str] = None) -> bool:
+        """Check that generated output is complete, usable Gherkin"""
+        if not gherkin or stop_reason == "max_tokens":
+            return False
+        if "Feature:" not in gherkin or "Scenario" not in gherkin:
+            return False
+        keywords = {match.group(1) for match in _STEP_PATTERN.finditer(gherkin)}
+        return {"Given", "When", "Then"}.issubset(keywords)
+
+    @staticmethod
+    def record_outcome(route: GherkinRoute, outcome: str, wall_ms: Optional[float]) -> None:
+        """Publish the result of an attempt so routing thresholds can be tuned"""
+        GHERKIN_ROUTE_OUTCOMES.inc(model=route.model, size=route.size, outcome=outcome)
+        if wall_ms is not None:
+            GHERKIN_ROUTE_LATENCY.observe(wall_ms / 1000, model=route.model, size=route.size)
@@ -0,0 +1,179 @@
+"""
+Keeps per-worker caches coherent across workers and nodes over Postgres NOTIFY
+
+Every flush that writes a story, task or user publishes the changed ids on
+the cache_invalidation channel, inside the writing transaction, so the
+message goes out exactly when the write commits. Every worker LISTENs
+(through the shared pg_listener connection) and, for writes made by
+another worker:
+
+- evicts the rows from the entity cache, and
+- refreshes the story in the in-process title, step and similarity
+  indexes, which the writing worker already updated itself.
+
+The writing worker's own cache is invalidated at commit by the entity
+cache, so by default handlers only see other workers' messages. If the
+listener loses its connection, messages may have been missed and the
+entity cache is cleared once it is back.
+
+cache_invalidation_lag_seconds measures flush-to-delivery time on the
+receiving worker. It spans machines, so it relies on their clocks being
+in sync (NTP is plenty at this resolution).
+"""
+
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.metrics import registry
+from app.db.session import SessionLocal
+from app.models.user_story import UserStory
+from app.services.entity_cache import CACHED_MODELS, entity_cache
+from app.services.pg_listener import notify, pg_listener
+from app.services.similarity import story_similarity
+from app.services.step_index import step_index
+from app.services.title_index import title_index
+
+INVALIDATION_CHANNEL = "cache_invalidation"
+# Identifies this process's own messages
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+# Ids per NOTIFY, keeping payloads well under the 8000 byte limit
+MAX_IDS_PER_MESSAGE = 100
+
+INVALIDATION_LAG = registry.histogram(
+    "cache_invalidation_lag_seconds",
+    "Time from a write's flush to its invalidation reaching another worker",
+    ["entity"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+INVALIDATIONS_RECEIVED = registry.counter(
+    "cache_invalidations_received_total", "Invalidations received from other workers", ["entity"]
+)
+INVALIDATION_RESETS = registry.counter(
+    "cache_invalidation_resets_total", "Caches cleared because invalidations may have been missed"
+)
+
+
+class InvalidationBus:
+    def __init__(self):
+        # entity -> [(handler, include_own)]
+        self._handlers: Dict[str, List[Tuple[Callable[[str], None], bool]]] = {}
+        self._reset_handlers: List[Callable[[], None]] = []
+        self._started = False
+
+    def subscribe(self, entity: str, handler: Callable[[str], None], include_own: bool = False) -> None:
+        """
+        Call handler(entity_id) when another worker writes an entity of this kind
+
+        With include_own, writes made by this worker are passed on too, once
+        they have committed.
+        """
+        self._handlers.setdefault(entity, []).append((handler, include_own))
+
+    def on_reset(self, handler: Callable[[], None]) -> None:
+        """Call handler when invalidations may have been lost"""
+        self._reset_handlers.append(handler)
+
+    async def start(self) -> None:
+        if self._started:
+            return
+        pg_listener.add_handler(INVALIDATION_CHANNEL, self._receive)
+        pg_listener.on_reconnect(self._reset)
+        await pg_listener.start()
+        self._started = True
+
+    def publish(self, connection, changes: List[Tuple[str, str]]) -> None:
+        """Send changed (entity, id) pairs; call inside the writing transaction"""
+        sent = time.time()
+        for start in range(0, len(changes), MAX_IDS_PER_MESSAGE):
+            payload = {
+                "origin": WORKER_ID,
+                "sent": sent,
+                "changes": changes[start:start + MAX_IDS_PER_MESSAGE],
+            }
+            notify(connection, INVALIDATION_CHANNEL, json.dumps(payload, separators=(",", ":")))
+
+    def _receive(self, payload: str) -> None:
+        message = json.loads(payload)
+        own = message.get("origin") == WORKER_ID
+        lag = max(time.time() - message.get("sent", time.time()), 0)
+        for entity, entity_id in message.get("changes", ()):
+            if not own:
+                INVALIDATIONS_RECEIVED.inc(entity=entity)
+                INVALIDATION_LAG.observe(lag, entity=entity)
+            for handler, include_own in self._handlers.get(entity, ()):
+                if own and not include_own:
+                    continue
+                try:
+                    handler(entity_id)
+                except Exception as e:
+                    print(f"Error invalidating {entity} {entity_id}: {e}")
+
+    def _reset(self) -> None:
+        INVALIDATION_RESETS.inc()
+        for handler in self._reset_handlers:
+            handler()
+
+
+def written_changes(session: Session) -> List[Tuple[str, str]]:
+    """(entity, id) of every cached-model row the flush in progress wrote"""
+    changes = set()
+    for row in (*session.new, *session.dirty, *session.deleted):
+        entity = CACHED_MODELS.get(type(row))
+        if not entity:
+            continue
+        state = inspect(row)
+        # Inserted rows only get an identity after after_flush; their
+        # primary key is already set, though
+        row_id = state.identity[0] if state.identity else state.dict.get("id")
+        if row_id is not None:
+            changes.add((entity, str(row_id)))
+    return sorted(changes)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _publish_writes(session: Session, flush_context) -> None:
+    if session.bind is None or session.bind.dialect.name != "postgresql":
+        return
+    changes = written_changes(session)
+    if changes:
+        invalidation_bus.publish(session.connection(), changes)
+
+
+def _refresh_story_indexes(story_id: str) -> None:
+    """Bring this worker's story indexes in line with another worker's write"""
+    db = SessionLocal()
+    try:
+        story = db.get(UserStory, uuid.UUID(story_id))
+        if story is None:
+            step_index.update_story(uuid.UUID(story_id), None)
+            story_similarity.remove(uuid.UUID(story_id))
+            title_index.remove(uuid.UUID(story_id))
+            return
+        story_similarity.upsert(story.id, story.title, story.description)
+        title_index.upsert(story.id, story.title, story.updated_at)
+        step_index.update_story(story.id, story.gherkin_ast)
+    finally:
+        db.close()
+
+
+def _on_story_changed(story_id: str) -> None:
+    # Handlers run on the event loop: do the database read in a thread
+    asyncio.get_running_loop().run_in_executor(None, _refresh_story_indexes, story_id)
+
+
+invalidation_bus = InvalidationBus()
+
+for _model, _entity in CACHED_MODELS.items():
+    invalidation_bus.subscribe(
+        _entity, lambda entity_id, model=_model: entity_cache.invalidate(model, uuid.UUID(entity_id))
+    )
+invalidation_bus.subscribe("story", _on_story_changed)
+invalidation_bus.on_reset(entity_cache.clear)
@@ -0,0 +1,537 @@
+"""
+Structural validation of OpenAPI 3.0 and 3.1 documents
+
+Every problem is reported with the JSON pointer (RFC 6901) of the offending
+node, e.g. "/paths/~1pets~1{id}/get/responses". Local $refs are resolved
+once and memoised, and chains of $refs that loop back on themselves are
+reported instead of followed forever. Recursive schemas are fine: a schema
+is only descended into where it is defined, never through a $ref.
+External $refs (other files or URLs) cannot be resolved from a single
+upload and are not checked.
+
+Parsed specs are cached on disk by content hash in pickle form, so
+re-validating an unchanged 10MB spec skips YAML parsing entirely.
+"""
+
+import json
+import os
+import pickle
+import re
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+import yaml
+
+from app.core.config import settings
+
+# libyaml's loader is roughly 10x faster on large specs
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_VERSION = re.compile(r"^3\.([01])\.\d+(-.+)?$")
+_COMPONENT_KEY = re.compile(r"^[a-zA-Z0-9._-]+$")
+_STATUS_CODE = re.compile(r"^(default|[1-5](\d\d|XX))$")
+_PATH_TEMPLATE = re.compile(r"\{([^}/]+)\}")
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+PARAMETER_LOCATIONS = ("query", "header", "path", "cookie")
+COMPONENT_SECTIONS = (
+    "schemas", "responses", "parameters", "examples", "requestBodies",
+    "headers", "securitySchemes", "links", "callbacks", "pathItems",
+)
+SCHEMA_TYPES = ("array", "boolean", "integer", "number", "object", "string", "null")
+SCHEMA_LIST_KEYWORDS = ("allOf", "anyOf", "oneOf", "prefixItems")
+SCHEMA_MAP_KEYWORDS = ("properties", "patternProperties", "$defs")
+SCHEMA_KEYWORDS = ("items", "not", "additionalProperties", "contains", "propertyNames")
+
+# Responses stay readable even for specs that are broken everywhere
+MAX_ISSUES = 200
+
+
+def escape_pointer_token(token: Any) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _child(pointer: str, token: Any) -> str:
+    return f"{pointer}/{escape_pointer_token(token)}"
+
+
+def _issue(pointer: str, message: str) -> Dict[str, str]:
+    return {"pointer": pointer, "message": message}
+
+
+def format_issue(issue: Dict[str, str]) -> str:
+    return f"{issue['pointer'] or '/'}: {issue['message']}"
+
+
+# Parsing and the parse cache
+
+class SpecParseError(Exception):
+    """The document is not well-formed JSON or YAML"""
+
+
+def parse_spec(path: str) -> Any:
+    with open(path, "rb") as f:
+        return parse_spec_bytes(f.read(), os.path.splitext(path)[1])
+
+
+def parse_spec_bytes(data: bytes, extension: str) -> Any:
+    """Parse JSON or YAML content; the extension (".json", ".yaml", ...) picks the parser"""
+    extension = extension.lower()
+    try:
+        if extension == ".json":
+            return json.loads(data)
+        if extension in (".yaml", ".yml"):
+            return yaml.load(data, Loader=_YAML_LOADER)
+    except json.JSONDecodeError as e:
+        raise SpecParseError(f"Invalid JSON at line {e.lineno}, column {e.colno}: {e.msg}")
+    except UnicodeDecodeError as e:
+        raise SpecParseError(f"Document is not valid UTF-8: {str(e)}")
+    except yaml.YAMLError as e:
+        mark = getattr(e, "problem_mark", None)
+        where = f" at line {mark.line + 1}, column {mark.column + 1}" if mark else ""
+        problem = getattr(e, "problem", None) or str(e)
+        raise SpecParseError(f"Invalid YAML{where}: {problem}")
+    raise SpecParseError("Unknown file format. Expected JSON or YAML.")
+
+
+def load_spec(path: str, digest: str, cache_dir: Optional[str] = None) -> Any:
+    """Parse a spec file, or load it from the cache entry for its content hash"""
+    return load_cached_spec(digest, os.path.splitext(path)[1], lambda: parse_spec(path), cache_dir)
+
+
+def load_cached_spec(digest: str, extension: str, parse: Callable[[], Any],
+                     cache_dir: Optional[str] = None) -> Any:
+    """Return the cached parse for a content hash, calling parse() and caching on a miss"""
+    cache_dir = cache_dir or settings.DOCUMENT_PARSE_CACHE_DIR
+    # The extension decides the parser, so it is part of the key
+    extension = extension.lower().lstrip(".")
+    cache_path = os.path.join(cache_dir, digest[:2], f"{digest}.{extension}.pickle")
+
+    try:
+        with open(cache_path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError) as e:
+        print(f"Ignoring unreadable parse cache entry {cache_path}: {str(e)}")
+
+    spec = parse()
+
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(spec, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Could not write parse cache entry {cache_path}: {str(e)}")
+    return spec
+
+
+# Validation
+
+_MISSING = object()
+
+
+class OpenAPIValidator:
+    def __init__(self, spec: Any):
+        self.spec = spec
+        self.issues: List[Dict[str, str]] = []
+        self.minor = 0
+        # ref -> resolved node, or _MISSING once reported as unresolvable
+        self._resolved: Dict[str, Any] = {}
+        self._ref_errors: Dict[str, str] = {}
+        self._operation_ids: Dict[str, str] = {}
+
+    def validate(self) -> List[Dict[str, str]]:
+        spec = self.spec
+        if not isinstance(spec, dict):
+            self._add("", "Document root must be an object")
+            return self.issues
+
+        version = spec.get("openapi")
+        if version is None:
+            self._add("", "Missing 'openapi' version field")
+        elif not isinstance(version, str) or not _VERSION.match(version):
+            self._add("/openapi", f"Unsupported OpenAPI version {version!r}; expected 3.0.x or 3.1.x")
+        else:
+            self.minor = int(_VERSION.match(version).group(1))
+
+        self._check_info(spec)
+        self._check_servers(spec.get("servers"), "/servers")
+
+        if "paths" in spec:
+            self._check_paths(spec["paths"], "/paths")
+        elif self.minor == 0:
+            self._add("", "Missing 'paths' section")
+        elif "components" not in spec and "webhooks" not in spec:
+            self._add("", "OpenAPI 3.1 documents need 'paths', 'components' or 'webhooks'")
+
+        if "webhooks" in spec:
+            if self.minor == 0:
+                self._add("/webhooks", "'webhooks' requires OpenAPI 3.1")
+            elif self._expect_object(spec["webhooks"], "/webhooks"):
+                for name, item in spec["webhooks"].items():
+                    self._check_path_item(item, _child("/webhooks", name), template_params=())
+
+        if "components" in spec:
+            self._check_components(spec["components"], "/components")
+
+        self._check_refs()
+
+        if len(self.issues) > MAX_ISSUES:
+            hidden = len(self.issues) - MAX_ISSUES
+            self.issues = self.issues[:MAX_ISSUES]
+            self.issues.append(_issue("", f"{hidden} more issues not shown"))
+        return self.issues
+
+    # $ref resolution
+
+    def resolve(self, ref: str) -> Any:
+        """Resolve a local $ref, following chains; returns _MISSING if it can't"""
+        if ref in self._resolved:
+            return self._resolved[ref]
+
+        chain = [ref]
+        target = self._lookup(ref)
+        error = None if target is not _MISSING else f"Unresolvable $ref {ref!r}"
+        while error is None and isinstance(target, dict) and isinstance(target.get("$ref"), str):
+            next_ref = target["$ref"]
+            if not next_ref.startswith("#"):
+                break
+            if next_ref in chain:
+                error = "Circular $ref: " + " -> ".join(chain + [next_ref])
+            elif next_ref in self._resolved:
+                target = self._resolved[next_ref]
+                error = self._ref_errors.get(next_ref)
+                break
+            else:
+                chain.append(next_ref)
+                target = self._lookup(next_ref)
+                if target is _MISSING:
+                    error = f"$ref {ref!r} leads to unresolvable {next_ref!r}"
+
+        # Every ref on the chain ends at the same target
+        for link in chain:
+            self._resolved[link] = _MISSING if error else target
+            if error:
+                self._ref_errors[link] = error
+        return self._resolved[ref]
+
+    def _lookup(self, ref: str) -> Any:
+        if ref == "#":
+            return self.spec
+        if not ref.startswith("#/"):
+            return _MISSING
+        node = self.spec
+        for raw in ref[2:].split("/"):
+            token = unquote(raw).replace("~1", "/").replace("~0", "~")
+            if isinstance(node, dict) and token in node:
+                node = node[token]
+            elif isinstance(node, list) and token.isdigit() and int(token) < len(node):
+                node = node[int(token)]
+            else:
+                return _MISSING
+        return node
+
+    def _deref(self, node: Any) -> Any:
+        """The node a possibly-$ref'd value stands for; _MISSING if unresolvable or external"""
+        if isinstance(node, dict) and isinstance(node.get("$ref"), str):
+            if not node["$ref"].startswith("#"):
+                return _MISSING
+            return self.resolve(node["$ref"])
+        return node
+
+    def _check_refs(self) -> None:
+        """Report every $ref in the document that doesn't resolve, where it appears"""
+        stack: List[Tuple[Any, str]] = [(self.spec, "")]
+        while stack:
+            node, pointer = stack.pop()
+            if isinstance(node, dict):
+                ref = node.get("$ref")
+                if isinstance(ref, str) and ref.startswith("#"):
+                    if self.resolve(ref) is _MISSING:
+                        self._add(_child(pointer, "$ref"), self._ref_errors[ref])
+                elif "$ref" in node and not isinstance(ref, str):
+                    self._add(_child(pointer, "$ref"), "$ref must be a string")
+                for key, value in node.items():
+                    if isinstance(value, (dict, list)):
+                        stack.append((value, _child(pointer, key)))
+            elif isinstance(node, list):
+                for index, value in enumerate(node):
+                    if isinstance(value, (dict, list)):
+                        stack.append((value, _child(pointer, index)))
+
+    # Sections
+
+    def _check_info(self, spec: dict) -> None:
+        if "info" not in spec:
+            self._add("", "Missing 'info' section")
+            return
+        info = spec["info"]
+        if not self._expect_object(info, "/info"):
+            return
+        for field in ("title", "version"):
+            if field not in info:
+                self._add("/info", f"Missing required field '{field}'")
+            elif not isinstance(info[field], str):
+                self._add(_child("/info", field), f"'{field}' must be a string")
+
+    def _check_servers(self, servers: Any, pointer: str) -> None:
+        if servers is None:
+            return
+        if not isinstance(servers, list):
+            self._add(pointer, "'servers' must be an array")
+            return
+        for index, server in enumerate(servers):
+            server_pointer = _child(pointer, index)
+            if self._expect_object(server, server_pointer) and not isinstance(server.get("url"), str):
+                self._add(server_pointer, "Server needs a 'url' string")
+
+    def _check_paths(self, paths: Any, pointer: str) -> None:
+        if not self._expect_object(paths, pointer):
+            return
+        for path, item in paths.items():
+            path_pointer = _child(pointer, path)
+            if not str(path).startswith("/"):
+                self._add(path_pointer, "Path must start with '/'")
+            self._check_path_item(item, path_pointer, _PATH_TEMPLATE.findall(str(path)))
+
+    def _check_path_item(self, item: Any, pointer: str, template_params) -> None:
+        item = self._deref(item)
+        if item is _MISSING or not self._expect_object(item, pointer):
+            return
+        self._check_servers(item.get("servers"), _child(pointer, "servers"))
+        shared = self._check_parameters(item.get("parameters"), _child(pointer, "parameters"))
+
+        for method in HTTP_METHODS:
+            if method in item:
+                self._check_operation(item[method], _child(pointer, method), shared, template_params)
+
+    def _check_operation(self, operation: Any, pointer: str, shared: Dict[Tuple[str, str], dict],
+                         template_params) -> None:
+        if not self._expect_object(operation, pointer):
+            return
+
+        operation_id = operation.get("operationId")
+        if operation_id is not None:
+            id_pointer = _child(pointer, "operationId")
+            if operation_id in self._operation_ids:
+                self._add(id_pointer, f"Duplicate operationId {operation_id!r}, first used at "
+                                      f"{self._operation_ids[operation_id]}")
+            else:
+                self._operation_ids[operation_id] = id_pointer
+
+        own = self._check_parameters(operation.get("parameters"), _child(pointer, "parameters"))
+        declared = {name for (name, location) in {**shared, **own} if location == "path"}
+        for name in template_params:
+            if name not in declared:
+                self._add(pointer, f"Path parameter '{name}' is not declared")
+        for name in declared - set(template_params):
+            self._add(pointer, f"Path parameter '{name}' does not appear in the path")
+
+        if "requestBody" in operation:
+            self._check_request_body(operation["requestBody"], _child(pointer, "requestBody"))
+
+        if "responses" in operation:
+            self._check_responses(operation["responses"], _child(pointer, "responses"))
+        elif self.minor == 0:
+            self._add(pointer, "Missing required field 'responses'")
+
+        if "callbacks" in operation and self._expect_object(operation["callbacks"], _child(pointer, "callbacks")):
+            for name, callback in operation["callbacks"].items():
+                self._check_callback(callback, _child(_child(pointer, "callbacks"), name))
+
+    def _check_parameters(self, parameters: Any, pointer: str) -> Dict[Tuple[str, str], dict]:
+        """Validate a parameter list, returning the resolved ones by (name, in)"""
+        seen: Dict[Tuple[str, str], dict] = {}
+        if parameters is None:
+            return seen
+        if not isinstance(parameters, list):
+            self._add(pointer, "'parameters' must be an array")
+            return seen
+
+        for index, parameter in enumerate(parameters):
+            parameter_pointer = _child(pointer, index)
+            parameter = self._deref(parameter)
+            if parameter is _MISSING or not self._expect_object(parameter, parameter_pointer):
+                continue
+            name, location = parameter.get("name"), parameter.get("in")
+            if not isinstance(name, str):
+                self._add(parameter_pointer, "Parameter needs a 'name' string")
+                continue
+            if location not in PARAMETER_LOCATIONS:
+                self._add(_child(parameter_pointer, "in"),
+                          f"'in' must be one of {', '.join(PARAMETER_LOCATIONS)}")
+                continue
+            if location == "path" and parameter.get("required") is not True:
+                self._add(parameter_pointer, f"Path parameter '{name}' must have 'required: true'")
+            if ("schema" in parameter) == ("content" in parameter):
+                self._add(parameter_pointer, "Parameter needs exactly one of 'schema' or 'content'")
+            if "schema" in parameter:
+                self._check_schema(parameter["schema"], _child(parameter_pointer, "schema"))
+            if "content" in parameter:
+                self._check_content(parameter["content"], _child(parameter_pointer, "content"))
+            if (name, location) in seen:
+                self._add(parameter_pointer, f"Duplicate parameter '{name}' in {location}")
+            seen[(name, location)] = parameter
+        return seen
+
+    def _check_request_body(self, body: Any, pointer: str) -> None:
+        body = self._deref(body)
+        if body is _MISSING or not self._expect_object(body, pointer):
+            return
+        if "content" not in body:
+            self._add(pointer, "Missing required field 'content'")
+        else:
+            self._check_content(body["content"], _child(pointer, "content"))
+
+    def _check_responses(self, responses: Any, pointer: str) -> None:
+        if not self._expect_object(responses, pointer):
+            return
+        if not responses and self.minor == 0:
+            self._add(pointer, "'responses' must contain at least one response")
+        for code, response in responses.items():
+            response_pointer = _child(pointer, code)
+            if not _STATUS_CODE.match(str(code)):
+                self._add(response_pointer, f"Invalid response code {code!r}")
+            self._check_response(response, response_pointer)
+
+    def _check_response(self, response: Any, pointer: str) -> None:
+        response = self._deref(response)
+        if response is _MISSING or not self._expect_object(response, pointer):
+            return
+        if not isinstance(response.get("description"), str):
+            self._add(pointer, "Response needs a 'description' string")
+        if "content" in response:
+            self._check_content(response["content"], _child(pointer, "content"))
+        if "headers" in response and self._expect_object(response["headers"], _child(pointer, "headers")):
+            for name, header in response["headers"].items():
+                header = self._deref(header)
+                if header is not _MISSING and isinstance(header, dict) and "schema" in header:
+                    self._check_schema(header["schema"], _child(_child(_child(pointer, "headers"), name), "schema"))
+
+    def _check_content(self, content: Any, pointer: str) -> None:
+        if not self._expect_object(content, pointer):
+            return
+        for media_type, media in content.items():
+            media_pointer = _child(pointer, media_type)
+            if self._expect_object(media, media_pointer) and "schema" in media:
+                self._check_schema(media["schema"], _child(media_pointer, "schema"))
+
+    def _check_callback(self, callback: Any, pointer: str) -> None:
+        callback = self._deref(callback)
+        if callback is _MISSING or not self._expect_object(callback, pointer):
+            return
+        for expression, item in callback.items():
+            self._check_path_item(item, _child(pointer, expression), template_params=())
+
+    def _check_components(self, components: Any, pointer: str) -> None:
+        if not self._expect_object(components, pointer):
+            return
+        for section, entries in components.items():
+            section_pointer = _child(pointer, section)
+            if section not in COMPONENT_SECTIONS:
+                if not str(section).startswith("x-"):
+                    self._add(section_pointer, f"Unknown components section '{section}'")
+                continue
+            if section == "pathItems" and self.minor == 0:
+                self._add(section_pointer, "'pathItems' requires OpenAPI 3.1")
+            if not self._expect_object(entries, section_pointer):
+                continue
+            for name, entry in entries.items():
+                entry_pointer = _child(section_pointer, name)
+                if not _COMPONENT_KEY.match(str(name)):
+                    self._add(entry_pointer, "Component names may only contain letters, digits, '.', '_' and '-'")
+                if section == "schemas":
+                    self._check_schema(entry, entry_pointer)
+                elif section == "responses":
+                    self._check_response(entry, entry_pointer)
+                elif section == "parameters":
+                    self._check_parameter_component(entry, entry_pointer)
+                elif section == "requestBodies":
+                    self._check_request_body(entry, entry_pointer)
+                elif section == "pathItems":
+                    self._check_path_item(entry, entry_pointer, template_params=())
+                elif section == "callbacks":
+                    self._check_callback(entry, entry_pointer)
+
+    def _check_parameter_component(self, parameter: Any, pointer: str) -> None:
+        # Reuse the list check, then re-anchor its pointers at the component
+        before = len(self.issues)
+        self._check_parameters([parameter], pointer)
+        prefix = f"{pointer}/0"
+        for issue in self.issues[before:]:
+            if issue["pointer"].startswith(prefix):
+                issue["pointer"] = pointer + issue["pointer"][len(prefix):]
+
+    # Schemas
+
+    def _check_schema(self, schema: Any, pointer: str) -> None:
+        """Check a schema defined at pointer; $ref'd schemas are checked where they live"""
+        stack = [(schema, pointer)]
+        while stack:
+            schema, pointer = stack.pop()
+            if isinstance(schema, bool):
+                if self.minor == 0:
+                    self._add(pointer, "Boolean schemas require OpenAPI 3.1")
+                continue
+            if not self._expect_object(schema, pointer):
+                continue
+            if "$ref" in schema and (self.minor == 0 or len(schema) == 1):
+                # 3.0 ignores siblings of $ref; resolution is checked document-wide
+                continue
+
+            schema_type = schema.get("type")
+            if schema_type is not None:
+                types = schema_type if isinstance(schema_type, list) and self.minor == 1 else [schema_type]
+                for value in types:
+                    if value not in SCHEMA_TYPES or (value == "null" and self.minor == 0):
+                        self._add(_child(pointer, "type"), f"Invalid schema type {value!r}")
+                if self.minor == 0 and schema_type == "array" and "items" not in schema:
+                    self._add(pointer, "Array schemas must define 'items'")
+
+            required = schema.get("required")
+            if required is not None and (
+                not isinstance(required, list) or not all(isinstance(name, str) for name in required)
+            ):
+                self._add(_child(pointer, "required"), "'required' must be an array of property names")
+
+            for keyword in SCHEMA_KEYWORDS:
+                if keyword in schema:
+                    value = schema[keyword]
+                    if keyword == "additionalProperties" and isinstance(value, bool):
+                        continue
+                    stack.append((value, _child(pointer, keyword)))
+            for keyword in SCHEMA_LIST_KEYWORDS:
+                if keyword in schema:
+                    values = schema[keyword]
+                    keyword_pointer = _child(pointer, keyword)
+                    if not isinstance(values, list) or not values:
+                        self._add(keyword_pointer, f"'{keyword}' must be a non-empty array")
+                        continue
+                    stack.extend((value, _child(keyword_pointer, i)) for i, value in enumerate(values))
+            for keyword in SCHEMA_MAP_KEYWORDS:
+                if keyword in schema:
+                    keyword_pointer = _child(pointer, keyword)
+                    if self._expect_object(schema[keyword], keyword_pointer):
+                        stack.extend(
+                            (value, _child(keyword_pointer, name)) for name, value in schema[keyword].items()
+                        )
+
+    # Helpers
+
+    def _expect_object(self, node: Any, pointer: str) -> bool:
+        if isinstance(node, dict):
+            return True
+        self._add(pointer, "Expected an object")
+        return False
+
+    def _add(self, pointer: str, message: str) -> None:
+        self.issues.append(_issue(pointer, message))
+
+
+def validate_openapi(spec: Any) -> List[Dict[str, str]]:
+    """Validate a parsed spec, returning issues as {"pointer", "message"} dicts"""
+    return OpenAPIValidator(spec).validate()
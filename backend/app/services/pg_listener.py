@@ -0,0 +1,151 @@
+"""
+One Postgres LISTEN connection per process, dispatching NOTIFY payloads
+
+The connection is plain psycopg2 in autocommit mode, watched by the event
+loop with add_reader(), so notifications are handled on the loop thread
+without a polling thread. Handlers are called synchronously per payload
+and must not block.
+
+If the connection drops, notifications sent in the meantime are lost:
+the listener reconnects with backoff and calls the reconnect handlers so
+consumers can tell their clients to resync.
+"""
+
+import asyncio
+import re
+from typing import Callable, Dict, List, Optional
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy import func, select
+
+from app.db.session import engine
+
+_CHANNEL = re.compile(r"^[a-z_][a-z0-9_]*$")
+# A silently dropped connection is only noticed when we use it
+KEEPALIVE_SECONDS = 30
+MAX_RECONNECT_DELAY = 30
+
+
+def notify(connection, channel: str, payload: str) -> None:
+    """NOTIFY inside the caller's transaction: delivered on commit, dropped on rollback"""
+    connection.execute(select(func.pg_notify(channel, payload)))
+
+
+class PgListener:
+    def __init__(self, dsn: Optional[str] = None):
+        self._dsn = dsn
+        self._handlers: Dict[str, List[Callable[[str], None]]] = {}
+        self._reconnect_handlers: List[Callable[[], None]] = []
+        self._conn = None
+        self._lost: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+        self._connected_once = False
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    def add_handler(self, channel: str, handler: Callable[[str], None]) -> None:
+        if not _CHANNEL.match(channel):
+            raise ValueError(f"Invalid channel name: {channel}")
+        first = channel not in self._handlers
+        self._handlers.setdefault(channel, []).append(handler)
+        if first and self._conn is not None:
+            self._listen(channel)
+
+    def on_reconnect(self, handler: Callable[[], None]) -> None:
+        self._reconnect_handlers.append(handler)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        delay = 1
+        while True:
+            try:
+                await self._connect()
+                delay = 1
+                while True:
+                    try:
+                        await asyncio.wait_for(asyncio.shield(self._lost), KEEPALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        with self._conn.cursor() as cur:
+                            cur.execute("SELECT 1")
+                        # The query reads any notifications that arrived with
+                        # it, and the reader won't fire for those
+                        self._dispatch_pending()
+            except asyncio.CancelledError:
+                self._disconnect()
+                raise
+            except psycopg2.Error as e:
+                print(f"Postgres listener connection lost, retrying in {delay}s: {e}")
+            self._disconnect()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    async def _connect(self) -> None:
+        dsn = self._dsn or engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        # Connecting can block for a long time when the database is unreachable
+        self._conn = await asyncio.to_thread(psycopg2.connect, dsn)
+        self._conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        for channel in self._handlers:
+            self._listen(channel)
+
+        loop = asyncio.get_running_loop()
+        self._lost = loop.create_future()
+        loop.add_reader(self._conn.fileno(), self._on_readable)
+
+        if self._connected_once:
+            for handler in self._reconnect_handlers:
+                handler()
+        self._connected_once = True
+
+    def _listen(self, channel: str) -> None:
+        with self._conn.cursor() as cur:
+            cur.execute(f"LISTEN {channel}")
+
+    def _disconnect(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            asyncio.get_running_loop().remove_reader(self._conn.fileno())
+        except (ValueError, psycopg2.Error):
+            pass
+        try:
+            self._conn.close()
+        except psycopg2.Error:
+            pass
+        self._conn = None
+
+    def _on_readable(self) -> None:
+        try:
+            self._conn.poll()
+        except psycopg2.Error as e:
+            asyncio.get_running_loop().remove_reader(self._conn.fileno())
+            if not self._lost.done():
+                self._lost.set_exception(e)
+            return
+        self._dispatch_pending()
+
+    def _dispatch_pending(self) -> None:
+        while self._conn.notifies:
+            notification = self._conn.notifies.pop(0)
+            for handler in self._handlers.get(notification.channel, ()):
+                try:
+                    handler(notification.payload)
+                except Exception as e:
+                    print(f"Error handling notification on {notification.channel}: {e}")
+
+
+pg_listener = PgListener()
@@ -0,0 +1,217 @@
+"""
+Near-duplicate story detection with hashed TF-IDF vectors
+
+Each story's title and description are hashed into a fixed number of
+features (the "hashing trick"), so the vocabulary never has to be stored
+and vectors can be added incrementally. Rows are kept L2-normalised in one
+NumPy matrix, so top-k cosine similarity is a single matrix-vector product.
+
+Each token also gets a sign from its hash, so colliding tokens cancel out
+in expectation instead of adding up. With unsigned buckets, two unrelated
+stories of ~100 distinct terms share ~20 of 512 buckets and score around
+0.2, close to SIMILARITY_MIN_SCORE. Signed, that overlap averages out to
+0 +/- ~0.05, so 512 features are enough at story length.
+
+Memory is 6 bytes per feature per story (float32 weighted rows plus
+float16 raw term counts for re-weighting): ~3KB per story, ~307MB for
+100k stories at the default 512 features.
+"""
+
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can for from has have i in is it of on or so that the "
+    "this to user users want we when will with".split()
+)
+TITLE_WEIGHT = 2.0
+
+
+class StorySimilarityIndex:
+    def __init__(self, features: Optional[int] = None):
+        self.features = features or settings.SIMILARITY_FEATURES
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._counts = np.zeros((0, self.features), dtype=np.float16)
+        self._weighted = np.zeros((0, self.features), dtype=np.float32)
+        self._doc_freq = np.zeros(self.features, dtype=np.int64)
+        self._idf = np.ones(self.features, dtype=np.float32)
+        self._idf_docs = 0
+        self._rows: Dict[UUID, int] = {}
+        self._ids: List[Optional[UUID]] = []
+        self._free: List[int] = []
+        # Writes made while the initial load runs; its snapshot may predate them
+        self._pending: Optional[Dict[UUID, Optional[Tuple[str, str]]]] = None
+
+    # Building and maintenance
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self._loaded:
+            return
+        from app.models.user_story import UserStory
+
+        with self._lock:
+            if self._loaded:
+                return
+            if self._pending is None:
+                self._pending = {}
+        rows = db.query(UserStory.id, UserStory.title, UserStory.description).all()
+        with self._lock:
+            if self._loaded:
+                return
+            counts = np.zeros((len(rows), self.features), dtype=np.float16)
+            for i, (story_id, title, description) in enumerate(rows):
+                counts[i] = self._term_counts(title, description)
+                self._rows[story_id] = i
+                self._ids.append(story_id)
+            self._counts = counts
+            self._doc_freq = (counts != 0).sum(axis=0).astype(np.int64)
+            self._reweight()
+            for story_id, text in self._pending.items():
+                if text is None:
+                    self._remove(story_id)
+                else:
+                    self._upsert(story_id, *text)
+            self._pending = None
+            self._loaded = True
+            print(f"Similarity index loaded: {len(rows)} stories, {self.features} features")
+
+    def upsert(self, story_id: UUID, title: str, description: str) -> None:
+        """Add or replace a story's vector"""
+        with self._lock:
+            if not self._loaded:
+                if self._pending is not None:
+                    # Loading: replay this once the snapshot is in
+                    self._pending[story_id] = (title, description)
+                # Otherwise the initial load will pick up the committed state
+                return
+            self._upsert(story_id, title, description)
+
+    def remove(self, story_id: UUID) -> None:
+        with self._lock:
+            if not self._loaded:
+                if self._pending is not None:
+                    self._pending[story_id] = None
+                return
+            self._remove(story_id)
+
+    # Queries
+
+    def similar_to_story(self, story_id: UUID, k: int = 5) -> List[Tuple[UUID, float]]:
+        with self._lock:
+            row = self._rows.get(story_id)
+            if row is None:
+                return []
+            return self._top_k(self._weighted[row], k, exclude_row=row)
+
+    def similar_to_text(self, title: str, description: str, k: int = 5) -> List[Tuple[UUID, float]]:
+        with self._lock:
+            query = self._weigh(self._term_counts(title, description).astype(np.float32))
+            return self._top_k(query, k)
+
+    # Internals
+
+    def _upsert(self, story_id: UUID, title: str, description: str) -> None:
+        counts = self._term_counts(title, description)
+        row = self._rows.get(story_id)
+        if row is None:
+            row = self._allocate_row(story_id)
+        else:
+            self._doc_freq -= self._counts[row] != 0
+        self._counts[row] = counts
+        self._doc_freq += counts != 0
+        self._weighted[row] = self._weigh(counts.astype(np.float32))
+        self._maybe_reweight()
+
+    def _remove(self, story_id: UUID) -> None:
+        row = self._rows.pop(story_id, None)
+        if row is None:
+            return
+        self._doc_freq -= self._counts[row] != 0
+        self._counts[row] = 0
+        self._weighted[row] = 0
+        self._ids[row] = None
+        self._free.append(row)
+
+    def _top_k(self, query: np.ndarray, k: int, exclude_row: Optional[int] = None) -> List[Tuple[UUID, float]]:
+        if not self._ids or not query.any():
+            return []
+        # Rows past len(_ids) are spare capacity
+        scores = self._weighted[:len(self._ids)] @ query
+        if exclude_row is not None:
+            scores[exclude_row] = -1.0
+        k = min(k, len(scores))
+        # argpartition is O(n); only the k winners get sorted
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        candidates = candidates[np.argsort(-scores[candidates])]
+        threshold = settings.SIMILARITY_MIN_SCORE
+        return [
+            (self._ids[i], float(scores[i]))
+            for i in candidates
+            if scores[i] >= threshold and self._ids[i] is not None
+        ]
+
+    def _tokens(self, text: str) -> List[str]:
+        words = [w for w in _TOKEN.findall((text or "").lower()) if w not in _STOPWORDS]
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def _term_counts(self, title: str, description: str) -> np.ndarray:
+        counts = np.zeros(self.features, dtype=np.float32)
+        for weight, text in ((TITLE_WEIGHT, title), (1.0, description)):
+            for token in self._tokens(text):
+                hashed = zlib.crc32(token.encode())
+                # Bucket from the low bits, sign from the top bit
+                counts[hashed % self.features] += -weight if hashed >> 31 else weight
+        # Sublinear tf keeps long descriptions from dominating
+        counts = np.sign(counts) * np.log1p(np.abs(counts))
+        return counts.astype(np.float16)
+
+    def _weigh(self, counts: np.ndarray) -> np.ndarray:
+        vector = counts * self._idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _reweight(self) -> None:
+        docs = max(len(self._rows), 1)
+        self._idf = (np.log((1 + docs) / (1 + self._doc_freq)) + 1).astype(np.float32)
+        self._idf_docs = docs
+        weighted = self._counts.astype(np.float32) * self._idf
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        self._weighted = weighted / norms
+
+    def _maybe_reweight(self) -> None:
+        # IDF drifts slowly; re-weight everything once the corpus grew by 10%
+        if len(self._rows) > self._idf_docs * 1.1 + 10:
+            self._reweight()
+
+    def _allocate_row(self, story_id: UUID) -> int:
+        if self._free:
+            row = self._free.pop()
+            self._ids[row] = story_id
+        else:
+            row = len(self._ids)
+            if row >= self._counts.shape[0]:
+                capacity = max(64, self._counts.shape[0] * 2)
+                self._counts = self._grow(self._counts, capacity)
+                self._weighted = self._grow(self._weighted, capacity)
+            self._ids.append(story_id)
+        self._rows[story_id] = row
+        return row
+
+    def _grow(self, matrix: np.ndarray, capacity: int) -> np.ndarray:
+        grown = np.zeros((capacity, self.features), dtype=matrix.dtype)
+        grown[:matrix.shape[0]] = matrix
+        return grown
+
+
+story_similarity = StorySimilarityIndex()
@@ -0,0 +1,70 @@
+"""
+Single-flight coalescing of identical expensive reads
+
+Concurrent callers asking for the same key share one computation: the
+first starts it, the others await the same task. A finished result is
+also handed out for a short window afterwards, which absorbs bursts
+such as everyone opening the dashboard when a standup starts.
+
+Keys must include everything the result depends on: route, normalized
+parameters and visibility scope. forget() drops in-flight and recent
+results, e.g. after a write; a computation that was already running
+then can't repopulate the window with its older result.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from app.core.metrics import registry
+
+SINGLE_FLIGHT_REQUESTS = registry.counter(
+    "single_flight_requests_total",
+    "Coalesced reads by how they were served: computed, joined in flight, or from the sharing window",
+    ["name", "result"],
+)
+
+
+class SingleFlight:
+    def __init__(self, name: str, window: float):
+        self.name = name
+        self.window = window
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._recent: Dict[Hashable, Tuple[float, Any]] = {}
+        self._generation = 0
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        recent = self._recent.get(key)
+        if recent is not None:
+            if recent[0] > time.monotonic():
+                SINGLE_FLIGHT_REQUESTS.inc(name=self.name, result="window")
+                return recent[1]
+            del self._recent[key]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            SINGLE_FLIGHT_REQUESTS.inc(name=self.name, result="joined")
+        else:
+            SINGLE_FLIGHT_REQUESTS.inc(name=self.name, result="computed")
+            task = asyncio.create_task(compute())
+            self._in_flight[key] = task
+            generation = self._generation
+            task.add_done_callback(lambda t: self._on_done(key, t, generation))
+        # Shield so one caller disconnecting doesn't cancel the others' result
+        return await asyncio.shield(task)
+
+    def forget(self) -> None:
+        self._generation += 1
+        self._in_flight.clear()
+        self._recent.clear()
+
+    def _on_done(self, key: Hashable, task: asyncio.Task, generation: int) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        if self.window > 0 and generation == self._generation:
+            now = time.monotonic()
+            # Keys include parameters, so drop expired results rather than let them pile up
+            self._recent = {k: v for k, v in self._recent.items() if v[0] > now}
+            self._recent[key] = (now + self.window, task.result())
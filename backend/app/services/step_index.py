@@ -0,0 +1,182 @@
+"""
+In-memory library of Gherkin steps with a trigram index for fuzzy lookup
+
+Built from user_stories.gherkin_ast on first use and kept current by the
+crud write paths, so suggestions never re-parse or scan story text.
+"""
+
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.services.gherkin_parser import iter_steps
+
+_QUOTED = re.compile(r"\"[^\"]*\"|'[^']*'|<[^>]+>")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_NON_WORD = re.compile(r"[^a-z0-9{} ]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_step(text: str) -> str:
+    """Fold case, whitespace and literal values so parameterised steps match"""
+    text = _QUOTED.sub(" {} ", text.lower())
+    text = _NUMBER.sub(" {} ", text)
+    text = _NON_WORD.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class StepEntry:
+    """A distinct step and the stories that use it"""
+
+    __slots__ = ("step_id", "keyword", "text", "normalized", "grams", "story_ids")
+
+    def __init__(self, step_id: int, keyword: str, text: str, normalized: str):
+        self.step_id = step_id
+        self.keyword = keyword
+        self.text = text
+        self.normalized = normalized
+        self.grams = trigrams(normalized)
+        self.story_ids: Dict[UUID, int] = {}
+
+    @property
+    def usage_count(self) -> int:
+        return sum(self.story_ids.values())
+
+
+class StepIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._next_id = 0
+        self._entries: Dict[int, StepEntry] = {}
+        self._by_key: Dict[Tuple[str, str], int] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._story_steps: Dict[UUID, List[int]] = {}
+        # Updates made while the initial load runs; its snapshot may predate them
+        self._pending: Optional[Dict[UUID, Optional[dict]]] = None
+
+    def ensure_loaded(self, db: Session) -> None:
+        """Build the index from stored ASTs the first time it is needed"""
+        if self._loaded:
+            return
+        from app.models.user_story import UserStory
+
+        with self._lock:
+            if self._loaded:
+                return
+            if self._pending is None:
+                self._pending = {}
+        # Query without the lock so suggestions on other threads aren't held up
+        rows = db.query(UserStory.id, UserStory.gherkin_ast)\
+            .filter(UserStory.gherkin_ast.isnot(None))\
+            .all()
+        with self._lock:
+            if self._loaded:
+                return
+            for story_id, ast in rows:
+                self._add_story(story_id, ast)
+            for story_id, ast in self._pending.items():
+                self._remove_story(story_id)
+                if ast:
+                    self._add_story(story_id, ast)
+            self._pending = None
+            self._loaded = True
+            print(f"Step index loaded: {len(self._entries)} distinct steps from {len(rows)} stories")
+
+    def update_story(self, story_id: UUID, ast: Optional[dict]) -> None:
+        """Replace a story's steps after its Gherkin changed (ast=None removes it)"""
+        with self._lock:
+            if not self._loaded:
+                if self._pending is not None:
+                    # Loading: replay this once the snapshot is in
+                    self._pending[story_id] = ast
+                # Otherwise the initial load will pick up the committed state
+                return
+            self._remove_story(story_id)
+            if ast:
+                self._add_story(story_id, ast)
+
+    def suggest(self, query: str, keyword: Optional[str] = None, limit: int = 10,
+                min_similarity: float = 0.2) -> List[Tuple[StepEntry, float]]:
+        """Steps most similar to the query by trigram Jaccard similarity"""
+        query_grams = trigrams(normalize_step(query))
+        if not query_grams:
+            return []
+        with self._lock:
+            shared: Counter = Counter()
+            for gram in query_grams:
+                for step_id in self._postings.get(gram, ()):
+                    shared[step_id] += 1
+
+            results = []
+            for step_id, overlap in shared.items():
+                entry = self._entries[step_id]
+                if keyword and entry.keyword != keyword:
+                    continue
+                similarity = overlap / (len(query_grams) + len(entry.grams) - overlap)
+                if similarity >= min_similarity:
+                    results.append((entry, similarity))
+
+        results.sort(key=lambda item: (-item[1], -item[0].usage_count))
+        return results[:limit]
+
+    def most_reused(self, keyword: Optional[str] = None, limit: int = 20) -> List[StepEntry]:
+        """Steps used by the most stories"""
+        with self._lock:
+            entries = [
+                entry for entry in self._entries.values()
+                if not keyword or entry.keyword == keyword
+            ]
+        entries.sort(key=lambda entry: (-len(entry.story_ids), -entry.usage_count))
+        return entries[:limit]
+
+    def _add_story(self, story_id: UUID, ast: dict) -> None:
+        step_ids = []
+        for keyword, text in iter_steps(ast):
+            normalized = normalize_step(text)
+            if not normalized:
+                continue
+            key = (keyword, normalized)
+            step_id = self._by_key.get(key)
+            if step_id is None:
+                step_id = self._next_id
+                self._next_id += 1
+                entry = StepEntry(step_id, keyword, text, normalized)
+                self._entries[step_id] = entry
+                self._by_key[key] = step_id
+                for gram in entry.grams:
+                    self._postings.setdefault(gram, set()).add(step_id)
+            entry = self._entries[step_id]
+            entry.story_ids[story_id] = entry.story_ids.get(story_id, 0) + 1
+            step_ids.append(step_id)
+        self._story_steps[story_id] = step_ids
+
+    def _remove_story(self, story_id: UUID) -> None:
+        for step_id in self._story_steps.pop(story_id, []):
+            entry = self._entries.get(step_id)
+            if entry is None or story_id not in entry.story_ids:
+                continue
+            del entry.story_ids[story_id]
+            if entry.story_ids:
+                continue
+            # Last use gone: drop the step from the index entirely
+            del self._entries[step_id]
+            del self._by_key[(entry.keyword, entry.normalized)]
+            for gram in entry.grams:
+                posting = self._postings.get(gram)
+                if posting is not None:
+                    posting.discard(step_id)
+                    if not posting:
+                        del self._postings[gram]
+
+
+step_index = StepIndex()
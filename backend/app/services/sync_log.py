@@ -0,0 +1,101 @@
+"""
+Change ordering and tombstones behind GET /sync
+
+Stories and tasks take a new value from the change_seq sequence on every
+insert and update (see app.models.sync_tombstone), and deleting one
+leaves a tombstone with its own value, so "everything since cursor N" is
+an index range scan over each table.
+
+Sequence values are handed out when a statement runs, not when its
+transaction commits, so on their own a slow transaction could commit a
+value below a cursor a client already holds. Flushes that write stories
+or tasks therefore take a transaction-scoped advisory lock first: those
+transactions commit one at a time, in sequence order. Story and task
+writes are short, single-commit operations, so the lock is held briefly.
+
+Tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS are pruned hourly;
+clients holding a cursor from before then are told to resync from 0.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.sync_tombstone import SyncTombstone
+from app.models.task import Task
+from app.models.user_story import UserStory
+
+# Arbitrary, but fixed: every worker must use the same key
+SYNC_LOCK_KEY = 0x73796e63
+PRUNE_INTERVAL_SECONDS = 3600
+
+_pruning: Optional[asyncio.Task] = None
+
+
+def _tombstone(obj) -> SyncTombstone:
+    if isinstance(obj, UserStory):
+        return SyncTombstone(entity="story", entity_id=obj.id, story_id=obj.id)
+    return SyncTombstone(entity="task", entity_id=obj.id, story_id=obj.story_id)
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _order_sync_changes(session: Session, flush_context, instances) -> None:
+    if session.bind is None or session.bind.dialect.name != "postgresql":
+        return
+    synced = (UserStory, Task)
+    written = any(isinstance(obj, synced) for obj in session.new) or any(
+        isinstance(obj, synced) and session.is_modified(obj, include_collections=False)
+        for obj in session.dirty
+    )
+    deleted = [obj for obj in session.deleted if isinstance(obj, synced)]
+    if not written and not deleted:
+        return
+
+    session.connection().execute(select(func.pg_advisory_xact_lock(SYNC_LOCK_KEY)))
+    # A story's tasks are in session.deleted too, through the delete cascade
+    for obj in deleted:
+        session.add(_tombstone(obj))
+
+
+def _prune_once() -> None:
+    from app.crud.sync import prune_tombstones
+
+    db = SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        deleted = prune_tombstones(db, cutoff)
+        if deleted:
+            print(f"Pruned {deleted} sync tombstones older than {cutoff.isoformat()}")
+    finally:
+        db.close()
+
+
+async def _prune_periodically() -> None:
+    while True:
+        try:
+            await asyncio.to_thread(_prune_once)
+        except Exception as e:
+            print(f"Sync tombstone pruning failed: {e}")
+        await asyncio.sleep(PRUNE_INTERVAL_SECONDS)
+
+
+def start_pruning() -> None:
+    global _pruning
+    if _pruning is None:
+        _pruning = asyncio.create_task(_prune_periodically())
+
+
+async def stop_pruning() -> None:
+    global _pruning
+    if _pruning is not None:
+        _pruning.cancel()
+        try:
+            await _pruning
+        except asyncio.CancelledError:
+            pass
+        _pruning = None
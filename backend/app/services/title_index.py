@@ -0,0 +1,290 @@
+"""
+In-memory prefix index over story titles for search-as-you-type
+
+Distinct title words are kept in a sorted vocabulary, so the words starting
+with a prefix form a contiguous range found by binary search; each word maps
+to the stories using it. Ranked results are cached per query and patched in
+place on writes, so keystrokes are usually a single dictionary lookup.
+
+The index is restored at startup from a gzip JSON snapshot and caught up
+with stories changed since it was written, then kept current by the crud
+write paths.
+"""
+
+import gzip
+import json
+import os
+import re
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+_WORD = re.compile(r"\w+")
+
+# Results cached per query; requests may ask for at most this many
+MAX_RESULTS = 20
+MAX_CACHED_QUERIES = 10000
+
+
+def _words(title: str) -> List[str]:
+    return _WORD.findall(title.lower())
+
+
+class TitleIndex:
+    def __init__(self, snapshot_path: Optional[str] = None):
+        self.snapshot_path = snapshot_path or settings.TITLE_INDEX_SNAPSHOT
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._titles: Dict[str, str] = {}
+        self._normalized: Dict[str, str] = {}
+        self._vocabulary: List[str] = []
+        # word -> {story_id: first position of the word in the title}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        # Ranked (key, story_id) lists for single-word queries, patched on writes
+        self._prefix_cache: Dict[str, List[Tuple[tuple, str]]] = {}
+        # Ranked lists for multi-word queries, cleared on any write
+        self._phrase_cache: Dict[str, List[Tuple[tuple, str]]] = {}
+        self._watermark: Optional[datetime] = None
+        # Writes made while the load runs; its snapshot may predate them
+        self._pending: Optional[Dict[str, Optional[Tuple[str, Optional[datetime]]]]] = None
+
+    # Loading and persistence
+
+    def load(self, db: Session) -> None:
+        """
+        Restore from the snapshot, then apply what changed in the database since
+
+        Writes made while this runs are buffered and replayed on top, since
+        the queries may have read the stories before those writes committed.
+        """
+        from app.models.user_story import UserStory
+
+        with self._lock:
+            if self._loaded:
+                return
+            if self._pending is None:
+                self._pending = {}
+        titles, watermark = self._read_snapshot()
+        if watermark is not None:
+            # Drop stories deleted since the snapshot, pick up new and edited ones
+            live_ids = {str(story_id) for (story_id,) in db.query(UserStory.id).all()}
+            titles = {story_id: title for story_id, title in titles.items() if story_id in live_ids}
+            changed = db.query(UserStory.id, UserStory.title, UserStory.updated_at)\
+                .filter(UserStory.updated_at > watermark)\
+                .all()
+        else:
+            changed = db.query(UserStory.id, UserStory.title, UserStory.updated_at).all()
+
+        for story_id, title, updated_at in changed:
+            titles[str(story_id)] = title
+            if updated_at and (watermark is None or updated_at > watermark):
+                watermark = updated_at
+
+        with self._lock:
+            if self._loaded:
+                return
+            self._reset()
+            for story_id, title in titles.items():
+                self._add(story_id, title)
+            self._watermark = watermark
+            for story_id, write in self._pending.items():
+                if write is None:
+                    self._remove(story_id)
+                else:
+                    self._upsert(story_id, *write)
+            self._pending = None
+            self._loaded = True
+        print(f"Title index loaded: {len(titles)} stories ({len(changed)} caught up from database)")
+
+    def ensure_loaded(self, db: Session) -> None:
+        if not self._loaded:
+            self.load(db)
+
+    def save_snapshot(self) -> None:
+        """Write the compact snapshot used for the next startup"""
+        with self._lock:
+            if not self._loaded:
+                return
+            data = {
+                "watermark": self._watermark.isoformat() if self._watermark else None,
+                "titles": dict(self._titles),
+            }
+        directory = os.path.dirname(self.snapshot_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.snapshot_path)
+        print(f"Title index snapshot written: {len(data['titles'])} stories")
+
+    def _read_snapshot(self) -> Tuple[Dict[str, str], Optional[datetime]]:
+        if not os.path.exists(self.snapshot_path):
+            return {}, None
+        try:
+            with gzip.open(self.snapshot_path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+            watermark = datetime.fromisoformat(data["watermark"]) if data.get("watermark") else None
+            return data.get("titles", {}), watermark
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable title index snapshot: {str(e)}")
+            return {}, None
+
+    # Maintenance
+
+    def upsert(self, story_id, title: str, updated_at: Optional[datetime] = None) -> None:
+        with self._lock:
+            if not self._loaded:
+                if self._pending is not None:
+                    # Loading: replay this once the snapshot is in
+                    self._pending[str(story_id)] = (title, updated_at)
+                # Otherwise the initial load will pick up the committed state
+                return
+            self._upsert(str(story_id), title, updated_at)
+
+    def remove(self, story_id) -> None:
+        with self._lock:
+            if not self._loaded:
+                if self._pending is not None:
+                    self._pending[str(story_id)] = None
+                return
+            self._remove(str(story_id))
+            self._phrase_cache.clear()
+
+    def _upsert(self, story_id: str, title: str, updated_at: Optional[datetime]) -> None:
+        self._remove(story_id)
+        self._add(story_id, title)
+        self._phrase_cache.clear()
+        if updated_at and (self._watermark is None or updated_at > self._watermark):
+            self._watermark = updated_at
+
+    def _reset(self) -> None:
+        self._titles = {}
+        self._normalized = {}
+        self._vocabulary = []
+        self._postings = {}
+        self._prefix_cache = {}
+        self._phrase_cache = {}
+
+    def _add(self, story_id: str, title: str) -> None:
+        words = _words(title)
+        self._titles[story_id] = title
+        self._normalized[story_id] = " ".join(words)
+        for position, word in enumerate(words):
+            posting = self._postings.get(word)
+            if posting is None:
+                posting = self._postings[word] = {}
+                insort(self._vocabulary, word)
+            if story_id not in posting:
+                posting[story_id] = position
+        self._merge_into_prefix_cache(story_id, words)
+
+    def _remove(self, story_id: str) -> None:
+        title = self._titles.pop(story_id, None)
+        if title is None:
+            return
+        del self._normalized[story_id]
+        for word in set(_words(title)):
+            posting = self._postings.get(word)
+            if posting is None:
+                continue
+            posting.pop(story_id, None)
+            if not posting:
+                del self._postings[word]
+                i = bisect_left(self._vocabulary, word)
+                if i < len(self._vocabulary) and self._vocabulary[i] == word:
+                    del self._vocabulary[i]
+            # Only cached rankings that contain the story need recomputing
+            for end in range(1, len(word) + 1):
+                ranked = self._prefix_cache.get(word[:end])
+                if ranked is not None and any(sid == story_id for _, sid in ranked):
+                    del self._prefix_cache[word[:end]]
+
+    def _merge_into_prefix_cache(self, story_id: str, words: List[str]) -> None:
+        """Insert a new title into cached single-word rankings it belongs in"""
+        seen = set()
+        for position, word in enumerate(words):
+            for end in range(1, len(word) + 1):
+                prefix = word[:end]
+                if prefix in seen:
+                    continue
+                seen.add(prefix)
+                ranked = self._prefix_cache.get(prefix)
+                if ranked is None:
+                    continue
+                key = self._rank_key(story_id, position, prefix)
+                if len(ranked) < MAX_RESULTS or key < ranked[-1][0]:
+                    insort(ranked, (key, story_id))
+                    del ranked[MAX_RESULTS:]
+
+    def _rank_key(self, story_id: str, position: int, normalized_query: str) -> tuple:
+        title = self._titles[story_id]
+        starts_with = self._normalized[story_id].startswith(normalized_query)
+        return (not starts_with, position, len(title), title)
+
+    # Lookup
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, str]]:
+        """
+        Titles with a word starting with each query word, as (id, title)
+
+        Titles starting with the query rank first, then matches on earlier
+        words, then shorter titles.
+        """
+        words = _words(query)
+        if not words:
+            return []
+        key = " ".join(words)
+        cache = self._prefix_cache if len(words) == 1 else self._phrase_cache
+
+        with self._lock:
+            ranked = cache.get(key)
+            if ranked is None:
+                ranked = self._rank(words, key)
+                if len(cache) >= MAX_CACHED_QUERIES:
+                    cache.clear()
+                cache[key] = ranked
+            return [(story_id, self._titles[story_id]) for _, story_id in ranked[:limit]]
+
+    def _word_range(self, prefix: str) -> Tuple[int, int]:
+        start = bisect_left(self._vocabulary, prefix)
+        end = bisect_left(self._vocabulary, prefix + "\uffff", start)
+        return start, end
+
+    def _matches(self, start: int, end: int) -> Dict[str, int]:
+        """Stories using a vocabulary word in [start, end), with its first position"""
+        matches: Dict[str, int] = {}
+        for word in self._vocabulary[start:end]:
+            for story_id, position in self._postings[word].items():
+                if position < matches.get(story_id, position + 1):
+                    matches[story_id] = position
+        return matches
+
+    def _rank(self, words: List[str], normalized_query: str) -> List[Tuple[tuple, str]]:
+        # Expand the most selective query word; filter by the others
+        ranges = {word: self._word_range(word) for word in words}
+        anchor = min(
+            words,
+            key=lambda word: sum(len(self._postings[w]) for w in self._vocabulary[slice(*ranges[word])])
+        )
+        others = list(words)
+        others.remove(anchor)
+
+        ranked = []
+        for story_id, position in self._matches(*ranges[anchor]).items():
+            if others:
+                title_words = self._normalized[story_id].split()
+                if not all(any(w.startswith(other) for w in title_words) for other in others):
+                    continue
+            ranked.append((self._rank_key(story_id, position, normalized_query), story_id))
+
+        ranked.sort()
+        return ranked[:MAX_RESULTS]
+
+
+title_index = TitleIndex()
@@ -0,0 +1,86 @@
+"""
+End-to-end latency of the change feed against a local Postgres
+
+Creates a scratch story, updates it --updates times through a regular
+session and measures commit -> subscriber delivery for each event, then
+deletes the story. Needs DATABASE_URL pointing at a migrated database
+with at least one user.
+
+Usage:
+    python -m benchmarks.change_feed_latency [--updates 200]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import app.db.base  # noqa: F401  (registers all models)
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.models.user_story import UserStory
+from app.services.change_feed import change_feed
+from app.services.pg_listener import pg_listener
+
+
+def _write(updates: int, commit_times: dict) -> None:
+    db = SessionLocal()
+    try:
+        author = db.query(User).first()
+        if author is None:
+            raise SystemExit("No users in the database: run app.initial_data first")
+        story = UserStory(title="change feed benchmark", description="scratch", created_by=author.id)
+        db.add(story)
+        db.commit()
+        for n in range(updates):
+            story.title = f"change feed benchmark {n}"
+            db.commit()
+            commit_times[f"change feed benchmark {n}"] = time.perf_counter()
+        db.delete(story)
+        db.commit()
+    finally:
+        db.close()
+
+
+async def run(updates: int) -> None:
+    await change_feed.start()
+    while not pg_listener.connected:
+        await asyncio.sleep(0.05)
+    subscription = change_feed.subscribe()
+
+    commit_times: dict = {}
+    writer = asyncio.create_task(asyncio.to_thread(_write, updates, commit_times))
+    received = {}
+    while True:
+        change = await subscription.queue.get()
+        if change.get("entity") != "story" or not change.get("title", "").startswith("change feed benchmark"):
+            continue
+        if change["op"] == "delete":
+            break
+        if change["op"] == "update":
+            received[change["title"]] = time.perf_counter()
+    await writer
+    await pg_listener.stop()
+
+    # Commit timestamps are taken after commit() returns, so they can trail delivery slightly
+    latencies = [
+        max(received[title] - committed, 0) * 1000
+        for title, committed in commit_times.items() if title in received
+    ]
+    print(f"events:  {len(latencies)}/{updates} delivered")
+    if latencies:
+        latencies.sort()
+        print(f"median:  {statistics.median(latencies):.2f} ms")
+        print(f"p95:     {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms")
+        print(f"max:     {latencies[-1]:.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--updates", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.updates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Throughput of the offline Gherkin generator
+
+Usage:
+    python -m benchmarks.gherkin_generator [--stories 20000] [--workers 4]
+"""
+
+import argparse
+import os
+import random
+import time
+
+from app.services.gherkin_generator import generate_batch
+
+ACTORS = ["product owner", "developer", "admin", "guest user", "tester"]
+ACTIONS = [
+    "filter stories by \"open\", \"closed\" or \"draft\" status",
+    "upload an OpenAPI document",
+    "assign a task to a teammate",
+    "export the backlog as CSV",
+]
+DETAILS = [
+    "The user is logged in.",
+    "The user clicks the save button.",
+    "A confirmation message should be displayed.",
+    "The list is updated without reloading the page.",
+    "Invalid input must show an inline error.",
+]
+
+
+def make_stories(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    stories = []
+    for i in range(count):
+        description = (
+            f"As a {rng.choice(ACTORS)}, I want to {rng.choice(ACTIONS)} so that work moves faster. "
+            + " ".join(rng.sample(DETAILS, rng.randint(1, len(DETAILS))))
+        )
+        stories.append((f"HU{i:05d} - Story {i}", description))
+    return stories
+
+
+def run(stories, workers: int) -> float:
+    start = time.perf_counter()
+    results = generate_batch(stories, workers=workers)
+    elapsed = time.perf_counter() - start
+    assert len(results) == len(stories)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stories", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    stories = make_stories(args.stories)
+    for workers in sorted({1, args.workers}):
+        elapsed = run(stories, workers)
+        print(f"workers={workers:<3} stories={len(stories):<7} "
+              f"time={elapsed:.2f}s  throughput={len(stories) / elapsed:,.0f} stories/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Per-row cost of encoding list responses: FastAPI's default path vs encode_list
+
+The default path validates rows into models, dumps them back to Python
+dicts and JSON-encodes those with the stdlib. encode_list validates and
+encodes in pydantic-core in one go.
+
+Usage:
+    python -m benchmarks.list_serialization [--rows 5000] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.json_responses import encode_list
+from app.schemas.task import Task
+from app.schemas.user import User
+from app.schemas.user_story import UserStory
+
+WORDS = "story task backlog filter upload document assign review deploy gherkin scenario".split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def make_rows(kind: str, count: int, seed: int = 42):
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1)
+    rows = []
+    for i in range(count):
+        created = now - timedelta(minutes=i)
+        if kind == "stories":
+            rows.append(SimpleNamespace(
+                id=uuid.uuid4(), title=f"HU{i:05d} - {_text(rng, 6)}", description=_text(rng, 60),
+                status="DEVELOPMENT", gherkin_description=f"Feature: {_text(rng, 4)}\n" * 8,
+                design_url=None, created_by=uuid.uuid4(), assigned_to=uuid.uuid4(),
+                created_at=created, updated_at=created,
+            ))
+        elif kind == "tasks":
+            rows.append(SimpleNamespace(
+                id=uuid.uuid4(), story_id=uuid.uuid4(), title=_text(rng, 5), description=_text(rng, 25),
+                status="TODO", assignee=None, created_at=created, updated_at=created,
+            ))
+        else:
+            rows.append(SimpleNamespace(
+                id=uuid.uuid4(), email=f"user{i}@example.com", name=f"User {i}",
+                avatar_url=None, created_at=created,
+            ))
+    return rows
+
+
+def default_path(schema, rows) -> bytes:
+    field = create_response_field(name="Response", type_=List[schema])
+    content = asyncio.run(serialize_response(field=field, response_content=rows))
+    return JSONResponse(content).body
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for kind, schema in (("stories", UserStory), ("tasks", Task), ("users", User)):
+        rows = make_rows(kind, args.rows)
+        encode_list(schema, rows[:1])  # build the cached adapter outside the timing
+        default = best_of(lambda: default_path(schema, rows), args.repeat)
+        fast = best_of(lambda: encode_list(schema, rows), args.repeat)
+        print(f"{kind:<8} rows={args.rows:<6} default={default / args.rows * 1e6:6.1f}us/row  "
+              f"fast={fast / args.rows * 1e6:6.1f}us/row  speedup={default / fast:4.1f}x")
+
+
+if __name__ == "__main__":
+    main()
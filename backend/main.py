@@ -3,8 +3,16 @@ import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.routes import auth, users, stories, tasks, documents, dashboard
+from app.api.body_limit import BodySizeLimitMiddleware
+from app.api.routes import auth, users, stories, tasks, documents, dashboard, designs, metrics, steps, batch, changes, sync
 from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.change_feed import change_feed
+from app.services.document_validation import document_validation
+from app.services.invalidation_bus import invalidation_bus
+from app.services.pg_listener import pg_listener
+from app.services import sync_log  # noqa: F401  (registers the change ordering hooks)
+from app.services.title_index import title_index
 
 # Check for Claude API key at startup
 if settings.CLAUDE_API_KEY:
@@ -20,6 +28,58 @@ app = FastAPI(
     version="0.1.0",
 )
 
+
+@app.on_event("startup")
+def load_title_index():
+    """Restore the typeahead index from its snapshot before serving requests"""
+    db = SessionLocal()
+    try:
+        title_index.load(db)
+        title_index.save_snapshot()
+    except Exception as e:
+        # Typeahead falls back to loading on first use
+        print(f"WARNING: Could not load title index at startup: {str(e)}")
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+async def start_change_feed():
+    # Reconnects in the background, so a database that is still starting is fine
+    await change_feed.start()
+
+
+@app.on_event("startup")
+async def start_invalidation_bus():
+    # Evicts this worker's cached rows when other workers write them
+    await invalidation_bus.start()
+
+
+@app.on_event("startup")
+async def start_sync_tombstone_pruning():
+    sync_log.start_pruning()
+
+
+@app.on_event("shutdown")
+async def stop_sync_tombstone_pruning():
+    await sync_log.stop_pruning()
+
+
+@app.on_event("shutdown")
+async def stop_change_feed():
+    await pg_listener.stop()
+
+
+@app.on_event("shutdown")
+def save_title_index():
+    title_index.save_snapshot()
+
+
+@app.on_event("shutdown")
+def stop_document_validation():
+    document_validation.shutdown()
+
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -29,13 +89,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Refuse oversized uploads while they arrive, not after they are spooled;
+# the allowance covers multipart boundaries and the other form fields
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_bytes=settings.DOCUMENT_MAX_UPLOAD_BYTES + settings.DOCUMENT_UPLOAD_FORM_ALLOWANCE_BYTES,
+    path_prefixes=("/documents",),
+)
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/users", tags=["Users"])
 app.include_router(stories.router, prefix="/stories", tags=["User Stories"])
+app.include_router(steps.router, prefix="/steps", tags=["Gherkin Steps"])
 app.include_router(tasks.router, prefix="/tasks", tags=["Tasks"])
 app.include_router(documents.router, prefix="/documents", tags=["Documents"])
+app.include_router(designs.router, prefix="/designs", tags=["Designs"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
+app.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
+app.include_router(batch.router, prefix="/batch", tags=["Batch"])
+app.include_router(changes.router, prefix="/changes", tags=["Changes"])
+app.include_router(sync.router, prefix="/sync", tags=["Sync"])
 
 if __name__ == "__main__":
     uvicorn.run(
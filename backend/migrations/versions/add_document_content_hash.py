@@ -0,0 +1,28 @@
+"""Add content hash and size to documents table
+
+Revision ID: add_document_content_hash
+Revises: add_gherkin_ast
+Create Date: 2026-10-19 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = 'add_document_content_hash'
+down_revision = 'add_gherkin_ast'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Nullable: documents uploaded before content-addressed storage have no hash
+    op.add_column('documents', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('documents', sa.Column('size_bytes', sa.BigInteger(), nullable=True))
+    op.create_index(op.f('ix_documents_content_hash'), 'documents', ['content_hash'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_documents_content_hash'), table_name='documents')
+    op.drop_column('documents', 'size_bytes')
+    op.drop_column('documents', 'content_hash')
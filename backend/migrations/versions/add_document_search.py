@@ -0,0 +1,50 @@
+"""Add document_search table with a GIN-indexed tsvector
+
+Revision ID: add_document_search
+Revises: add_document_versions
+Create Date: 2026-10-19 15:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = 'add_document_search'
+down_revision = 'add_document_versions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'document_search',
+        sa.Column('document_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('documents.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('identifiers', postgresql.JSONB(), nullable=False, server_default='[]'),
+        sa.Column('keywords', sa.Text(), nullable=False, server_default=''),
+        sa.Column('body', sa.Text(), nullable=False, server_default=''),
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(keywords, '')), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(body, '')), 'B')",
+                persisted=True,
+            ),
+        ),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_document_search_vector', 'document_search', ['search_vector'],
+                    unique=False, postgresql_using='gin')
+
+    # Existing documents are indexed by the validation pipeline: clearing the
+    # validated hash makes POST /documents/revalidate pick them all up
+    op.execute("UPDATE documents SET validated_hash = NULL")
+
+
+def downgrade():
+    op.drop_index('ix_document_search_vector', table_name='document_search')
+    op.drop_table('document_search')
@@ -0,0 +1,26 @@
+"""Store validation outcome and validated content hash on documents
+
+Revision ID: add_document_validation_state
+Revises: add_document_content_hash
+Create Date: 2026-10-19 13:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = 'add_document_validation_state'
+down_revision = 'add_document_content_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('documents', sa.Column('validated_hash', sa.String(length=64), nullable=True))
+    op.add_column('documents', sa.Column('validation_errors', postgresql.JSONB(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('documents', 'validation_errors')
+    op.drop_column('documents', 'validated_hash')
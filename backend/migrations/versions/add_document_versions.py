@@ -0,0 +1,46 @@
+"""Add document_versions table and current version number on documents
+
+Revision ID: add_document_versions
+Revises: add_document_validation_state
+Create Date: 2026-10-19 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = 'add_document_versions'
+down_revision = 'add_document_validation_state'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('documents', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+    # Existing documents get their version 1 row when first re-uploaded
+    op.create_table(
+        'document_versions',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('document_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('documents.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('size_bytes', sa.BigInteger(), nullable=False),
+        sa.Column('extension', sa.String(), nullable=False, server_default=''),
+        sa.Column('chunks', postgresql.JSONB(), nullable=False),
+        sa.Column('stored_bytes', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('uploaded_by', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.UniqueConstraint('document_id', 'version', name='uq_document_versions_document_version'),
+    )
+    op.create_index(op.f('ix_document_versions_id'), 'document_versions', ['id'], unique=False)
+    op.create_index(op.f('ix_document_versions_document_id'), 'document_versions', ['document_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_document_versions_document_id'), table_name='document_versions')
+    op.drop_index(op.f('ix_document_versions_id'), table_name='document_versions')
+    op.drop_table('document_versions')
+    op.drop_column('documents', 'version')
@@ -0,0 +1,195 @@
+"""Add parsed Gherkin columns to user_stories table
+
+Revision ID: add_gherkin_ast
+Revises: add_llm_usage
+Create Date: 2026-10-19 11:00:00
+
+"""
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic
+revision = 'add_gherkin_ast'
+down_revision = 'add_llm_usage'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 500
+
+# Snapshot of app.services.gherkin_parser.parse_gherkin at this revision, so
+# the migration keeps producing the same structure if the parser changes
+_FEATURE = re.compile(r"^(?:Feature|Business Need|Ability):\s*(.*)$")
+_SCENARIO = re.compile(r"^(Scenario Outline|Scenario Template|Scenario|Example|Background):\s*(.*)$")
+_EXAMPLES = re.compile(r"^(?:Examples|Scenarios):")
+_STEP = re.compile(r"^(Given|When|Then|And|But|\*)\s+(.*)$")
+_TAG = re.compile(r"@[^\s@]+")
+
+_SCENARIO_KINDS = {
+    "Scenario": "scenario",
+    "Example": "scenario",
+    "Scenario Outline": "outline",
+    "Scenario Template": "outline",
+    "Background": "background",
+}
+
+
+def _parse_gherkin(text: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Parse Gherkin text, returning None when there is no text to parse"""
+    if not text or not text.strip():
+        return None
+
+    features: List[Dict[str, Any]] = []
+    feature: Optional[Dict[str, Any]] = None
+    scenario: Optional[Dict[str, Any]] = None
+    pending_tags: List[str] = []
+    last_keyword = "Given"
+    in_examples = False
+    example_header_seen = False
+    in_docstring = False
+
+    def current_feature() -> Dict[str, Any]:
+        nonlocal feature
+        if feature is None:
+            # Steps without a Feature line still count, under an unnamed feature
+            feature = {"name": "", "tags": [], "scenarios": []}
+            features.append(feature)
+        return feature
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+
+        if line.startswith('"""') or line.startswith("```"):
+            # Doc strings, and the code fences LLM output is sometimes wrapped in
+            if line.startswith('"""'):
+                in_docstring = not in_docstring
+            continue
+        if in_docstring or not line or line.startswith("#"):
+            continue
+
+        if line.startswith("@"):
+            pending_tags.extend(_TAG.findall(line))
+            continue
+
+        match = _FEATURE.match(line)
+        if match:
+            feature = {"name": match.group(1).strip(), "tags": pending_tags, "scenarios": []}
+            features.append(feature)
+            scenario = None
+            pending_tags = []
+            continue
+
+        match = _SCENARIO.match(line)
+        if match:
+            scenario = {
+                "name": match.group(2).strip(),
+                "kind": _SCENARIO_KINDS[match.group(1)],
+                "tags": pending_tags,
+                "steps": [],
+                "examples": 0,
+            }
+            current_feature()["scenarios"].append(scenario)
+            pending_tags = []
+            in_examples = False
+            last_keyword = "Given"
+            continue
+
+        if _EXAMPLES.match(line):
+            in_examples = True
+            example_header_seen = False
+            pending_tags = []
+            continue
+
+        if line.startswith("|"):
+            # Example rows after their header; step data tables are ignored
+            if in_examples and scenario is not None:
+                if example_header_seen:
+                    scenario["examples"] += 1
+                example_header_seen = True
+            continue
+
+        match = _STEP.match(line)
+        if match:
+            keyword, step_text = match.group(1), match.group(2).strip()
+            if keyword in ("And", "But", "*"):
+                keyword = last_keyword
+            last_keyword = keyword
+            in_examples = False
+            if scenario is None:
+                scenario = {"name": "", "kind": "scenario", "tags": [], "steps": [], "examples": 0}
+                current_feature()["scenarios"].append(scenario)
+            scenario["steps"].append([keyword, step_text])
+
+    scenarios = [s for f in features for s in f["scenarios"] if s["kind"] != "background"]
+    tags = sorted({tag for f in features for tag in f["tags"]} |
+                  {tag for f in features for s in f["scenarios"] for tag in s["tags"]})
+    return {
+        "features": features,
+        "scenario_count": len(scenarios),
+        "step_count": sum(len(s["steps"]) for f in features for s in f["scenarios"]),
+        "tags": tags,
+    }
+
+
+
+def upgrade():
+    op.add_column('user_stories', sa.Column('gherkin_ast', postgresql.JSONB(), nullable=True))
+    op.add_column('user_stories', sa.Column('gherkin_scenario_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('user_stories', sa.Column('gherkin_step_count', sa.Integer(), nullable=False, server_default='0'))
+    
+    # Parse existing Gherkin once so analytics never have to
+    connection = op.get_bind()
+    last_id = None
+    while True:
+        # Keyset pagination: each batch starts after the last id seen
+        params = {"limit": BACKFILL_BATCH_SIZE}
+        after_last = ""
+        if last_id is not None:
+            params["last_id"] = last_id
+            after_last = "AND id > :last_id "
+        rows = connection.execute(
+            text(
+                "SELECT id, gherkin_description FROM user_stories "
+                "WHERE gherkin_description IS NOT NULL AND gherkin_description != '' "
+                + after_last + "ORDER BY id LIMIT :limit"
+            ),
+            params,
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        updates = []
+        for story_id, gherkin in rows:
+            ast = _parse_gherkin(gherkin)
+            if ast is not None:
+                updates.append({
+                    "ast": json.dumps(ast),
+                    "scenarios": ast["scenario_count"],
+                    "steps": ast["step_count"],
+                    "id": story_id,
+                })
+        if updates:
+            connection.execute(
+                text(
+                    "UPDATE user_stories SET gherkin_ast = CAST(:ast AS JSONB), "
+                    "gherkin_scenario_count = :scenarios, gherkin_step_count = :steps WHERE id = :id"
+                ),
+                updates,
+            )
+    
+    op.create_index(
+        'ix_user_stories_status_gherkin_counts', 'user_stories',
+        ['status', 'gherkin_scenario_count', 'gherkin_step_count'], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_user_stories_status_gherkin_counts', table_name='user_stories')
+    op.drop_column('user_stories', 'gherkin_step_count')
+    op.drop_column('user_stories', 'gherkin_scenario_count')
+    op.drop_column('user_stories', 'gherkin_ast')
@@ -0,0 +1,44 @@
+"""Add llm_usage table
+
+Revision ID: add_llm_usage
+Revises: add_design_url
+Create Date: 2026-10-19 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = 'add_llm_usage'
+down_revision = 'add_design_url'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Per-call Claude API usage, optionally linked to a story
+    op.create_table(
+        'llm_usage',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('story_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('user_stories.id', ondelete='CASCADE'), nullable=True),
+        sa.Column('endpoint', sa.String(), nullable=False),
+        sa.Column('model', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('input_tokens', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('output_tokens', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('wall_ms', sa.Float(), nullable=True),
+        sa.Column('ttfb_ms', sa.Float(), nullable=True),
+        sa.Column('retries', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('fallback_used', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index(op.f('ix_llm_usage_id'), 'llm_usage', ['id'], unique=False)
+    op.create_index(op.f('ix_llm_usage_story_id'), 'llm_usage', ['story_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_llm_usage_story_id'), table_name='llm_usage')
+    op.drop_index(op.f('ix_llm_usage_id'), table_name='llm_usage')
+    op.drop_table('llm_usage')
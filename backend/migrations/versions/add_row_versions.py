@@ -0,0 +1,27 @@
+"""Add users.updated_at and the indexes behind list ETags
+
+Revision ID: add_row_versions
+Revises: add_document_search
+Create Date: 2026-10-19 16:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = 'add_row_versions'
+down_revision = 'add_document_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('updated_at', sa.DateTime(), nullable=True, server_default=sa.func.now()))
+    op.create_index('ix_user_stories_updated_at', 'user_stories', ['updated_at'], unique=False)
+    op.create_index('ix_tasks_story_id_updated_at', 'tasks', ['story_id', 'updated_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_tasks_story_id_updated_at', table_name='tasks')
+    op.drop_index('ix_user_stories_updated_at', table_name='user_stories')
+    op.drop_column('users', 'updated_at')
@@ -0,0 +1,43 @@
+"""Add change_seq to stories and tasks, and sync_tombstones for deletes
+
+Revision ID: add_sync_change_seq
+Revises: add_row_versions
+Create Date: 2026-10-19 17:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = 'add_sync_change_seq'
+down_revision = 'add_row_versions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE SEQUENCE change_seq")
+    # nextval() is volatile, so existing rows each get their own value
+    for table in ('user_stories', 'tasks'):
+        op.add_column(table, sa.Column('change_seq', sa.BigInteger(), nullable=False,
+                                       server_default=sa.text("nextval('change_seq')")))
+        op.create_index(op.f(f'ix_{table}_change_seq'), table, ['change_seq'], unique=False)
+
+    op.create_table(
+        'sync_tombstones',
+        sa.Column('change_seq', sa.BigInteger(), primary_key=True,
+                  server_default=sa.text("nextval('change_seq')")),
+        sa.Column('entity', sa.String(), nullable=False),
+        sa.Column('entity_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('story_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table('sync_tombstones')
+    for table in ('tasks', 'user_stories'):
+        op.drop_index(op.f(f'ix_{table}_change_seq'), table_name=table)
+        op.drop_column(table, 'change_seq')
+    op.execute("DROP SEQUENCE change_seq")
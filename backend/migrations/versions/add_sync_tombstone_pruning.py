@@ -0,0 +1,30 @@
+"""Index sync_tombstones by age and track the pruned change_seq horizon
+
+Revision ID: add_sync_tombstone_pruning
+Revises: add_sync_change_seq
+Create Date: 2026-10-19 18:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = 'add_sync_tombstone_pruning'
+down_revision = 'add_sync_change_seq'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_sync_tombstones_deleted_at'), 'sync_tombstones', ['deleted_at'], unique=False)
+    op.create_table(
+        'sync_prune_horizon',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('change_seq', sa.BigInteger(), nullable=False),
+        sa.Column('pruned_at', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table('sync_prune_horizon')
+    op.drop_index(op.f('ix_sync_tombstones_deleted_at'), table_name='sync_tombstones')
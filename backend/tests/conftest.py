@@ -0,0 +1,28 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.db.base import Base
+from app.db.session import SessionLocal
+
+# Tests that need Postgres (sequences, advisory locks, JSONB) run against
+# this database, which they drop and recreate; they are skipped without it
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+@pytest.fixture
+def db():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_engine(TEST_DATABASE_URL)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    # SessionLocal, not a plain Session, so the app's flush hooks apply
+    session = SessionLocal(bind=engine)
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+        engine.dispose()
@@ -0,0 +1,57 @@
+import uuid
+from datetime import datetime
+
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_user
+from app.api.routes import batch
+from app.core.config import settings
+from app.schemas.user import User
+
+USER = User(id=uuid.uuid4(), email="batch@example.com", name="Batch", created_at=datetime(2024, 1, 1))
+
+app = FastAPI()
+app.include_router(batch.router, prefix="/batch")
+
+
+@app.get("/echo/{value}")
+def echo(value: str, times: int = 1, current_user: User = Depends(get_current_user)):
+    if value == "missing":
+        raise HTTPException(status_code=404, detail="Not found")
+    return {"value": value * times, "user": current_user.email}
+
+
+@app.post("/echo")
+def echo_body(body: dict):
+    return body
+
+
+app.dependency_overrides[get_current_user] = lambda: USER
+client = TestClient(app)
+
+
+def test_sub_requests_answer_in_order_with_their_own_status():
+    response = client.post("/batch/", json={"requests": [
+        {"url": "/echo/ab?times=2"},
+        {"url": "/echo/missing"},
+        {"method": "POST", "url": "/echo", "body": {"title": "Login"}},
+    ]})
+
+    assert response.status_code == 200
+    responses = response.json()["responses"]
+    assert [item["status"] for item in responses] == [200, 404, 200]
+    assert responses[0]["body"] == {"value": "abab", "user": "batch@example.com"}
+    assert responses[1]["body"] == {"detail": "Not found"}
+    assert responses[2]["body"] == {"title": "Login"}
+
+
+def test_nested_batches_are_refused_however_spelled():
+    for url in ("/batch/", "/batch", "/%62atch/", "/batch?x=1"):
+        response = client.post("/batch/", json={"requests": [{"method": "POST", "url": url, "body": {"requests": []}}]})
+        assert response.status_code == 400, url
+
+
+def test_batch_size_is_capped():
+    requests = [{"url": "/echo/a"}] * (settings.BATCH_MAX_REQUESTS + 1)
+    assert client.post("/batch/", json={"requests": requests}).status_code == 400
@@ -0,0 +1,49 @@
+import random
+
+from app.services.chunk_store import MAX_CHUNK, MIN_CHUNK, ChunkedWrite, ChunkStore, ContentDefinedChunker
+
+
+def _document(size: int, seed: int = 7) -> bytes:
+    return random.Random(seed).randbytes(size)
+
+
+def _chunks(data: bytes, feed_size: int = 10_000):
+    chunker = ContentDefinedChunker()
+    chunks = []
+    for start in range(0, len(data), feed_size):
+        chunks.extend(chunker.feed(data[start:start + feed_size]))
+    return chunks + chunker.finish()
+
+
+def test_chunks_reassemble_within_size_bounds():
+    data = _document(300_000)
+    chunks = _chunks(data)
+    assert b"".join(chunks) == data
+    assert all(MIN_CHUNK <= len(chunk) <= MAX_CHUNK for chunk in chunks[:-1])
+
+
+def test_boundaries_do_not_depend_on_how_the_stream_is_fed():
+    data = _document(300_000)
+    assert _chunks(data, feed_size=4_096) == _chunks(data, feed_size=100_000)
+
+
+def test_an_edit_only_changes_nearby_chunks():
+    data = _document(300_000)
+    edited = data[:150_000] + b"inserted paragraph" + data[150_000:]
+    before, after = set(_chunks(data)), set(_chunks(edited))
+    assert len(after - before) <= 2
+
+
+def test_unchanged_chunks_are_stored_once(tmp_path):
+    store = ChunkStore(str(tmp_path))
+    data = _document(100_000)
+
+    first = ChunkedWrite(store)
+    first.write(data)
+    chunks = first.close()
+    second = ChunkedWrite(store)
+    second.write(data)
+
+    assert second.close() == chunks
+    assert (first.new_bytes, second.new_bytes) == (len(data), 0)
+    assert store.read_content(chunks) == data
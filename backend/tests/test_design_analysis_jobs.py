@@ -0,0 +1,59 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.crud import user_story
+from app.services.design_analysis_jobs import DesignAnalysisJobs, DesignAnalysisSuperseded
+
+
+@pytest.fixture
+def analyses(monkeypatch):
+    """Analyses that finish once released, recording which URLs were analysed"""
+    started = []
+    release = {}
+
+    async def analyse(design_url=None, story_id=None, **kwargs):
+        started.append(design_url)
+        release[design_url] = asyncio.Event()
+        await release[design_url].wait()
+        return f"description of {design_url}"
+
+    monkeypatch.setattr(user_story, "generate_description_from_image", analyse)
+    return started, release
+
+
+def test_waiting_request_is_told_when_the_design_changes(analyses):
+    _, release = analyses
+    story_id = uuid.uuid4()
+
+    async def scenario():
+        jobs = DesignAnalysisJobs()
+        waiting = asyncio.create_task(jobs.get_result(story_id, "https://example.com/a.png"))
+        await asyncio.sleep(0)
+        new_job = jobs.schedule(story_id, "https://example.com/b.png")
+        with pytest.raises(DesignAnalysisSuperseded):
+            await waiting
+        await asyncio.sleep(0)
+        release["https://example.com/b.png"].set()
+        return await new_job
+
+    assert asyncio.run(scenario()) == "description of https://example.com/b.png"
+
+
+def test_cancelled_request_leaves_the_shared_job_running(analyses):
+    started, release = analyses
+    story_id = uuid.uuid4()
+
+    async def scenario():
+        jobs = DesignAnalysisJobs()
+        waiting = asyncio.create_task(jobs.get_result(story_id, "https://example.com/a.png"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        release["https://example.com/a.png"].set()
+        return await jobs.get_result(story_id, "https://example.com/a.png")
+
+    assert asyncio.run(scenario()) == "description of https://example.com/a.png"
+    assert started == ["https://example.com/a.png"]
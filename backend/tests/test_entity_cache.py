@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+from sqlalchemy import text
+
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.models.user_story import UserStory
+from app.services.entity_cache import entity_cache
+
+
+def _story(db) -> UserStory:
+    user = User(email="cache@example.com", password_hash="x", name="Cache")
+    db.add(user)
+    db.commit()
+    story = UserStory(title="original", description="", created_by=user.id)
+    db.add(story)
+    db.commit()
+    return story
+
+
+def _get(db, story_id, **kwargs):
+    """Read through the cache from a fresh session, so db's identity map can't answer"""
+    reader = SessionLocal(bind=db.get_bind())
+    try:
+        story = entity_cache.get(reader, UserStory, story_id, **kwargs)
+        return story.title, story.updated_at
+    finally:
+        reader.close()
+
+
+def test_committed_writes_invalidate_the_cached_row(db):
+    entity_cache.clear()
+    story = _story(db)
+    assert _get(db, story.id)[0] == "original"
+
+    story.title = "renamed"
+    db.commit()
+
+    assert _get(db, story.id)[0] == "renamed"
+
+
+def test_cached_row_older_than_the_expected_version_is_not_served(db):
+    entity_cache.clear()
+    story = _story(db)
+    _, cached_updated_at = _get(db, story.id)
+
+    # Written behind the cache's back, e.g. by a worker whose invalidation
+    # hasn't arrived yet: only the ETag query knows about it
+    newer = cached_updated_at + timedelta(seconds=1)
+    db.execute(
+        text("UPDATE user_stories SET title = 'renamed', updated_at = :at WHERE id = :id"),
+        {"at": newer, "id": story.id},
+    )
+    db.commit()
+
+    assert _get(db, story.id)[0] == "original"
+    assert _get(db, story.id, expected_updated_at=newer) == ("renamed", newer)
+    # The fresh row replaced the stale copy
+    assert _get(db, story.id)[0] == "renamed"
@@ -0,0 +1,32 @@
+from starlette.requests import Request
+
+from app.api.etags import etag_matches, make_etag, not_modified
+
+
+def _request(if_none_match=None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match is not None else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_etag_depends_on_every_part():
+    assert make_etag("story", 1, "2024-01-01") == make_etag("story", 1, "2024-01-01")
+    assert make_etag("story", 1, "2024-01-01") != make_etag("story", 1, "2024-01-02")
+    assert make_etag("story", 1, "2024-01-01").startswith('W/"')
+
+
+def test_if_none_match_uses_weak_comparison():
+    etag = make_etag("story", 1)
+    assert etag_matches(_request(etag), etag)
+    assert etag_matches(_request(etag.removeprefix("W/")), etag)
+    assert etag_matches(_request(f'W/"other", {etag}'), etag)
+    assert etag_matches(_request("*"), etag)
+    assert not etag_matches(_request('W/"other"'), etag)
+    assert not etag_matches(_request(), etag)
+
+
+def test_not_modified_only_when_the_client_has_this_version():
+    etag = make_etag("story", 1)
+    response = not_modified(_request(etag), etag)
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert not_modified(_request('W/"other"'), etag) is None
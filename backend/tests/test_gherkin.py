@@ -0,0 +1,76 @@
+from app.services.gherkin_generator import GherkinGenerator, generate_gherkin
+from app.services.gherkin_parser import iter_steps, parse_gherkin
+from app.services.gherkin_routing import GherkinRoutingPolicy
+
+OUTLINE = '''
+@checkout
+Feature: Checkout
+
+  Background:
+    Given a signed in shopper
+
+  @happy
+  Scenario Outline: Pay by card
+    Given a basket worth <amount>
+    And a saved card
+    When they pay
+    Then the order is placed
+    But no email is sent yet
+    """
+    Given this is a doc string, not a step
+    """
+
+    Examples:
+      | amount |
+      | 10     |
+      | 250    |
+'''
+
+
+def test_parse_counts_scenarios_steps_and_examples():
+    ast = parse_gherkin(OUTLINE)
+    feature = ast["features"][0]
+    background, outline = feature["scenarios"]
+
+    assert feature["name"] == "Checkout"
+    assert background["kind"] == "background"
+    assert (outline["kind"], outline["name"], outline["examples"]) == ("outline", "Pay by card", 2)
+    # The background's steps count, the background itself isn't a scenario
+    assert (ast["scenario_count"], ast["step_count"]) == (1, 6)
+    assert ast["tags"] == ["@checkout", "@happy"]
+
+
+def test_parse_gives_and_and_but_the_keyword_they_continue():
+    keywords = [keyword for keyword, _ in iter_steps(parse_gherkin(OUTLINE))]
+    assert keywords == ["Given", "Given", "Given", "When", "Then", "Then"]
+
+
+def test_parse_steps_without_a_feature_line():
+    ast = parse_gherkin("```gherkin\nGiven a user\nWhen they log in\nThen they see the dashboard\n```")
+    assert ast["features"][0]["name"] == ""
+    assert (ast["scenario_count"], ast["step_count"]) == (1, 3)
+
+
+def test_parse_empty_text():
+    assert parse_gherkin("  \n") is None
+    assert list(iter_steps(None)) == []
+
+
+def test_generated_gherkin_is_valid_and_parses():
+    gherkin = generate_gherkin(
+        "Export invoices",
+        "As an accountant I want to export invoices as PDF so that I can send them to auditors",
+    )
+    assert GherkinRoutingPolicy.validate(gherkin)
+    ast = parse_gherkin(gherkin)
+    assert ast["scenario_count"] >= 1
+    assert {"Given", "When", "Then"} <= {keyword for keyword, _ in iter_steps(ast)}
+
+
+def test_actor_article_follows_pronunciation():
+    with_article = GherkinGenerator._with_article
+    assert with_article("admin") == "an admin"
+    assert with_article("user") == "a user"
+    assert with_article("hourly worker") == "an hourly worker"
+    assert with_article("manager") == "a manager"
+    assert with_article("the owner") == "the owner"
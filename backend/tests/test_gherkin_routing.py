@@ -0,0 +1,36 @@
+from app.services.gherkin_routing import GherkinRoutingPolicy
+
+
+def _policy() -> GherkinRoutingPolicy:
+    return GherkinRoutingPolicy(
+        fast_model="fast-model", large_model="large-model", latency_budget_ms=30000, large_story_chars=1500
+    )
+
+
+def test_small_story_goes_to_the_fast_model():
+    assert _policy().route("Login", "As a member I want to sign in").model == "fast-model"
+
+
+def test_large_story_goes_to_the_large_model_within_budget():
+    route = _policy().route("Checkout", "word " * 320)
+    assert (route.model, route.size) == ("large-model", "large")
+
+
+def test_story_over_budget_for_both_models_falls_back_to_the_fast_model(capsys):
+    route = _policy().route("Checkout", "word " * 2000)
+    assert (route.model, route.size) == ("fast-model", "large")
+    assert "no model fits the 30000ms budget" in capsys.readouterr().out
+
+
+def test_escalation_ends_at_the_large_model():
+    policy = _policy()
+    escalated = policy.escalate(policy.route("Login", "As a member I want to sign in"))
+    assert escalated.model == "large-model"
+    assert policy.escalate(escalated) is None
+
+
+def test_validate_requires_complete_gherkin():
+    gherkin = "Feature: Login\n  Scenario: Sign in\n    Given a member\n    When they sign in\n    Then they see the dashboard\n"
+    assert GherkinRoutingPolicy.validate(gherkin)
+    assert not GherkinRoutingPolicy.validate(gherkin, stop_reason="max_tokens")
+    assert not GherkinRoutingPolicy.validate(gherkin.replace("Then", "And"))
@@ -0,0 +1,104 @@
+import uuid
+
+from app.services.gherkin_parser import parse_gherkin
+from app.services.similarity import StorySimilarityIndex
+from app.services.step_index import StepIndex
+from app.services.title_index import TitleIndex
+
+
+class _Query:
+    def __init__(self, db):
+        self.db = db
+
+    def filter(self, *criteria):
+        return self
+
+    def all(self):
+        # A write commits after the load read its rows but before it finished
+        if self.db.during_load:
+            self.db.during_load()
+            self.db.during_load = None
+        return self.db.rows
+
+
+class _LoadingDb:
+    """Stands in for a Session: every query returns rows, the first one also runs during_load"""
+
+    def __init__(self, rows, during_load):
+        self.rows = rows
+        self.during_load = during_load
+
+    def query(self, *columns):
+        return _Query(self)
+
+
+def _feature(step: str) -> dict:
+    return parse_gherkin(f"Feature: Checkout\n  Scenario: Pay\n    Given {step}\n")
+
+
+def test_step_index_keeps_writes_made_during_load():
+    kept, deleted, created = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    index = StepIndex()
+
+    def during_load():
+        index.update_story(deleted, None)
+        index.update_story(created, _feature("a basket with three items"))
+
+    index.ensure_loaded(_LoadingDb(
+        [(kept, _feature("a signed in shopper")), (deleted, _feature("an expired card"))], during_load
+    ))
+
+    assert [entry.text for entry, _ in index.suggest("a signed in shopper")] == ["a signed in shopper"]
+    assert index.suggest("an expired card", min_similarity=0.9) == []
+    assert [entry.text for entry, _ in index.suggest("a basket with three items")] == ["a basket with three items"]
+
+
+def test_similarity_index_keeps_writes_made_during_load():
+    kept, deleted, created = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    index = StorySimilarityIndex(features=512)
+
+    def during_load():
+        index.remove(deleted)
+        index.upsert(created, "Export invoices as PDF", "Accountants download monthly invoices")
+
+    index.ensure_loaded(_LoadingDb(
+        [
+            (kept, "Reset a forgotten password", "Members get a reset link by email"),
+            (deleted, "Archive old projects", "Owners hide finished projects"),
+        ],
+        during_load,
+    ))
+
+    def top(title, description):
+        return [story_id for story_id, _ in index.similar_to_text(title, description, k=1)]
+
+    assert top("Reset a forgotten password", "Members get a reset link by email") == [kept]
+    assert top("Archive old projects", "Owners hide finished projects") == []
+    assert top("Export invoices as PDF", "Accountants download monthly invoices") == [created]
+
+
+def test_title_index_keeps_writes_made_during_load(tmp_path):
+    kept, deleted, created = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    index = TitleIndex(snapshot_path=str(tmp_path / "missing.json.gz"))
+
+    def during_load():
+        index.remove(deleted)
+        index.upsert(created, "Export invoices")
+
+    index.load(_LoadingDb(
+        [(kept, "Reset password", None), (deleted, "Archive projects", None)], during_load
+    ))
+
+    assert index.search("reset") == [(str(kept), "Reset password")]
+    assert index.search("archive") == []
+    assert index.search("export") == [(str(created), "Export invoices")]
+
+
+def test_writes_before_any_load_are_left_to_the_load():
+    story_id = uuid.uuid4()
+    index = TitleIndex()
+
+    index.upsert(story_id, "Never loaded")
+    index.remove(story_id)
+
+    assert index.search("never") == []
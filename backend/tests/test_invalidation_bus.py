@@ -0,0 +1,74 @@
+import json
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models.user import User
+from app.services.invalidation_bus import INVALIDATION_CHANNEL, WORKER_ID, written_changes
+
+
+def _session_recording_flushes(published):
+    # SQLite can't render the Postgres column types, so the table is
+    # declared by hand; the ORM maps onto it as usual
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE users (id CHAR(32) PRIMARY KEY, email VARCHAR, password_hash VARCHAR, "
+            "name VARCHAR, avatar_url VARCHAR, created_at DATETIME, updated_at DATETIME)"
+        ))
+    Session = sessionmaker(bind=engine)
+
+    @event.listens_for(Session, "after_flush")
+    def record(session, flush_context):
+        published.append(written_changes(session))
+
+    return Session()
+
+
+def test_inserted_rows_are_published():
+    published = []
+    db = _session_recording_flushes(published)
+    user = User(email="new@example.com", password_hash="x", name="New")
+    db.add(user)
+    db.commit()
+
+    assert published == [[("user", str(user.id))]]
+
+
+def test_updated_and_deleted_rows_are_published():
+    published = []
+    db = _session_recording_flushes(published)
+    user = User(email="old@example.com", password_hash="x", name="Old")
+    db.add(user)
+    db.commit()
+    user_id = str(user.id)
+
+    user.name = "Renamed"
+    db.commit()
+    db.delete(user)
+    db.commit()
+
+    assert published[1:] == [[("user", user_id)], [("user", user_id)]]
+
+
+def test_insert_is_notified_when_it_commits(db):
+    listener = db.get_bind().raw_connection()
+    try:
+        listener.dbapi_connection.autocommit = True
+        listener.cursor().execute(f"LISTEN {INVALIDATION_CHANNEL}")
+
+        user = User(email="notified@example.com", password_hash="x", name="Notified")
+        db.add(user)
+        db.flush()
+        listener.dbapi_connection.poll()
+        assert listener.dbapi_connection.notifies == []
+
+        db.commit()
+        listener.dbapi_connection.poll()
+        messages = [json.loads(notify.payload) for notify in listener.dbapi_connection.notifies]
+    finally:
+        listener.close()
+
+    assert [(message["origin"], message["changes"]) for message in messages] == [
+        (WORKER_ID, [["user", str(user.id)]])
+    ]
@@ -0,0 +1,55 @@
+from app.services.openapi_validator import escape_pointer_token, format_issue, validate_openapi
+
+
+def _spec(**overrides):
+    spec = {
+        "openapi": "3.0.3",
+        "info": {"title": "Pets", "version": "1.0"},
+        "paths": {
+            "/pets/{id}": {
+                "get": {
+                    "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}],
+                    "responses": {"200": {"$ref": "#/components/responses/Pet"}},
+                }
+            }
+        },
+        "components": {
+            "responses": {"Pet": {"description": "A pet"}},
+            "schemas": {"Node": {"type": "object", "properties": {"next": {"$ref": "#/components/schemas/Node"}}}},
+        },
+    }
+    spec.update(overrides)
+    return spec
+
+
+def test_valid_spec_with_a_recursive_schema_has_no_issues():
+    assert validate_openapi(_spec()) == []
+
+
+def test_issues_point_at_the_offending_node():
+    spec = _spec()
+    spec["paths"]["/pets/{id}"]["get"]["responses"]["200"]["$ref"] = "#/components/responses/Missing"
+    issues = validate_openapi(spec)
+    assert [issue["pointer"] for issue in issues] == ["/paths/~1pets~1{id}/get/responses/200/$ref"]
+
+
+def test_ref_cycles_are_reported_not_followed():
+    spec = _spec()
+    spec["components"]["responses"] = {
+        "A": {"$ref": "#/components/responses/B"},
+        "B": {"$ref": "#/components/responses/A"},
+    }
+    spec["paths"]["/pets/{id}"]["get"]["responses"]["200"]["$ref"] = "#/components/responses/A"
+    issues = validate_openapi(spec)
+    assert issues and all(issue["message"].startswith("Circular $ref") for issue in issues)
+
+
+def test_unsupported_version_and_non_object_root():
+    assert [format_issue(issue) for issue in validate_openapi(_spec(openapi="2.0"))] == [
+        "/openapi: Unsupported OpenAPI version '2.0'; expected 3.0.x or 3.1.x"
+    ]
+    assert [format_issue(issue) for issue in validate_openapi([])] == ["/: Document root must be an object"]
+
+
+def test_pointer_tokens_are_escaped():
+    assert escape_pointer_token("a/b~c") == "a~1b~0c"
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+
+from app.crud.sync import get_changes_since, page_cursor, prune_tombstones
+from app.db.session import SessionLocal
+from app.models.sync_tombstone import SyncTombstone
+from app.models.task import Task
+from app.models.user import User
+from app.models.user_story import UserStory
+from app.services import sync_log  # noqa: F401  (registers the tombstone hooks)
+
+
+def test_page_cursor_without_full_pages_ends_at_highest_change():
+    assert page_cursor(0, 3, [[1, 4], [2], []]) == (4, False)
+
+
+def test_page_cursor_ends_at_lowest_full_page():
+    # Tasks filled their page at 6; stories may have more rows below 9
+    # that this page didn't read, so it can't end past 6
+    assert page_cursor(0, 3, [[2, 5, 9], [1, 3, 6], [4]]) == (6, True)
+
+
+def test_page_cursor_with_nothing_new_keeps_cursor():
+    assert page_cursor(7, 3, [[], [], []]) == (7, False)
+
+
+def _user(db) -> User:
+    user = User(email="sync@example.com", password_hash="x", name="Sync")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def _story(db, user, title) -> UserStory:
+    story = UserStory(title=title, description="", created_by=user.id)
+    db.add(story)
+    db.commit()
+    return story
+
+
+def _task(db, story, title) -> Task:
+    task = Task(story_id=story.id, title=title, description="")
+    db.add(task)
+    db.commit()
+    return task
+
+
+def _sync_all(db, limit):
+    """Follow pages from cursor 0 and return what a client ends up with"""
+    # A separate session, so rows come from the pages, not db's identity map
+    reader = SessionLocal(bind=db.get_bind())
+    try:
+        return _follow_pages(reader, limit)
+    finally:
+        reader.close()
+
+
+def _follow_pages(db, limit):
+    stories, tasks, deleted = {}, {}, set()
+    cursor, pages = 0, 0
+    while True:
+        page = get_changes_since(db, cursor, limit)
+        pages += 1
+        assert page["cursor"] >= cursor
+        stories.update((row.id, row.title) for row in page["stories"])
+        tasks.update((row.id, row.title) for row in page["tasks"])
+        deleted.update(item["id"] for item in page["deleted"])
+        cursor = page["cursor"]
+        if not page["has_more"]:
+            return stories, tasks, deleted, pages
+
+
+def test_paging_across_tables_with_uneven_fills_misses_nothing(db):
+    user = _user(db)
+    stories = [_story(db, user, f"story {i}") for i in range(5)]
+    tasks = [_task(db, stories[0], "task 0"), _task(db, stories[1], "task 1")]
+    for i in range(5, 9):
+        stories.append(_story(db, user, f"story {i}"))
+    stories[0].title = "story 0 renamed"
+    tasks[1].title = "task 1 renamed"
+    db.commit()
+
+    synced_stories, synced_tasks, deleted, pages = _sync_all(db, limit=3)
+
+    assert synced_stories == {story.id: story.title for story in stories}
+    assert synced_tasks == {task.id: task.title for task in tasks}
+    assert deleted == set()
+    assert pages > 3
+
+
+def test_deleting_a_story_leaves_tombstones_for_it_and_its_tasks(db):
+    user = _user(db)
+    story = _story(db, user, "doomed")
+    story_id = story.id
+    task_ids = [_task(db, story, "a").id, _task(db, story, "b").id]
+    cursor = get_changes_since(db, 0, 100)["cursor"]
+
+    # Only the story is deleted explicitly; its tasks go through the cascade
+    db.delete(story)
+    db.commit()
+
+    page = get_changes_since(db, cursor, 100)
+    assert {(item["entity"], item["id"]) for item in page["deleted"]} == {
+        ("story", story_id), ("task", task_ids[0]), ("task", task_ids[1]),
+    }
+    assert all(item["story_id"] == story_id for item in page["deleted"])
+
+
+def test_cursor_older_than_pruned_tombstones_is_told_to_reset(db):
+    user = _user(db)
+    keep = _story(db, user, "keep")
+    old_cursor = get_changes_since(db, 0, 100)["cursor"]
+    db.delete(_story(db, user, "old"))
+    db.commit()
+    db.query(SyncTombstone).update({"deleted_at": datetime.utcnow() - timedelta(days=60)})
+    db.commit()
+    fresh_cursor = get_changes_since(db, 0, 100)["cursor"]
+
+    assert prune_tombstones(db, datetime.utcnow() - timedelta(days=30)) == 1
+
+    assert get_changes_since(db, old_cursor, 100)["reset"] is True
+    assert "reset" not in get_changes_since(db, fresh_cursor, 100)
+    assert [row.id for row in get_changes_since(db, 0, 100)["stories"]] == [keep.id]
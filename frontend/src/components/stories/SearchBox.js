@@ -1,20 +1,60 @@
-import React, { useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
+import storyService from '../../services/storyService';
+
+const SUGGESTION_DELAY_MS = 150;
 
 /**
  * SearchBox component for filtering user stories by keyword
- * This is a placeholder for future functionality - not currently active
+ * Suggests matching story titles while typing; the full search only runs on submit
  * @param {Object} props - Component props
  * @param {Function} props.onSearch - Function to call when search is submitted
  * @param {boolean} props.disabled - Whether the search is disabled
  */
 const SearchBox = ({ onSearch, disabled = false }) => {
   const [keyword, setKeyword] = useState('');
+  const [suggestions, setSuggestions] = useState([]);
+  const [showSuggestions, setShowSuggestions] = useState(false);
+  const latestQuery = useRef('');
+
+  // Fetch title suggestions after a short pause in typing
+  useEffect(() => {
+    const query = keyword.trim();
+    latestQuery.current = query;
+    if (!query || disabled) {
+      setSuggestions([]);
+      return undefined;
+    }
+
+    const timer = setTimeout(async () => {
+      try {
+        const matches = await storyService.typeahead(query);
+        // Ignore responses for text the user has already changed
+        if (latestQuery.current === query) {
+          setSuggestions(matches);
+        }
+      } catch (error) {
+        setSuggestions([]);
+      }
+    }, SUGGESTION_DELAY_MS);
+
+    return () => clearTimeout(timer);
+  }, [keyword, disabled]);
+
+  const submitSearch = (value) => {
+    setShowSuggestions(false);
+    if (onSearch && value.trim()) {
+      onSearch(value.trim());
+    }
+  };
 
   const handleSubmit = (e) => {
     e.preventDefault();
-    if (onSearch && keyword.trim()) {
-      onSearch(keyword.trim());
-    }
+    submitSearch(keyword);
+  };
+
+  const handleSelect = (title) => {
+    setKeyword(title);
+    submitSearch(title);
   };
 
   return (
@@ -23,7 +63,12 @@ const SearchBox = ({ onSearch, disabled = false }) => {
         type="text"
         placeholder="Search stories..."
         value={keyword}
-        onChange={(e) => setKeyword(e.target.value)}
+        onChange={(e) => {
+          setKeyword(e.target.value);
+          setShowSuggestions(true);
+        }}
+        onFocus={() => setShowSuggestions(true)}
+        onBlur={() => setTimeout(() => setShowSuggestions(false), 100)}
         disabled={disabled}
         className={`w-full py-2 pl-10 pr-4 rounded-md border-gray-300 shadow-sm focus:border-blue-300 focus:ring focus:ring-blue-200 focus:ring-opacity-50 ${
           disabled ? 'opacity-70 cursor-not-allowed' : ''
@@ -44,6 +89,19 @@ const SearchBox = ({ onSearch, disabled = false }) => {
           />
         </svg>
       </div>
+      {showSuggestions && suggestions.length > 0 && (
+        <ul className="absolute z-10 mt-1 w-full bg-white border border-gray-200 rounded-md shadow-lg max-h-60 overflow-y-auto">
+          {suggestions.map((suggestion) => (
+            <li
+              key={suggestion.id}
+              onMouseDown={() => handleSelect(suggestion.title)}
+              className="px-4 py-2 text-sm text-gray-700 cursor-pointer hover:bg-blue-50"
+            >
+              {suggestion.title}
+            </li>
+          ))}
+        </ul>
+      )}
       <button
         type="submit"
         disabled={disabled || !keyword.trim()}
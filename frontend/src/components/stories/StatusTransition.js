@@ -66,9 +66,9 @@ const StatusTransition = ({ story, onStatusChange, onError }) => {
       );
       console.log('StatusTransition - API returned updated story:', updatedStory);
       
-      // If transitioning from DRAFT to READY_FOR_REFINEMENT, fetch the updated story
-      // to ensure we get the Gherkin content
-      if (isDraftToRefinement) {
+      // The status update already returns the generated Gherkin; only refetch
+      // from DRAFT to READY_FOR_REFINEMENT if it is missing from the response
+      if (isDraftToRefinement && !updatedStory.gherkin_description) {
         try {
           console.log('StatusTransition - Fetching refreshed story data');
           // Fetch the updated story to get the fresh Gherkin content
@@ -17,6 +17,8 @@ const StoryDetail = ({ story, onStatusChange, onClose, onError, onUpdate, onDele
   const [isAnalyzing, setIsAnalyzing] = useState(false);
   const [showDeleteConfirm, setShowDeleteConfirm] = useState(false);
   const [currentStory, setCurrentStory] = useState(story);
+  const [storyDetail, setStoryDetail] = useState(null);
+  const [isDetailLoaded, setIsDetailLoaded] = useState(false);
   
   const formatDate = (dateString) => {
     const options = { year: 'numeric', month: 'short', day: 'numeric', hour: '2-digit', minute: '2-digit' };
@@ -33,6 +35,26 @@ const StoryDetail = ({ story, onStatusChange, onClose, onError, onUpdate, onDele
     setCurrentStory(story);
   }, [story]);
   
+  // Load tasks and people with the story in one request
+  useEffect(() => {
+    let cancelled = false;
+    setIsDetailLoaded(false);
+    storyService.getStoryById(story.id, ['tasks', 'assignee', 'creator'])
+      .then((detail) => {
+        if (!cancelled) setStoryDetail(detail);
+      })
+      .catch(() => {
+        // TaskSection falls back to fetching the tasks itself
+        if (!cancelled) setStoryDetail(null);
+      })
+      .finally(() => {
+        if (!cancelled) setIsDetailLoaded(true);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [story.id]);
+  
   // Handle story update
   const handleUpdateStory = async (formData) => {
     try {
@@ -194,7 +216,13 @@ const StoryDetail = ({ story, onStatusChange, onClose, onError, onUpdate, onDele
             )}
             
             {/* Tasks Section */}
-            {!isEditing && <TaskSection storyId={currentStory.id} onError={onError} />}
+            {!isEditing && isDetailLoaded && (
+              <TaskSection
+                storyId={currentStory.id}
+                initialTasks={storyDetail ? storyDetail.tasks : null}
+                onError={onError}
+              />
+            )}
             
             {/* Metadata */}
             <div className="bg-white rounded-lg shadow-sm p-4">
@@ -208,6 +236,18 @@ const StoryDetail = ({ story, onStatusChange, onClose, onError, onUpdate, onDele
                   <dt className="text-gray-500">Last Updated</dt>
                   <dd>{formatDate(currentStory.updated_at)}</dd>
                 </div>
+                {storyDetail && storyDetail.creator && (
+                  <div>
+                    <dt className="text-gray-500">Created By</dt>
+                    <dd>{storyDetail.creator.name}</dd>
+                  </div>
+                )}
+                {storyDetail && storyDetail.assignee && storyDetail.assignee.id === currentStory.assigned_to && (
+                  <div>
+                    <dt className="text-gray-500">Assignee</dt>
+                    <dd>{storyDetail.assignee.name}</dd>
+                  </div>
+                )}
                 <div className="col-span-2">
                   <dt className="text-gray-500">Story ID</dt>
                   <dd className="font-mono text-xs">{currentStory.id}</dd>
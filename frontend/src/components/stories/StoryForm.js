@@ -90,33 +90,18 @@ const StoryForm = ({ onSubmit, initialData = {}, isSubmitting = false, isEditing
           console.warn('No generated description in response');
         }
       } else {
-        // For new stories (no storyId yet), we'll create a temporary story, 
-        // add the design, analyze it, then delete it
-        console.log('Creating temporary story for design analysis');
+        // For new stories (no storyId yet), analyze the design directly
+        console.log('Analyzing design without a saved story');
         
         try {
-          // Create a temporary story
-          const tempStory = await storyService.createStory({
-            title: 'Temporary Design Analysis Story',
-            description: 'This is a temporary story for design analysis.',
-            design_url: formData.design_url
-          });
-          
-          console.log('Temporary story created:', tempStory);
-          
-          // Analyze the design
-          const response = await storyService.analyzeDesign(tempStory.id);
+          const response = await storyService.analyzeDesignImage(formData.design_url);
           console.log('Analysis response:', response);
           
           if (response && response.generated_description) {
             setFormData({ ...formData, description: response.generated_description });
           }
-          
-          // Delete the temporary story
-          await storyService.deleteStory(tempStory.id);
-          console.log('Temporary story deleted');
         } catch (error) {
-          console.error('Error with temporary story workflow:', error);
+          console.error('Error analyzing design image:', error);
           // Fallback to a generic description
           const fallbackDescription = `Interface for a web application with navigation and interactive elements. Users can perform actions and view content through this interface.`;
           setFormData({ ...formData, description: fallbackDescription });
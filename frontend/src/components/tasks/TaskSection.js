@@ -7,11 +7,12 @@ import TaskFilter from './TaskFilter';
 import TaskFilterInfo from './TaskFilterInfo';
 import taskService from '../../services/taskService';
 import userService from '../../services/userService';
+import subscribeToChanges from '../../services/changeFeed';
 
 /**
  * Component for managing tasks within a story
  */
-const TaskSection = ({ storyId, onError }) => {
+const TaskSection = ({ storyId, initialTasks = null, onError }) => {
   const [allTasks, setAllTasks] = useState([]);
   const [filteredTasks, setFilteredTasks] = useState([]);
   const [users, setUsers] = useState([]);
@@ -29,6 +30,13 @@ const TaskSection = ({ storyId, onError }) => {
     const fetchTasks = async () => {
       if (!storyId) return;
       
+      // Already loaded with the story
+      if (initialTasks) {
+        setAllTasks(initialTasks);
+        setFilteredTasks(initialTasks);
+        return;
+      }
+      
       try {
         setIsLoading(true);
         const fetchedTasks = await taskService.getTasksByStory(storyId);
@@ -43,7 +51,34 @@ const TaskSection = ({ storyId, onError }) => {
     };
 
     fetchTasks();
-  }, [storyId, onError]);
+  }, [storyId, initialTasks, onError]);
+
+  // Keep the task list current with changes made by others
+  useEffect(() => {
+    if (!storyId) return undefined;
+    
+    return subscribeToChanges({ story_id: storyId }, async (change) => {
+      if (change.type === 'resync' || (change.entity === 'task' && change.op === 'insert')) {
+        try {
+          setAllTasks(await taskService.getTasksByStory(storyId));
+        } catch (error) {
+          console.error('Error refreshing tasks:', error);
+        }
+        return;
+      }
+      if (change.entity !== 'task') return;
+      
+      if (change.op === 'delete') {
+        setAllTasks((current) => current.filter((task) => task.id !== change.id));
+      } else {
+        setAllTasks((current) => current.map((task) => (
+          task.id === change.id
+            ? { ...task, title: change.title, status: change.status, assignee: change.assignee, updated_at: change.updated_at }
+            : task
+        )));
+      }
+    });
+  }, [storyId]);
 
   // Apply filters when tasks or filters change
   useEffect(() => {
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useAuth } from '../context/AuthContext';
 import dashboardService from '../services/dashboardService';
+import subscribeToChanges from '../services/changeFeed';
 import Loading from '../components/Loading';
 import { Link } from 'react-router-dom';
 import Layout from '../components/Layout';
@@ -33,6 +34,26 @@ const Dashboard = () => {
     fetchDashboardData();
   }, []);
 
+  // Refresh the summary quietly once a burst of live changes settles
+  useEffect(() => {
+    let timer = null;
+    const unsubscribe = subscribeToChanges({}, () => {
+      clearTimeout(timer);
+      timer = setTimeout(async () => {
+        try {
+          const data = await dashboardService.getDashboardSummary();
+          setDashboardData(data.data);
+        } catch (err) {
+          console.error('Dashboard refresh error:', err);
+        }
+      }, 2000);
+    });
+    return () => {
+      clearTimeout(timer);
+      unsubscribe();
+    };
+  }, []);
+
   if (loading) {
     return (
       <div className="container mx-auto px-4 py-8">
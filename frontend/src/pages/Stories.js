@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import Layout from '../components/Layout';
 import { useAuth } from '../context/AuthContext';
 import StoryForm from '../components/stories/StoryForm';
@@ -9,6 +9,7 @@ import StatusFilter from '../components/stories/StatusFilter';
 import Pagination from '../components/Pagination';
 import SearchBox from '../components/stories/SearchBox';
 import storyService from '../services/storyService';
+import subscribeToChanges from '../services/changeFeed';
 import { getStatusLabel, getStatusColor } from '../utils/statusConfig';
 
 /**
@@ -37,6 +38,15 @@ const Stories = () => {
   
   // Additional state for tracking loading state when filtering
   const [isFilterLoading, setIsFilterLoading] = useState(false);
+  
+  // Bumped to refetch the list when live changes may have been missed
+  const [refreshKey, setRefreshKey] = useState(0);
+  
+  // Latest list, for change handlers deciding whether a story is already shown
+  const storiesRef = useRef(stories);
+  useEffect(() => {
+    storiesRef.current = stories;
+  }, [stories]);
 
   // Fetch stories on component mount or when filters change
   useEffect(() => {
@@ -76,6 +86,42 @@ const Stories = () => {
     if (user) {
       fetchStories();
     }
+  }, [user, statusFilter, refreshKey]);
+  
+  // Patch the list from live changes instead of refetching it
+  useEffect(() => {
+    if (!user) return undefined;
+    
+    return subscribeToChanges({}, async (change) => {
+      if (change.type === 'resync') {
+        setRefreshKey((key) => key + 1);
+        return;
+      }
+      if (change.entity !== 'story') return;
+      
+      const matchesFilter = !statusFilter || change.status === statusFilter;
+      if (change.op === 'delete' || !matchesFilter) {
+        setStories((current) => current.filter((story) => story.id !== change.id));
+      } else if (change.op === 'update' && storiesRef.current.some((story) => story.id === change.id)) {
+        setStories((current) => current.map((story) => (
+          story.id === change.id
+            ? { ...story, title: change.title, status: change.status, assigned_to: change.assignee, updated_at: change.updated_at }
+            : story
+        )));
+      } else if (change.op === 'insert' || change.op === 'update') {
+        // New, or updated into the current filter: the list has nothing to patch
+        try {
+          const newStory = await storyService.getStoryById(change.id);
+          setStories((current) => (
+            current.some((story) => story.id === newStory.id)
+              ? current.map((story) => (story.id === newStory.id ? newStory : story))
+              : [newStory, ...current]
+          ));
+        } catch (error) {
+          console.error('Failed to load new story:', error);
+        }
+      }
+    });
   }, [user, statusFilter]);
   
   // Update displayed stories when page or all stories change
@@ -91,8 +137,8 @@ const Stories = () => {
       setIsSubmitting(true);
       const newStory = await storyService.createStory(formData);
       
-      // Add new story to state
-      setStories([newStory, ...stories]);
+      // Add new story to state, unless the change feed already did
+      setStories((current) => [newStory, ...current.filter((story) => story.id !== newStory.id)]);
       
       // Show success notification
       setNotification({
@@ -44,34 +44,10 @@ const TestDesignFeature = () => {
     try {
       setIsAnalyzing(true);
       
-      // First, create a temporary story with the design URL
-      addLog('Creating temporary story for design analysis');
+      // Analyze the design directly, no temporary story needed
       addLog(`Using design URL: ${designUrl}`);
-      
-      // Build the story data
-      const storyData = {
-        title: 'Temporary Design Analysis',
-        description: 'This is a temporary story created for design analysis.',
-        design_url: designUrl
-      };
-      
-      addLog(`Story data: ${JSON.stringify(storyData)}`);
-      
-      const tempStory = await storyService.createStory(storyData);
-      
-      addLog(`Temporary story created with ID: ${tempStory.id}`);
-      addLog(`Story design_url: ${tempStory.design_url || 'null'}`);
-      
-      // If the design URL wasn't saved properly, update it
-      if (!tempStory.design_url) {
-        addLog('Design URL not saved in story creation, updating it now...');
-        await storyService.updateStoryDesign(tempStory.id, designUrl);
-        addLog('Design URL updated');
-      }
-      
-      // Now analyze the design
       addLog('Calling API to analyze design using Claude');
-      const response = await storyService.analyzeDesign(tempStory.id);
+      const response = await storyService.analyzeDesignImage(designUrl);
       addLog('Received analysis response from backend');
       
       if (response && response.generated_description) {
@@ -90,10 +66,6 @@ const TestDesignFeature = () => {
         });
       }
       
-      // Delete the temporary story
-      addLog('Cleaning up: Deleting temporary story');
-      await storyService.deleteStory(tempStory.id);
-      addLog('Temporary story deleted');
       addLog('Analysis process completed');
       
     } catch (error) {
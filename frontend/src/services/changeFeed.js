@@ -0,0 +1,84 @@
+import api from './api';
+
+const RETRY_DELAY_MS = 3000;
+
+/**
+ * Parse one server-sent event block into { event, data }
+ * @param {string} block - Lines of a single event
+ * @returns {Object|null} - Parsed event, or null for comments and retry hints
+ */
+const parseEvent = (block) => {
+  let event = 'message';
+  const data = [];
+  block.split('\n').forEach((line) => {
+    if (line.startsWith('event:')) {
+      event = line.slice(6).trim();
+    } else if (line.startsWith('data:')) {
+      data.push(line.slice(5).trim());
+    }
+  });
+  if (!data.length) return null;
+  return { event, data: JSON.parse(data.join('\n')) };
+};
+
+/**
+ * Subscribe to live story, task and document changes
+ *
+ * Uses fetch rather than EventSource so the auth token goes in a header,
+ * not the URL. Reconnects after errors and reports { type: 'resync' }
+ * whenever events may have been missed.
+ *
+ * @param {Object} filters - Optional story_id and/or assignee to filter on
+ * @param {Function} onChange - Called with each change, or { type: 'resync' }
+ * @returns {Function} - Call to unsubscribe
+ */
+const subscribeToChanges = (filters, onChange) => {
+  const controller = new AbortController();
+  const params = new URLSearchParams();
+  Object.entries(filters || {}).forEach(([key, value]) => {
+    if (value) params.append(key, value);
+  });
+  const url = `${api.defaults.baseURL}/changes/stream?${params.toString()}`;
+  let connectedBefore = false;
+
+  const connect = async () => {
+    while (!controller.signal.aborted) {
+      try {
+        const token = localStorage.getItem('token');
+        const response = await fetch(url, {
+          headers: token ? { Authorization: `Bearer ${token}` } : {},
+          signal: controller.signal,
+        });
+        if (!response.ok) throw new Error(`Change feed returned ${response.status}`);
+
+        if (connectedBefore) onChange({ type: 'resync' });
+        connectedBefore = true;
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          const blocks = buffer.split('\n\n');
+          buffer = blocks.pop();
+          blocks.forEach((block) => {
+            const parsed = parseEvent(block);
+            if (!parsed) return;
+            onChange(parsed.event === 'resync' ? { type: 'resync' } : parsed.data);
+          });
+        }
+      } catch (error) {
+        if (controller.signal.aborted) return;
+        console.error('Change feed error:', error);
+      }
+      await new Promise((resolve) => setTimeout(resolve, RETRY_DELAY_MS));
+    }
+  };
+
+  connect();
+  return () => controller.abort();
+};
+
+export default subscribeToChanges;
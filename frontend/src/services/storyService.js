@@ -36,6 +36,22 @@ const storyService = {
     }
   },
 
+  /**
+   * Get story titles matching a partial query, for search-as-you-type
+   * @param {string} query - Text typed so far
+   * @param {number} limit - Maximum number of matches
+   * @returns {Promise} - Promise resolving to array of {id, title}
+   */
+  typeahead: async (query, limit = 8) => {
+    try {
+      const response = await api.get('/stories/typeahead', { params: { q: query, limit } });
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching title suggestions:', error);
+      throw error;
+    }
+  },
+
   /**
    * Update story status
    * @param {string} storyId - ID of the story to update
@@ -102,11 +118,13 @@ const storyService = {
   /**
    * Get a single story by ID
    * @param {string} storyId - ID of the story to retrieve
+   * @param {Array} include - Related records to embed: 'tasks', 'assignee', 'creator'
    * @returns {Promise} - Promise resolving to the story
    */
-  getStoryById: async (storyId) => {
+  getStoryById: async (storyId, include = []) => {
     try {
-      const response = await api.get(`/stories/${storyId}`);
+      const params = include.length ? { include: include.join(',') } : {};
+      const response = await api.get(`/stories/${storyId}`, { params });
       return response.data;
     } catch (error) {
       console.error('Error fetching story:', error);
@@ -147,6 +165,27 @@ const storyService = {
       console.error('Error analyzing design:', error);
       throw error;
     }
+  },
+
+  /**
+   * Generate a description from a design image without a saved story
+   * @param {string} designUrl - URL of the design image
+   * @returns {Promise} - Promise resolving to the generated description
+   */
+  analyzeDesignImage: async (designUrl) => {
+    try {
+      console.log('Analyzing design image:', designUrl);
+      const formData = new FormData();
+      formData.append('design_url', designUrl);
+      const response = await api.post('/designs/analyze', formData, {
+        headers: { 'Content-Type': 'multipart/form-data' },
+      });
+      console.log('Design analysis response:', response.data);
+      return response.data;
+    } catch (error) {
+      console.error('Error analyzing design image:', error);
+      throw error;
+    }
   }
 };
 